@@ -116,6 +116,10 @@ def _no_service_line(dest_abbr: str, color_map: dict[str, list[str]]) -> str:
   return f'{tags[0]} NO SERVICE' if tags else 'NO SERVICE'
 
 
+# Precomputed display strings for the values the ETD API actually returns.
+_MINUTES_DISPLAY: dict[str, str] = {str(i): f'{i:02}' for i in range(100)} | {'Leaving': '00'}
+
+
 def _format_minutes(mins: str) -> str:
   """Convert a BART API minutes string to a short display string.
 
@@ -123,8 +127,9 @@ def _format_minutes(mins: str) -> str:
   regardless of how many single-digit times appear on a line. Arriving trains
   ('Leaving' or '0') are shown as '00'. E.g. '00', '05', '12'.
   """
-  if mins == 'Leaving':
-    return '00'
+  display = _MINUTES_DISPLAY.get(mins)
+  if display is not None:
+    return display
   try:
     return f'{int(mins):02}'
   except ValueError:
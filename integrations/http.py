@@ -15,23 +15,35 @@ import requests
 
 logger = logging.getLogger(__name__)
 
+_version_cache: str | None = None
 _ua_cache: str | None = None
 
 
+def app_version() -> str:
+  """Return the installed e-note-ion version.
+
+  Falls back to 'dev' when the package metadata is unavailable (e.g. source
+  install without pip install -e). The metadata lookup scans sys.path, so the
+  result is cached after the first call.
+  """
+  global _version_cache
+  if _version_cache is None:
+    try:
+      _version_cache = importlib.metadata.version('e-note-ion')
+    except importlib.metadata.PackageNotFoundError:
+      _version_cache = 'dev'
+  return _version_cache
+
+
 def user_agent() -> str:
   """Return the User-Agent string for outbound requests.
 
-  Returns 'e-note-ion/{version}', falling back to 'e-note-ion/dev' when the
-  package metadata is unavailable (e.g. source install without pip install -e).
-  The result is cached after the first call.
+  Returns 'e-note-ion/{version}' (see app_version). The result is cached
+  after the first call.
   """
   global _ua_cache
   if _ua_cache is None:
-    try:
-      version = importlib.metadata.version('e-note-ion')
-    except importlib.metadata.PackageNotFoundError:
-      version = 'dev'
-    _ua_cache = f'e-note-ion/{version}'
+    _ua_cache = f'e-note-ion/{app_version()}'
   return _ua_cache
 
 
@@ -41,6 +53,7 @@ def fetch_with_retry(
   *,
   retries: int = 3,
   backoff: float = 1.0,
+  session: requests.Session | None = None,
   **kwargs: Any,
 ) -> requests.Response:
   """Send an HTTP request, retrying on transient failures.
@@ -55,9 +68,12 @@ def fetch_with_retry(
     retries: Maximum number of attempts (default 3 — one initial + two retries).
     backoff: Base delay in seconds; actual delay is backoff * 2**attempt
              (0s before attempt 0, 1s before attempt 1, 2s before attempt 2).
+    session: Optional requests.Session to send through (reuses its pooled
+             connections and default headers); defaults to requests.request.
     **kwargs: Passed through to requests.request (e.g. params, headers, timeout).
   """
   last_exc: Exception | None = None
+  send = session.request if session is not None else requests.request
 
   for attempt in range(retries):
     if attempt > 0:
@@ -65,7 +81,7 @@ def fetch_with_retry(
       logger.debug('retry attempt %d/%d for %s %s (backoff=%.1fs)', attempt + 1, retries, method, url, delay)
       time.sleep(delay)
     try:
-      r = requests.request(method, url, **kwargs)
+      r = send(method, url, **kwargs)
       if r.status_code >= 500:
         last_exc = requests.HTTPError(f'HTTP {r.status_code} {r.reason}', response=r)
         continue
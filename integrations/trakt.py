@@ -20,10 +20,12 @@
 # Optional config.toml keys:
 #   calendar_days — lookahead window in days (default 7, max 33)
 
+import json
 import logging
 import threading
 import time
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 
 import requests
 
@@ -61,15 +63,43 @@ _NEXT_UP_CACHE_TTL = 3600  # 1 hour
 # Max number of recently-watched shows to probe for a next episode.
 _NEXT_UP_MAX_SHOWS = 5
 
+# Tokens are refreshed once they are within this many seconds of expiry.
+_TOKEN_REFRESH_WINDOW = 86400  # 24 hours
+# Upper bound on token lifetime (Trakt issues 90-day tokens). Caps a missing
+# or inflated expires_in so a token is never treated as valid past real expiry.
+_TOKEN_MAX_LIFETIME = 7776000  # 90 days
+
+# In-memory (access_token, expires_at) for the current token, so the common
+# "token still fresh" path in _get_token() skips config lookups entirely.
+# Populated on the first fresh read and kept in sync by _store_tokens() and
+# _clear_tokens().
+_token_cache: tuple[str, int] | None = None
+
+# Serializes token refreshes. Trakt refresh tokens are single-use, so two
+# threads refreshing at once (e.g. the scheduler's prefetch and a hold's
+# refresh_fn) would leave the loser with an HTTP error and cleared tokens.
+_token_lock = threading.Lock()
+
+# Last (access_token, client_id, headers) built by _request_headers().
+_headers_cache: tuple[str, str, dict[str, str]] | None = None
+
 
 # --- Token management ---
 
 
-def _store_tokens(tokens: dict) -> None:
-  """Write access_token, refresh_token, and expires_at to config.toml."""
+def _store_tokens(tokens: dict) -> int:
+  """Write access_token, refresh_token, and expires_at to config.toml.
+
+  Returns the absolute expires_at timestamp that was stored.
+  """
+  global _token_cache
   import config as _config_mod
 
-  expires_at = int(time.time()) + tokens.get('expires_in', 7776000)
+  expires_in = tokens.get('expires_in')
+  if expires_in is None:
+    logger.warning('Trakt: token response has no expires_in — assuming %ds', _TOKEN_MAX_LIFETIME)
+    expires_in = _TOKEN_MAX_LIFETIME
+  expires_at = int(time.time()) + min(int(expires_in), _TOKEN_MAX_LIFETIME)
   _config_mod.write_section_values(
     'trakt',
     {
@@ -78,10 +108,16 @@ def _store_tokens(tokens: dict) -> None:
       'expires_at': expires_at,
     },
   )
+  _token_cache = (tokens['access_token'], expires_at)
+  return expires_at
+
 
+def _refresh_token() -> str:
+  """Exchange the current refresh token for a new access/refresh token pair.
 
-def _refresh_token() -> None:
-  """Exchange the current refresh token for a new access/refresh token pair."""
+  Returns the new access token. The token and its expiry are also stored in
+  config.toml and the in-memory token cache.
+  """
   import config as _config_mod
 
   logger.debug('Trakt: refreshing access token')
@@ -105,14 +141,18 @@ def _refresh_token() -> None:
     r.raise_for_status()
   except requests.HTTPError as e:
     raise requests.HTTPError(f'Trakt token refresh failed: {e.response.status_code} {e.response.reason}') from None
-  _store_tokens(r.json())
+  tokens = r.json()
+  _store_tokens(tokens)
   logger.debug('Trakt: token refreshed successfully')
+  return tokens['access_token']
 
 
 def _clear_tokens() -> None:
   """Clear stored tokens from config (in-memory and on disk)."""
+  global _token_cache
   import config as _config_mod
 
+  _token_cache = None
   _config_mod.write_section_values('trakt', {'access_token': '', 'refresh_token': '', 'expires_at': ''})  # nosec B105 — empty strings intentionally clear stored tokens
 
 
@@ -122,6 +162,21 @@ def _get_token() -> str:
   Raises IntegrationDataUnavailableError if auth is pending (no tokens yet) or
   if a token refresh fails (tokens cleared; re-auth flow started).
   """
+  cached = _token_cache
+  if cached is not None and time.time() < cached[1] - _TOKEN_REFRESH_WINDOW:
+    return cached[0]
+  with _token_lock:
+    return _get_token_locked()
+
+
+def _get_token_locked() -> str:
+  """Slow path of _get_token(); caller must hold _token_lock."""
+  global _token_cache
+  # Another thread may have refreshed while we waited for the lock.
+  cached = _token_cache
+  if cached is not None and time.time() < cached[1] - _TOKEN_REFRESH_WINDOW:
+    return cached[0]
+
   import config as _config_mod
 
   access_token = _config_mod.get_optional('trakt', 'access_token')
@@ -137,10 +192,12 @@ def _get_token() -> str:
       pass  # malformed expires_at — proceed with current token
     else:
       secs_remaining = expires_at - time.time()
-      if secs_remaining < 86400:
+      if secs_remaining >= _TOKEN_REFRESH_WINDOW:
+        _token_cache = (access_token, expires_at)
+      else:
         logger.debug('Trakt: access token expires in %.0fs — triggering refresh', secs_remaining)
         try:
-          _refresh_token()
+          access_token = _refresh_token()
         except requests.HTTPError as e:
           logger.warning(
             'Trakt: token refresh failed (%s) — clearing tokens and re-starting '
@@ -152,39 +209,54 @@ def _get_token() -> str:
           raise IntegrationDataUnavailableError(
             'Trakt auth pending — token refresh failed, re-authentication required'
           ) from None
-        access_token = _config_mod.get_optional('trakt', 'access_token')
 
   return access_token
 
 
 def _request_headers(access_token: str, client_id: str) -> dict[str, str]:
-  return {
+  """Return Trakt API request headers, rebuilt only when the token or client_id changes.
+
+  The returned dict is shared between calls and must not be mutated; requests
+  merges it into a fresh per-request header dict.
+  """
+  global _headers_cache
+  cached = _headers_cache
+  if cached is not None and cached[0] == access_token and cached[1] == client_id:
+    return cached[2]
+  headers = {
     'Authorization': f'Bearer {access_token}',
     'trakt-api-version': '2',
     'trakt-api-key': client_id,
     'User-Agent': user_agent(),
   }
+  _headers_cache = (access_token, client_id, headers)
+  return headers
 
 
-def _handle_api_401() -> str:
+def _handle_api_401(rejected_token: str | None = None) -> str:
   """Called when a Trakt API request returns 401.
 
   Attempts a token refresh. If the refresh succeeds, returns the new access
   token so the caller can retry the request. If the refresh fails (e.g. token
   revoked), clears stored tokens, starts re-auth, and raises
   IntegrationDataUnavailableError so the worker skips this cycle gracefully.
-  """
-  import config as _config_mod
 
-  logger.warning('Trakt: received 401 — attempting token refresh')
-  try:
-    _refresh_token()
-  except requests.HTTPError as e:
-    logger.warning('Trakt: token refresh after 401 failed (%s) — clearing tokens and re-starting auth flow', e)
-    _clear_tokens()
-    _ensure_authenticated()
-    raise IntegrationDataUnavailableError('Trakt auth pending — token invalid, re-authentication required') from None
-  new_token = _config_mod.get_optional('trakt', 'access_token')
+  If rejected_token is given and another thread has already replaced it, the
+  current token is returned without refreshing again.
+  """
+  with _token_lock:
+    cached = _token_cache
+    if rejected_token is not None and cached is not None and cached[0] != rejected_token:
+      logger.debug('Trakt: token already refreshed by another caller — retrying request')
+      return cached[0]
+    logger.warning('Trakt: received 401 — attempting token refresh')
+    try:
+      new_token = _refresh_token()
+    except requests.HTTPError as e:
+      logger.warning('Trakt: token refresh after 401 failed (%s) — clearing tokens and re-starting auth flow', e)
+      _clear_tokens()
+      _ensure_authenticated()
+      raise IntegrationDataUnavailableError('Trakt auth pending — token invalid, re-authentication required') from None
   if not new_token:
     raise IntegrationDataUnavailableError('Trakt auth pending — token unavailable after refresh')
   logger.debug('Trakt: token refreshed after 401 — retrying request')
@@ -193,6 +265,33 @@ def _handle_api_401() -> str:
 
 # --- OAuth device code flow ---
 
+# Device-token polling slows down while the user has not yet approved the
+# code: each pending (400) response stretches the interval by this factor,
+# up to the cap. Any other unexpected response resets it to the server's
+# advertised interval.
+_AUTH_POLL_BACKOFF = 1.5
+_AUTH_POLL_MAX_INTERVAL = 60.0
+
+
+def _parse_retry_after(value: str | None) -> float | None:
+  """Return the delay in seconds from a Retry-After header, or None if absent/invalid.
+
+  Accepts both forms allowed by RFC 9110: delay-seconds and HTTP-date.
+  """
+  if not value:
+    return None
+  try:
+    return max(0.0, float(value))
+  except ValueError:
+    pass
+  try:
+    when = parsedate_to_datetime(value)
+  except TypeError, ValueError:
+    return None
+  if when.tzinfo is None:
+    when = when.replace(tzinfo=timezone.utc)
+  return max(0.0, (when - datetime.now(timezone.utc)).total_seconds())
+
 
 def _run_auth_flow() -> None:
   """Background thread: device code flow → writes tokens to config.toml."""
@@ -201,11 +300,12 @@ def _run_auth_flow() -> None:
   try:
     client_id = _config_mod.get('trakt', 'client_id')
     client_secret = _config_mod.get('trakt', 'client_secret')
+    headers = {'Content-Type': 'application/json', 'User-Agent': user_agent()}
 
     r = requests.post(
       f'{_TRAKT_API_BASE}/oauth/device/code',
       json={'client_id': client_id},
-      headers={'Content-Type': 'application/json', 'User-Agent': user_agent()},
+      headers=headers,
       timeout=10,
     )
     r.raise_for_status()
@@ -219,15 +319,18 @@ def _run_auth_flow() -> None:
 
     logger.info('Trakt auth required. Go to %s and enter: %s', verification_url, user_code)
 
-    deadline = time.time() + expires_in
-    poll_interval = interval
+    deadline = time.monotonic() + expires_in
+    poll_interval: float = interval
+    # The poll body is identical on every attempt; serialize it once up front.
+    poll_body = json.dumps({'code': device_code, 'client_id': client_id, 'client_secret': client_secret}).encode()
 
-    while time.time() < deadline:
-      time.sleep(poll_interval)
+    while time.monotonic() < deadline:
+      # Never sleep past the device code's expiry.
+      time.sleep(min(poll_interval, max(0.0, deadline - time.monotonic())))
       r = requests.post(
         f'{_TRAKT_API_BASE}/oauth/device/token',
-        json={'code': device_code, 'client_id': client_id, 'client_secret': client_secret},
-        headers={'Content-Type': 'application/json', 'User-Agent': user_agent()},
+        data=poll_body,
+        headers=headers,
         timeout=10,
       )
       if r.status_code == 200:
@@ -235,8 +338,10 @@ def _run_auth_flow() -> None:
         logger.info('Trakt auth successful. Tokens saved to config.toml.')
         return
       elif r.status_code == 400:
-        logger.debug('Trakt: auth pending — waiting for user approval (poll_interval=%ds)', poll_interval)
-        continue  # pending — user hasn't approved yet
+        # Pending — user hasn't approved yet; poll progressively less often.
+        poll_interval = min(_AUTH_POLL_MAX_INTERVAL, poll_interval * _AUTH_POLL_BACKOFF)
+        logger.debug('Trakt: auth pending — waiting for user approval (poll_interval=%.0fs)', poll_interval)
+        continue
       elif r.status_code == 410:
         logger.error('Trakt auth code expired — restart the container to try again.')
         return
@@ -244,8 +349,16 @@ def _run_auth_flow() -> None:
         logger.error('Trakt auth denied — restart the container to try again.')
         return
       elif r.status_code == 429:
-        poll_interval = poll_interval * 2  # back off on rate limit
-        logger.debug('Trakt: auth rate-limited — backing off to %ds', poll_interval)
+        # Back off on rate limit, honouring the server's Retry-After if sent
+        # but never waiting beyond the device code's remaining lifetime.
+        retry_after = _parse_retry_after(r.headers.get('Retry-After'))
+        if retry_after is not None:
+          poll_interval = max(poll_interval, min(retry_after, deadline - time.monotonic()))
+        else:
+          poll_interval = min(_AUTH_POLL_MAX_INTERVAL, poll_interval * 2)
+        logger.debug('Trakt: auth rate-limited — backing off to %.0fs', poll_interval)
+      else:
+        poll_interval = interval
 
     logger.error('Trakt auth timed out — restart the container to try again.')
   except Exception as e:  # noqa: BLE001
@@ -272,14 +385,15 @@ def preflight() -> None:
     except ValueError:
       return
     secs_remaining = expires_at - time.time()
-    if secs_remaining < 86400:
+    if secs_remaining < _TOKEN_REFRESH_WINDOW:
       logger.info('Trakt: access token expires in %.0fs — refreshing at startup', secs_remaining)
-      try:
-        _refresh_token()
-      except requests.HTTPError as e:
-        logger.warning('Trakt: startup token refresh failed (%s) — clearing tokens', e)
-        _clear_tokens()
-        _ensure_authenticated()
+      with _token_lock:
+        try:
+          _refresh_token()
+        except requests.HTTPError as e:
+          logger.warning('Trakt: startup token refresh failed (%s) — clearing tokens', e)
+          _clear_tokens()
+          _ensure_authenticated()
 
 
 def _ensure_authenticated() -> None:
@@ -334,12 +448,12 @@ def get_variables_calendar() -> dict[str, list[list[str]]]:
 
   global _calendar_cache
 
-  today = datetime.now().strftime('%Y-%m-%d')
+  today = time.strftime('%Y-%m-%d')
   url = f'{_TRAKT_API_BASE}/calendars/my/shows/{today}/{days}'
   try:
     r = fetch_with_retry('GET', url, headers=_request_headers(token, client_id), timeout=10)
     if r.status_code == 401:
-      token = _handle_api_401()
+      token = _handle_api_401(token)
       r = fetch_with_retry('GET', url, headers=_request_headers(token, client_id), timeout=10)
     r.raise_for_status()
   except requests.RequestException as e:
@@ -356,16 +470,19 @@ def get_variables_calendar() -> dict[str, list[list[str]]]:
   if not entries:
     raise IntegrationDataUnavailableError('No upcoming episodes in calendar window')
 
+  # Single pass: parse each air time once and track the earliest future entry.
   now = datetime.now(timezone.utc)
-  future_entries = [
-    e for e in entries if e.get('first_aired') and datetime.fromisoformat(e['first_aired'].replace('Z', '+00:00')) > now
-  ]
-  if not future_entries:
+  entry = None
+  aired_dt = now
+  for e in entries:
+    if not e.get('first_aired'):
+      continue
+    dt = datetime.fromisoformat(e['first_aired'].replace('Z', '+00:00'))
+    if dt > now and (entry is None or dt < aired_dt):
+      entry, aired_dt = e, dt
+  if entry is None:
     raise IntegrationDataUnavailableError('No upcoming episodes in calendar window')
 
-  future_entries.sort(key=lambda e: e['first_aired'])
-  entry = future_entries[0]
-
   show_name = _vb.truncate_line(entry['show']['title'].upper(), _vb.model.cols, 'word')
   ep = entry['episode']
   episode_ref = _format_episode_ref(ep['season'], ep['number'])
@@ -373,7 +490,6 @@ def get_variables_calendar() -> dict[str, list[list[str]]]:
 
   # Convert UTC first_aired → display timezone (config [scheduler].timezone,
   # or system local if unset).
-  aired_dt = datetime.fromisoformat(entry['first_aired'].replace('Z', '+00:00'))
   local_dt = aired_dt.astimezone(_config_mod.get_timezone())
   air_day = local_dt.strftime('%a').upper()[:3]
   air_time = f'{local_dt.hour:02d}:{local_dt.minute:02d}'
@@ -427,7 +543,7 @@ def get_variables_watching() -> dict[str, list[list[str]]]:
   try:
     r = fetch_with_retry('GET', url, headers=_request_headers(token, client_id), timeout=10)
     if r.status_code == 401:
-      token = _handle_api_401()
+      token = _handle_api_401(token)
       r = fetch_with_retry('GET', url, headers=_request_headers(token, client_id), timeout=10)
   except requests.RequestException as e:
     raise IntegrationDataUnavailableError(f'Trakt: watching request failed — {e}') from None
@@ -512,7 +628,7 @@ def get_variables_next_up() -> dict[str, list[list[str]]]:
   try:
     r = fetch_with_retry('GET', watched_url, headers=_request_headers(token, client_id), timeout=10)
     if r.status_code == 401:
-      token = _handle_api_401()
+      token = _handle_api_401(token)
       r = fetch_with_retry('GET', watched_url, headers=_request_headers(token, client_id), timeout=10)
     r.raise_for_status()
   except requests.RequestException as e:
@@ -535,7 +651,7 @@ def get_variables_next_up() -> dict[str, list[list[str]]]:
     try:
       r2 = fetch_with_retry('GET', progress_url, headers=_request_headers(token, client_id), timeout=10)
       if r2.status_code == 401:
-        token = _handle_api_401()
+        token = _handle_api_401(token)
         r2 = fetch_with_retry('GET', progress_url, headers=_request_headers(token, client_id), timeout=10)
       r2.raise_for_status()
     except requests.RequestException as e:
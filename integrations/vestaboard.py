@@ -11,12 +11,14 @@
 # use the X-Vestaboard-Read-Write-Key header for authentication. A POST body
 # is a raw JSON array-of-arrays of integer character codes with no wrapper key.
 
+import functools
 import json
 import logging
 import random
 import re
 import time
 import unicodedata
+from collections.abc import Mapping, Sequence
 from enum import Enum
 from typing import Literal
 
@@ -29,11 +31,19 @@ logger = logging.getLogger(__name__)
 _HOST = 'https://rw.vestaboard.com'
 
 
+# Shared session so repeated reads and writes reuse the keep-alive connection
+# instead of repeating DNS resolution and the TLS handshake each call.
+_SESSION = requests.Session()
+
+
+@functools.lru_cache(maxsize=1)
 def _get_headers() -> dict[str, str]:
   """Return the auth headers for the Vestaboard API.
 
   Imports config inside the function so the module can be imported without a
-  config file present (e.g. in tests that don't exercise the API).
+  config file present (e.g. in tests that don't exercise the API). The result
+  is cached; call _get_headers.cache_clear() after changing the API key. The
+  returned dict is shared and must not be mutated.
   """
   import config as _config_mod
 
@@ -151,6 +161,35 @@ _CHAR_CODES: dict[str, int] = {ch: code for code, ch in enumerate(_CHAR_MAP) if
 _CHAR_CODES['❤️'] = 62  # U+2764 + U+FE0F variation selector
 _CHAR_CODES['°'] = 62  # degree sign on the Flagship (same code as ❤ on Note)
 
+# Characters that may begin a multi-char token (❤️, [X], [[X]]). Any other
+# character is always a single 1-wide token and can skip _next_token().
+_TOKEN_STARTS: frozenset[str] = frozenset('❤[')
+
+# Fast-path encoding for plain single characters in either case, so the
+# common case skips _next_token() and unicode normalization in _encode_char().
+_FAST_CODES: dict[str, int] = {ch: code for ch, code in _CHAR_CODES.items() if len(ch) == 1 and ch not in _TOKEN_STARTS}
+_FAST_CODES.update({ch.lower(): code for ch, code in _FAST_CODES.items() if ch.isalpha() and ch.isascii()})
+
+# _tokenize() entries for the same characters, shared rather than rebuilt.
+_FAST_TOKENS: dict[str, tuple[str, tuple[int, ...]]] = {ch: (ch, (code,)) for ch, code in _FAST_CODES.items()}
+
+# Vestaboard code for every ASCII character, indexed by ord() (0 = blank for
+# unknowns). Lets _encode_char() skip case folding and normalization for ASCII.
+_ASCII_CODES: bytes = bytes(_FAST_CODES.get(chr(i), 0) for i in range(128))
+
+# Whole-line tables for plain ASCII text (no '[' so no color tags), applied
+# with str.translate so the per-character work runs in C:
+#   _ASCII_ENCODE — every ASCII char → chr(code), unknowns → chr(0) (blank)
+#   _ASCII_STRIP  — deletes ASCII chars that have no display mapping
+_ASCII_ENCODE: dict[int, str] = {i: chr(code) for i, code in enumerate(_ASCII_CODES)}
+_ASCII_STRIP: dict[int, None] = {i: None for i in range(128) if chr(i) not in _FAST_CODES}
+
+
+def _is_plain_ascii(text: str) -> bool:
+  """Return True if text is ASCII with no '[' — every char is a 1-wide token."""
+  return text.isascii() and '[' not in text
+
+
 # Truncation strategy: how to shorten a line that exceeds model.cols.
 #   hard     — cut at the column limit, mid-word if necessary (default)
 #   word     — cut at the last full word that fits
@@ -185,16 +224,18 @@ def _next_token(text: str, i: int) -> tuple[str, int]:
     [[X]] escaped tag  — 3 display chars; encodes as literal [, X, ]
     any single char    — 1 display char
   """
-  if text[i : i + 2] == '❤️':
-    return ('❤️', 2)
-  tag3 = text[i : i + 3]
-  if tag3 in _COLOR_TAGS:
-    return (tag3, 3)
-  if (
-    text[i : i + 2] == '[[' and i + 4 < len(text) and f'[{text[i + 2]}]' in _COLOR_TAGS and text[i + 3 : i + 5] == ']]'
-  ):
-    return (text[i : i + 5], 5)
-  return (text[i], 1)
+  c = text[i]
+  # Peek at the first char so plain characters never pay for a slice.
+  if c == '❤':
+    if text[i + 1 : i + 2] == '\ufe0f':
+      return ('❤️', 2)
+  elif c == '[':
+    tag3 = text[i : i + 3]
+    if tag3 in _COLOR_TAGS:
+      return (tag3, 3)
+    if tag3[1:2] == '[' and i + 4 < len(text) and f'[{tag3[2]}]' in _COLOR_TAGS and text[i + 3 : i + 5] == ']]':
+      return (text[i : i + 5], 5)
+  return (c, 1)
 
 
 # --- Board color ---
@@ -208,12 +249,12 @@ class VestaboardColor(Enum):
 # --- Rendering ---
 
 
-def _display_char(code: int, color: VestaboardColor = VestaboardColor.BLACK) -> str:
+def _resolve_display_char(code: int, board: VestaboardModel, color: VestaboardColor) -> str:
   if code < len(_CHAR_MAP):
     ch = _CHAR_MAP[code]
     if ch == '❤':
       # Note: red heart. Flagship: degree sign (same code, different glyph).
-      return '\033[38;2;194;57;35m❤' if model is VestaboardModel.NOTE else '°'
+      return '\033[38;2;194;57;35m❤' if board is VestaboardModel.NOTE else '°'
     return ch
   color_idx = code - 63
   if 0 <= color_idx < len(_COLOR_DISPLAY):
@@ -223,17 +264,51 @@ def _display_char(code: int, color: VestaboardColor = VestaboardColor.BLACK) ->
   return '?'
 
 
+# Fully resolved display string for codes 0-71, per (model, board color).
+_DISPLAY: dict[tuple[VestaboardModel, VestaboardColor], tuple[str, ...]] = {
+  (board, color): tuple(_resolve_display_char(code, board, color) for code in range(72))
+  for board in VestaboardModel
+  for color in VestaboardColor
+}
+
+
+# render_grid cells per (model, board color): each _DISPLAY entry split into
+# its SGR color prefix ('' for plain glyphs) and the bare glyph, so a run of
+# same-colored cells needs only one escape sequence.
+_RENDER: dict[tuple[VestaboardModel, VestaboardColor], tuple[tuple[str, str], ...]] = {
+  key: tuple((d[:-1], d[-1]) if d.startswith('\033') else ('', d) for d in table) for key, table in _DISPLAY.items()
+}
+
+
+# render_grid top and bottom borders per model.
+_BORDERS: dict[VestaboardModel, tuple[str, str]] = {
+  m: (f'┌{"─" * (m.cols + 2)}┐', f'└{"─" * (m.cols + 2)}┘') for m in VestaboardModel
+}
+
+
 def render_grid(
-  grid: list[list[int]],
+  grid: Sequence[Sequence[int]],
   color: VestaboardColor = VestaboardColor.BLACK,
 ) -> str:
   """Render a character code grid as a bordered string for console output."""
-  bar = '─' * (model.cols + 2)
-  lines = [f'┌{bar}┐']
+  table = _RENDER[model, color]
+  n = len(table)
+  top, bottom = _BORDERS[model]
+  lines = [top]
   for row in grid:
-    cells = ''.join(f'{_display_char(x, color)}\033[0m' for x in row)
-    lines.append(f'│ {cells} │')
-  lines.append(f'└{bar}┘')
+    parts = ['│ ']
+    active = ''  # SGR prefix currently in effect
+    for x in row:
+      sgr, glyph = table[x] if 0 <= x < n else ('', '?')
+      if sgr != active:
+        parts.append(sgr or '\033[0m')
+        active = sgr
+      parts.append(glyph)
+    if active:
+      parts.append('\033[0m')
+    parts.append(' │')
+    lines.append(''.join(parts))
+  lines.append(bottom)
   return '\n'.join(lines)
 
 
@@ -263,7 +338,7 @@ class VestaboardState:
 
 def get_state(color: VestaboardColor = VestaboardColor.BLACK) -> VestaboardState:
   """Fetch and return the current board state."""
-  r = requests.get(_HOST, headers=_get_headers(), timeout=10)
+  r = _SESSION.get(_HOST, headers=_get_headers(), timeout=10)
   if r.status_code == 404:
     raise EmptyBoardError('board has no current message')
   try:
@@ -279,11 +354,31 @@ def get_state(color: VestaboardColor = VestaboardColor.BLACK) -> VestaboardState
 def _encode_char(ch: str) -> int:
   """Map a single character to its Vestaboard code (0 = blank if unknown).
 
+  ASCII characters are looked up directly in _ASCII_CODES. Anything else
+  goes through _encode_char_slow().
+  """
+  o = ord(ch)
+  if o < 128:
+    return _ASCII_CODES[o]
+  return _encode_char_slow(ch)
+
+
+@functools.lru_cache(maxsize=512)
+def _fold_char(ch: str) -> str:
+  """Return the uppercased lookup key for a single character.
+
   Accented and diacritic characters are normalized via NFKD decomposition
-  before lookup: ï → i, é → e, ñ → n, ü → u, etc.
+  and reduced to ASCII: ï → I, é → E, ñ → N, ü → U, etc. Characters that
+  normalize to nothing are returned uppercased as-is. Cached because the
+  same few non-ASCII characters tend to recur across renders.
   """
   normalized = unicodedata.normalize('NFKD', ch).encode('ascii', 'ignore').decode('ascii')
-  return _CHAR_CODES.get((normalized or ch).upper(), 0)
+  return (normalized or ch).upper()
+
+
+def _encode_char_slow(ch: str) -> int:
+  """Map a non-ASCII character to its Vestaboard code (0 = blank if unknown)."""
+  return _CHAR_CODES.get(_fold_char(ch), 0)
 
 
 def _strip_unsupported(text: str) -> str:
@@ -295,6 +390,8 @@ def _strip_unsupported(text: str) -> str:
   Multiple spaces produced by stripping are collapsed to one, and
   leading/trailing whitespace is removed.
   """
+  if _is_plain_ascii(text):
+    return re.sub(r' +', ' ', text.translate(_ASCII_STRIP)).strip()
   tokens: list[str] = []
   i = 0
   while i < len(text):
@@ -303,13 +400,43 @@ def _strip_unsupported(text: str) -> str:
     if tok in (' ', '❤️') or tok in _COLOR_TAGS or len(tok) == 5:  # space, emoji, color tag, escaped tag
       tokens.append(tok)
     else:
-      normalized = unicodedata.normalize('NFKD', tok).encode('ascii', 'ignore').decode('ascii')
-      if (normalized or tok).upper() in _CHAR_CODES:
+      if _fold_char(tok) in _CHAR_CODES:
         tokens.append(tok)
       # else: drop — no mapping exists (hiragana, katakana, CJK, etc.)
   return re.sub(r' +', ' ', ''.join(tokens)).strip()
 
 
+@functools.lru_cache(maxsize=256)
+def _tokenize(text: str) -> tuple[tuple[str, tuple[int, ...]], ...]:
+  """Split text into (raw_token, codes) pairs in a single scan.
+
+  A token's display width is len(codes): ❤️ and color tags encode to one
+  code, escaped color tags to three. display_len(), truncate_line() and
+  _encode_line() share this cached result, so a line that is measured
+  while wrapping is not re-scanned when it is encoded.
+  """
+  tokens: list[tuple[str, tuple[int, ...]]] = []
+  i = 0
+  while i < len(text):
+    fast = _FAST_TOKENS.get(text[i])
+    if fast is not None:
+      tokens.append(fast)
+      i += 1
+      continue
+    tok, consumed = _next_token(text, i)
+    i += consumed
+    if tok == '❤️':
+      codes: tuple[int, ...] = (62,)
+    elif tok in _COLOR_TAGS:
+      codes = (_COLOR_TAGS[tok],)
+    elif len(tok) == 5:  # escaped color tag [[X]]: literal [, X, ]
+      codes = tuple(_encode_char(ch) for ch in ('[', tok[2], ']'))
+    else:
+      codes = (_encode_char(tok),)
+    tokens.append((tok, codes))
+  return tuple(tokens)
+
+
 def _encode_line(text: str) -> list[int]:
   """Encode a text string into a row of model.cols integer character codes.
 
@@ -319,25 +446,46 @@ def _encode_line(text: str) -> list[int]:
   model.cols characters and zero-padded on the right.
   """
   cols = model.cols
-  codes: list[int] = []
-  i = 0
-  while i < len(text) and len(codes) < cols:
-    tok, consumed = _next_token(text, i)
-    i += consumed
-    if tok == '❤️':
-      codes.append(62)
-    elif tok in _COLOR_TAGS:
-      codes.append(_COLOR_TAGS[tok])
-    elif len(tok) == 5:  # escaped color tag [[X]]: emit [, X, ] individually
-      for ch in ('[', tok[2], ']'):
-        if len(codes) < cols:
-          codes.append(_encode_char(ch))
-    else:
-      codes.append(_encode_char(tok))
+  if _is_plain_ascii(text):
+    codes = list(text[:cols].translate(_ASCII_ENCODE).encode('ascii'))
+    return codes + [0] * (cols - len(codes))
+  codes = [code for _, tok_codes in _tokenize(text) for code in tok_codes][:cols]
   codes += [0] * (cols - len(codes))
   return codes
 
 
+def _is_var_name(name: str) -> bool:
+  """Return True if name is one or more word characters (letters, digits, _)."""
+  return name.replace('_', '0').isalnum()
+
+
+def _substitute_inline(entry: str, chosen: Mapping[str, Sequence[str]]) -> str:
+  """Replace each inline {name} in entry with the first line of its chosen option.
+
+  Scans for brace pairs with str.find rather than a regex. Brace pairs whose
+  contents are not a valid name are left as literal text. Unknown names
+  substitute as ''.
+  """
+  parts: list[str] = []
+  pos = 0
+  start = entry.find('{')
+  while start != -1:
+    end = entry.find('}', start + 1)
+    if end == -1:
+      break
+    name = entry[start + 1 : end]
+    if not _is_var_name(name):
+      start = entry.find('{', start + 1)
+      continue
+    opt = chosen.get(name, [''])
+    parts.append(entry[pos:start])
+    parts.append(opt[0] if opt else '')
+    pos = end + 1
+    start = entry.find('{', pos)
+  parts.append(entry[pos:])
+  return ''.join(parts)
+
+
 def _expand_format(
   fmt: list[str],
   variables: dict[str, list],
@@ -356,24 +504,43 @@ def _expand_format(
   triggering variable substitution. Color tag escaping is handled by
   _encode_line (see [[X]] in _next_token).
   """
-  chosen: dict[str, list[str]] = {name: random.choice(options) for name, options in variables.items()}  # nosec B311
+  return _expand_chosen(fmt, _choose_options(variables))
 
-  def _sub(match: re.Match[str]) -> str:
-    opt = chosen.get(match.group(1), [''])
-    return opt[0] if opt else ''
 
+def _choose_options(variables: dict[str, list]) -> dict[str, list[str]]:
+  """Pick one option at random for each variable."""
+  return {name: random.choice(options) for name, options in variables.items()}  # nosec B311
+
+
+def _expand_chosen(
+  fmt: Sequence[str],
+  chosen: Mapping[str, Sequence[str]],
+) -> list[str]:
+  """Expand a format list using already-chosen variable options."""
   lines: list[str] = []
   for entry in fmt:
-    # Replace escaped braces with sentinels so they survive regex processing.
-    entry = entry.replace('{{', _ESC_BRACE_OPEN).replace('}}', _ESC_BRACE_CLOSE)
-    m = re.fullmatch(r'\{(\w+)\}', entry.strip())
-    if m:
+    if '{' not in entry and '}' not in entry:
+      # Literal line: no variables or escaped braces to process.
+      lines.append(entry)
+      continue
+    # Replace escaped braces with sentinels so they survive substitution.
+    escaped = False
+    if '{{' in entry:
+      entry = entry.replace('{{', _ESC_BRACE_OPEN)
+      escaped = True
+    if '}}' in entry:
+      entry = entry.replace('}}', _ESC_BRACE_CLOSE)
+      escaped = True
+    stripped = entry.strip()
+    if stripped[:1] == '{' and stripped[-1:] == '}' and _is_var_name(stripped[1:-1]):
       # Whole-line variable: expand to all lines of the chosen option.
-      lines.extend(chosen.get(m.group(1), ['']))
+      lines.extend(chosen.get(stripped[1:-1], ['']))
     else:
       # Inline substitution: use first line of the chosen option.
-      result = re.sub(r'\{(\w+)\}', _sub, entry)
-      lines.append(result.replace(_ESC_BRACE_OPEN, '{').replace(_ESC_BRACE_CLOSE, '}'))
+      result = _substitute_inline(entry, chosen)
+      if escaped:
+        result = result.replace(_ESC_BRACE_OPEN, '{').replace(_ESC_BRACE_CLOSE, '}')
+      lines.append(result)
 
   return lines
 
@@ -383,13 +550,9 @@ def display_len(text: str) -> int:
 
   Escaped color tags (e.g. [[G]]) count as 3 display chars (literal [, G, ]).
   """
-  count = 0
-  i = 0
-  while i < len(text):
-    tok, consumed = _next_token(text, i)
-    i += consumed
-    count += 3 if len(tok) == 5 else 1
-  return count
+  if '[' not in text and '❤' not in text:
+    return len(text)
+  return sum(len(codes) for _, codes in _tokenize(text))
 
 
 def truncate_line(
@@ -410,21 +573,25 @@ def truncate_line(
   """
   if display_len(text) <= max_cols:
     return text
-  target = max_cols - (3 if strategy == 'ellipsis' else 0)
+  target = max(max_cols - (3 if strategy == 'ellipsis' else 0), 0)
+  if '[' not in text and '❤' not in text:
+    # No multi-char tokens: every char is one column, so slice directly.
+    head = text[:target]
+    if strategy == 'ellipsis':
+      return head + '...'
+    if strategy == 'word' and (space := head.rfind(' ')) >= 0:
+      return head[:space]
+    return head
   result: list[str] = []
   last_word_end = -1  # len(result) just before the most recent space
   count = 0
-  i = 0
-  while i < len(text) and count < target:
-    tok, consumed = _next_token(text, i)
-    tok_display = 3 if len(tok) == 5 else 1
-    if count + tok_display > target:
+  for tok, codes in _tokenize(text):
+    if count + len(codes) > target:
       break
-    if tok_display == 1 and tok == ' ' and strategy == 'word':
+    if tok == ' ' and strategy == 'word':
       last_word_end = len(result)
     result.append(tok)
-    i += consumed
-    count += tok_display
+    count += len(codes)
   if strategy == 'ellipsis':
     return ''.join(result) + '...'
   if strategy == 'hard' or last_word_end < 0:
@@ -492,11 +659,27 @@ def _build_grid(lines: list[str]) -> list[list[int]]:
   Missing rows are filled with blanks.
   """
   grid = [_encode_line(line) for line in lines[: model.rows]]
-  while len(grid) < model.rows:
-    grid.append([0] * model.cols)
+  grid += [[0] * model.cols for _ in range(model.rows - len(grid))]
   return grid
 
 
+@functools.lru_cache(maxsize=64)
+def _render(
+  fmt: tuple[str, ...],
+  chosen: tuple[tuple[str, tuple[str, ...]], ...],
+  truncation: TruncationStrategy,
+  board: VestaboardModel,
+) -> tuple[bytes, ...]:
+  """Expand, wrap and encode a template with already-chosen options.
+
+  Pure apart from the active model, which is part of the cache key, so
+  repeated picks of the same template and options skip re-encoding. Rows
+  are stored as bytes (codes are all < 256) to keep cached grids compact.
+  """
+  lines = _wrap_lines(_expand_chosen(fmt, dict(chosen)), truncation)
+  return tuple(bytes(row) for row in _build_grid(lines))
+
+
 # --- Writing ---
 
 _RATE_LIMIT_RETRIES = 3  # retries after the initial attempt (4 total)
@@ -529,12 +712,19 @@ def set_state(
   retry. All other HTTP errors raise requests.exceptions.HTTPError.
   """
   template = random.choice(templates)  # nosec B311
-  lines = _expand_format(template['format'], variables)
-  lines = _wrap_lines(lines, truncation)
-  grid = _build_grid(lines)
-  logger.debug(render_grid(grid))
+  chosen = _choose_options(variables)
+  rendered = _render(
+    tuple(template['format']),
+    tuple((name, tuple(opt)) for name, opt in chosen.items()),
+    truncation,
+    model,
+  )
+  logger.debug(render_grid(rendered))
+  # Encode once, compactly, rather than letting requests re-encode the grid
+  # with default separators on every retry.
+  body = json.dumps([list(row) for row in rendered], separators=(',', ':'))
   for attempt in range(1 + _RATE_LIMIT_RETRIES):
-    r = requests.post(_HOST, json=grid, headers=_get_headers(), timeout=10)
+    r = _SESSION.post(_HOST, data=body, headers=_get_headers(), timeout=10)
     if r.status_code == 409:
       raise DuplicateContentError('board already shows this content')
     if r.status_code == 423:
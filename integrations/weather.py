@@ -5,7 +5,9 @@
 # Fetches current weather for a configured city using the Open-Meteo forecast
 # API (no API key required). The city is forward-geocoded to coordinates on
 # first call using the Open-Meteo geocoding API; both the coordinates and the
-# canonical city name from the API response are cached for the process lifetime.
+# canonical city name from the API response are cached for the process lifetime
+# and persisted to $XDG_CACHE_HOME/e-note-ion/geocode.json (best-effort) so a
+# restart does not have to geocode again.
 #
 # Required config.toml keys ([weather]):
 #   city   — City name, optionally with a state or country suffix to
@@ -17,10 +19,16 @@
 # Optional config.toml keys:
 #   units  — "imperial" (°F, mph, default) or "metric" (°C, km/h)
 
+import json
 import logging
+import os
+import threading
+from concurrent.futures import Future
+from pathlib import Path
 from typing import Any
 
 import requests
+from requests.adapters import HTTPAdapter
 
 from exceptions import IntegrationDataUnavailableError
 from integrations.http import CacheEntry, fetch_with_retry, user_agent
@@ -30,6 +38,10 @@ logger = logging.getLogger(__name__)
 _GEOCODING_URL = 'https://geocoding-api.open-meteo.com/v1/search'
 _FORECAST_URL = 'https://api.open-meteo.com/v1/forecast'
 
+# Forecast fields requested from Open-Meteo.
+_CURRENT_FIELDS = 'temperature_2m,apparent_temperature,weather_code,wind_speed_10m,precipitation_probability'
+_DAILY_FIELDS = 'temperature_2m_max,temperature_2m_min'
+
 # WMO weather interpretation codes → (condition string, color tag).
 # Condition strings are kept ≤ 13 chars so they fit within Note's 15 cols
 # after a leading color tag and space (e.g. "[Y] MOSTLY CLEAR" = 16 chars —
@@ -65,6 +77,10 @@ _WMO_CONDITIONS: dict[int, tuple[str, str]] = {
   99: ('STORM + HAIL', '[R]'),
 }
 
+# Rendered '{color_tag} {condition}' strings for get_variables, built once.
+_WMO_RENDERED: dict[int, str] = {code: f'{tag} {name}' for code, (name, tag) in _WMO_CONDITIONS.items()}
+_WMO_UNKNOWN = '[K] UNKNOWN'
+
 # US state/territory abbreviations — used to detect "City, ST" notation and
 # narrow geocoding requests to the United States.
 _US_STATE_CODES: frozenset[str] = frozenset(
@@ -127,11 +143,43 @@ _US_STATE_CODES: frozenset[str] = frozenset(
 # None = not yet populated.
 _geocode_cache: tuple[float, float, str] | None = None
 
+# On-disk geocoding cache: {normalized city config: [lat, lon, canonical_name]}.
+# Read on an in-process cache miss; written after each successful geocode.
+_GEOCODE_CACHE_PATH = Path(os.environ.get('XDG_CACHE_HOME') or Path.home() / '.cache') / 'e-note-ion' / 'geocode.json'
+
+# Config-derived settings, read on the first get_variables() call:
+# (city_config, units, temperature_unit, wind_speed_unit). Cleared by
+# reset_cache().
+_config_cache: tuple[str, str, str, str] | None = None
+
+# Shared session for Open-Meteo requests, created on first use. Keeps the
+# geocoding and forecast connections alive between scheduler ticks instead of
+# repeating the TCP and TLS handshakes. Retries stay in fetch_with_retry.
+# Geocoding and forecast live on different hosts, so HTTP/2 multiplexing would
+# not let them share a connection; urllib3 already sets TCP_NODELAY. Only one
+# fetch is in flight at a time (see _inflight), so one pooled connection per
+# host suffices.
+_session: requests.Session | None = None
+
 # Last-known-good cache for forecast data. Served on transient API failures
 # if the entry is within _FORECAST_CACHE_TTL seconds of its fetch time.
 _forecast_cache: CacheEntry | None = None
 _FORECAST_CACHE_TTL = 4 * 3600  # 4 hours
 
+# Short-lived memo of the last successful forecast, keyed by
+# (lat, lon, units). Open-Meteo's current conditions only update about every
+# 15 minutes, so templates firing within _FORECAST_MEMO_TTL seconds of each
+# other share one fetch. Unlike _forecast_cache, this is served before any
+# request is made.
+_forecast_memo: tuple[tuple[float, float, str], CacheEntry] | None = None
+_FORECAST_MEMO_TTL = 600  # 10 minutes
+
+# The fetch currently running, if any. Concurrent get_variables calls wait on
+# it instead of starting their own, then see its memo entry. _fetch_lock only
+# guards checking and setting _inflight; the fetch itself runs outside it.
+_inflight: Future[dict[str, list[list[str]]]] | None = None
+_fetch_lock = threading.Lock()
+
 
 def _parse_city_config(city_config: str) -> tuple[str, str | None]:
   """Parse a city config string into (query_name, country_code).
@@ -173,7 +221,7 @@ def _geocode(city_query: str, country_code: str | None) -> tuple[float, float, s
   if country_code:
     params['countryCode'] = country_code
   try:
-    r = fetch_with_retry('GET', _GEOCODING_URL, params=params, headers={'User-Agent': user_agent()}, timeout=10)
+    r = fetch_with_retry('GET', _GEOCODING_URL, session=_get_session(), params=params, timeout=10)
   except requests.RequestException as e:
     logger.warning('Weather: geocoding request failed — %s', e)
     raise IntegrationDataUnavailableError(f'Weather: geocoding request failed — {e}') from None
@@ -195,12 +243,96 @@ def _geocode(city_query: str, country_code: str | None) -> tuple[float, float, s
   return lat, lon, name
 
 
-def _wmo_condition(code: int) -> tuple[str, str]:
-  """Return (condition_string, color_tag) for a WMO weather code.
+def _get_config() -> tuple[str, str, str, str]:
+  """Return (city_config, units, temp_unit, wind_unit), reading config once."""
+  global _config_cache
+  if _config_cache is None:
+    import config as _config_mod
+
+    city_config = _config_mod.get('weather', 'city')
+    units = _config_mod.get_optional('weather', 'units') or 'imperial'
+    # Select unit system parameters for Open-Meteo.
+    if units == 'imperial':
+      _config_cache = (city_config, units, 'fahrenheit', 'mph')
+    else:
+      _config_cache = (city_config, units, 'celsius', 'kmh')
+  return _config_cache
+
+
+# Forecast query params per (lat, lon, temp_unit, wind_unit); the location and
+# units rarely change, so each tick reuses the same dict.
+_params_memo: dict[tuple[float, float, str, str], dict[str, Any]] = {}
+
+
+def _forecast_params(lat: float, lon: float, temp_unit: str, wind_unit: str) -> dict[str, Any]:
+  """Return the (shared, not to be mutated) forecast query params."""
+  key = (lat, lon, temp_unit, wind_unit)
+  params = _params_memo.get(key)
+  if params is None:
+    params = _params_memo[key] = {
+      'latitude': lat,
+      'longitude': lon,
+      'current': _CURRENT_FIELDS,
+      'daily': _DAILY_FIELDS,
+      'temperature_unit': temp_unit,
+      'wind_speed_unit': wind_unit,
+      'forecast_days': 1,
+      'timezone': 'auto',
+    }
+  return params
+
+
+def reset_cache() -> None:
+  """Forget cached config and geocoding so the next call re-reads config.toml."""
+  global _config_cache, _geocode_cache
+  _config_cache = None
+  _geocode_cache = None
+
+
+def _get_session() -> requests.Session:
+  """Return the shared Open-Meteo session, creating it on first call."""
+  global _session
+  if _session is None:
+    _session = requests.Session()
+    _session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=1))
+    _session.headers['User-Agent'] = user_agent()
+  return _session
+
+
+def _read_geocode_file() -> dict[str, Any]:
+  """Return the on-disk geocoding cache, or {} if it is missing or unreadable."""
+  try:
+    data = json.loads(_GEOCODE_CACHE_PATH.read_text())
+  except OSError, ValueError:
+    return {}
+  return data if isinstance(data, dict) else {}
 
-  Falls back to ('UNKNOWN', '[K]') for unrecognised codes.
-  """
-  return _WMO_CONDITIONS.get(code, ('UNKNOWN', '[K]'))
+
+def _write_geocode_file(entries: dict[str, Any]) -> None:
+  """Atomically write the on-disk geocoding cache. Failures are logged and ignored."""
+  tmp = _GEOCODE_CACHE_PATH.with_name(_GEOCODE_CACHE_PATH.name + '.tmp')
+  try:
+    _GEOCODE_CACHE_PATH.parent.mkdir(parents=True, exist_ok=True)
+    tmp.write_text(json.dumps(entries))
+    os.replace(tmp, _GEOCODE_CACHE_PATH)
+  except OSError as e:
+    logger.debug('Weather: could not write geocode cache %s — %s', _GEOCODE_CACHE_PATH, e)
+
+
+def _cached_geocode(city_config: str) -> tuple[float, float, str]:
+  """Resolve city_config via the on-disk cache, geocoding and storing on a miss."""
+  key = city_config.lower().strip()
+  entries = _read_geocode_file()
+  try:
+    lat, lon, name = entries[key]
+    return float(lat), float(lon), str(name)
+  except KeyError, TypeError, ValueError:
+    pass
+  city_query, country_code = _parse_city_config(city_config)
+  lat, lon, name = _geocode(city_query, country_code)
+  entries[key] = [lat, lon, name]
+  _write_geocode_file(entries)
+  return lat, lon, name
 
 
 def _fmt_temp(value: float, units: str) -> str:
@@ -221,60 +353,67 @@ def get_variables() -> dict[str, list[list[str]]]:
   Returns keys: city, condition, temp, feels_like, high, low, wind, precip.
   Each value is a single-option list (no randomness — data is always current).
 
-  The geocoding result is cached in-process on first call. The canonical city
+  The geocoding result is cached in-process on first call, and on disk across
+  restarts (see _GEOCODE_CACHE_PATH). The canonical city
   name from the API response is always used for the {city} variable, regardless
   of what was typed in config.toml.
 
-  On transient API failure, returns the last-known-good forecast if it is
+  A successful forecast is reused without a request for _FORECAST_MEMO_TTL
+  seconds. On transient API failure, returns the last-known-good forecast if it is
   within _FORECAST_CACHE_TTL. Raises IntegrationDataUnavailableError on cold
   start or when the cache has expired.
+
+  A call made while another is fetching waits for that fetch and returns its
+  result (or raises its error), so sibling weather jobs fired in the same
+  minute share one request instead of each racing to the API.
   """
-  global _geocode_cache, _forecast_cache
+  global _inflight
+  with _fetch_lock:
+    future = _inflight
+    if future is None:
+      future = _inflight = Future()
+      owner = True
+    else:
+      owner = False
+  if not owner:
+    return future.result()
+
+  try:
+    result = _get_variables()
+  except BaseException as e:
+    future.set_exception(e)
+    raise
+  else:
+    future.set_result(result)
+    return result
+  finally:
+    with _fetch_lock:
+      _inflight = None
 
-  import config as _config_mod
 
-  city_config = _config_mod.get('weather', 'city')
-  units = _config_mod.get_optional('weather', 'units') or 'imperial'
+def _get_variables() -> dict[str, list[list[str]]]:
+  global _geocode_cache, _forecast_cache, _forecast_memo
+
+  city_config, units, temp_unit, wind_unit = _get_config()
 
   if _geocode_cache is None:
-    city_query, country_code = _parse_city_config(city_config)
-    lat, lon, canonical_city = _geocode(city_query, country_code)
+    lat, lon, canonical_city = _cached_geocode(city_config)
     _geocode_cache = (lat, lon, canonical_city)
   else:
     lat, lon, canonical_city = _geocode_cache
     logger.debug('Weather: geocode cache hit for %r', canonical_city)
 
-  # Select unit system parameters for Open-Meteo.
-  if units == 'imperial':
-    temp_unit = 'fahrenheit'
-    wind_unit = 'mph'
-  else:
-    temp_unit = 'celsius'
-    wind_unit = 'kmh'
+  memo_key = (round(lat, 3), round(lon, 3), units)
+  if _forecast_memo is not None and _forecast_memo[0] == memo_key and _forecast_memo[1].is_valid(_FORECAST_MEMO_TTL):
+    logger.debug('Weather: forecast memo hit for %r', canonical_city)
+    return _forecast_memo[1].value
 
   try:
     r = fetch_with_retry(
       'GET',
       _FORECAST_URL,
-      headers={'User-Agent': user_agent()},
-      params={
-        'latitude': lat,
-        'longitude': lon,
-        'current': ','.join(
-          [
-            'temperature_2m',
-            'apparent_temperature',
-            'weather_code',
-            'wind_speed_10m',
-            'precipitation_probability',
-          ]
-        ),
-        'daily': 'temperature_2m_max,temperature_2m_min',
-        'temperature_unit': temp_unit,
-        'wind_speed_unit': wind_unit,
-        'forecast_days': 1,
-        'timezone': 'auto',
-      },
+      session=_get_session(),
+      params=_forecast_params(lat, lon, temp_unit, wind_unit),
       timeout=10,
     )
     r.raise_for_status()
@@ -289,8 +428,7 @@ def get_variables() -> dict[str, list[list[str]]]:
   daily: dict[str, Any] = data['daily']
 
   wmo_code = int(current['weather_code'])
-  condition_str, color_tag = _wmo_condition(wmo_code)
-  condition = f'{color_tag} {condition_str}'
+  condition = _WMO_RENDERED.get(wmo_code, _WMO_UNKNOWN)
 
   precip_raw = current.get('precipitation_probability')
   precip = f'{round(precip_raw)}%' if precip_raw is not None else '0%'
@@ -307,4 +445,5 @@ def get_variables() -> dict[str, list[list[str]]]:
   }
   logger.debug('Weather: fetched forecast for %r (WMO=%d)', canonical_city, wmo_code)
   _forecast_cache = CacheEntry(result)
+  _forecast_memo = (memo_key, _forecast_cache)
   return result
@@ -14,31 +14,37 @@
 # Display model, public mode, and content selection are configured in
 # config.toml under [scheduler].
 
-import email.message
-import email.parser
+import contextlib
+import functools
 import heapq
 import importlib
-import importlib.metadata
+import itertools
 import json
 import logging
+import os
+import re
 import secrets
+import signal
+import stat
 import sys
 import threading
 import time
-from collections.abc import Callable
-from dataclasses import dataclass
-from datetime import datetime
-from http.server import BaseHTTPRequestHandler, HTTPServer
+import weakref
+from collections.abc import Callable, Generator
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass, replace
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
 from pathlib import Path
-from queue import Empty, PriorityQueue
 from typing import Any
 from urllib.parse import parse_qs, urlparse
 
+from apscheduler.jobstores.base import JobLookupError
 from apscheduler.schedulers.background import BackgroundScheduler
 
 import config as _config_mod
 import integrations.vestaboard as vestaboard
 from exceptions import IntegrationDataUnavailableError
+from integrations.http import app_version
 
 # When run via `python scheduler.py` or the `e-note-ion` entry point, Python
 # loads this module as __main__. Integrations that do `import scheduler` (e.g.
@@ -69,34 +75,38 @@ _KNOWN_INTEGRATIONS: frozenset[str] = frozenset(
   {'bart', 'calendar', 'discogs', 'moon', 'morning', 'notion', 'plex', 'trakt', 'weather'}
 )
 
-# Cache of loaded integration modules, keyed by name.
-_integrations: dict[str, Any] = {}
-
 
 def _get_integration(name: str) -> Any:
   if name not in _KNOWN_INTEGRATIONS:
     raise ValueError(f'Unknown integration: {name!r}')
-  if name not in _integrations:
-    logger.debug('loading integration %r', name)
-    try:
-      _integrations[name] = importlib.import_module(f'integrations.{name}')
-    except ImportError as e:
-      raise RuntimeError(
-        f'Integration {name!r} is missing dependencies. '
-        f'Install them with: pip install -r integrations/{name}.requirements.txt'
-      ) from e
-  else:
-    logger.debug('integration %r already cached', name)
-  return _integrations[name]
+  return _load_integration(name)
+
+
+# Loaded integration modules, keyed by name. Only called with allowlisted
+# names. load_content() validates every integration template, so each module
+# is imported once at startup and later calls are cache hits. The allowlist
+# check in _get_integration must stay ahead of any cache lookup (including a
+# sys.modules probe): helpers such as integrations.http are imported too and
+# must not be reachable by name.
+@functools.lru_cache(maxsize=None)
+def _load_integration(name: str) -> Any:
+  logger.debug('loading integration %r', name)
+  try:
+    return importlib.import_module(f'integrations.{name}')
+  except ImportError as e:
+    raise RuntimeError(
+      f'Integration {name!r} is missing dependencies. '
+      f'Install them with: pip install -r integrations/{name}.requirements.txt'
+    ) from e
 
 
 # --- Message ---
 
-_counter = 0
-_counter_lock = threading.Lock()
+# Tie-break sequence for QueuedMessage.seq; next() on a count is atomic in CPython.
+_next_seq = itertools.count().__next__
 
 
-@dataclass
+@dataclass(slots=True)
 class QueuedMessage:
   # Represents a pending display message waiting in the priority queue.
   # `seq` is a monotonically increasing counter used to break priority ties
@@ -110,9 +120,17 @@ class QueuedMessage:
   timeout: int  # seconds message can wait in queue before being discarded
   indefinite: bool = False  # if True, hold runs until explicitly interrupted
   supersede_tag: str = ''  # if non-empty, enqueue() removes earlier same-tagged messages first
+  deadline: float = 0.0  # always set to scheduled_at + timeout; discarded once passed
+  scheduled_wall: float = 0.0  # time.time() at enqueue, for logging; derived if unset
+  superseded: bool = False  # set when a newer same-tagged message replaces this one; skipped on pop
+
+  def __post_init__(self) -> None:
+    self.deadline = self.scheduled_at + self.timeout
+    if not self.scheduled_wall:
+      self.scheduled_wall = time.time() - (time.monotonic() - self.scheduled_at)
 
   def __lt__(self, other: 'QueuedMessage') -> bool:
-    # PriorityQueue is a min-heap, so we invert priority comparison so that
+    # The queue is a min-heap, so we invert priority comparison so that
     # higher numeric priority values are popped first.
     if self.priority != other.priority:
       return self.priority > other.priority  # higher priority = first
@@ -141,8 +159,98 @@ class WebhookMessage:
 # --- Priority Queue ---
 
 # Single shared queue consumed by the worker thread. Messages are pushed here
-# by APScheduler's background threads when their cron triggers fire.
-_queue: PriorityQueue[QueuedMessage] = PriorityQueue()
+# by APScheduler's background threads when their cron triggers fire. It is a
+# heapq list ordered by QueuedMessage.__lt__; every access must hold
+# _queue_cv, which producers notify so the worker can block rather than poll.
+#
+# Superseded messages are not removed from the heap right away: enqueue marks
+# them (QueuedMessage.superseded) via the _tagged index and they are skipped
+# when reached, so a supersede costs O(tagged) instead of an O(n) rebuild.
+# _superseded counts these tombstones; the heap is compacted once they make
+# up more than half of it.
+#
+# Expired messages are likewise dropped lazily as they reach the top of the
+# heap on pop. The heap is ordered by priority, not deadline, so expired
+# low-priority messages can sit below live ones; enqueue compacts once the
+# heap has doubled since the last compaction, and pop compacts after
+# _EXPIRED_COMPACT_THRESHOLD expired drops in a row. Both keep memory bounded
+# without scanning the heap on every call.
+_QUEUE_COMPACT_MIN = 16  # never compact on push below this many entries
+_EXPIRED_COMPACT_THRESHOLD = 8  # consecutive expired pops before compacting the rest
+
+_queue: list[QueuedMessage] = []
+_queue_cv = threading.Condition(threading.Lock())  # never re-entered; a plain Lock is cheaper than RLock
+_tagged: dict[str, list[QueuedMessage]] = {}  # live queued messages by supersede_tag
+_superseded = 0
+_compact_at = _QUEUE_COMPACT_MIN  # heap size at which enqueue next compacts
+_last_arrival = 0.0  # latest scheduled_at pushed, for the coalesce window
+
+
+def _has_live() -> bool:
+  """Return True if the queue holds any non-superseded message. Caller must hold _queue_cv."""
+  return len(_queue) > _superseded
+
+
+def _head() -> QueuedMessage | None:
+  """Return the best live message without removing it. Caller must hold _queue_cv."""
+  global _superseded
+  while _queue and _queue[0].superseded:
+    heapq.heappop(_queue)
+    _superseded -= 1
+  return _queue[0] if _queue else None
+
+
+def _untrack(msg: QueuedMessage) -> None:
+  """Remove msg from the _tagged index once it leaves the queue. Caller must hold _queue_cv."""
+  tag = msg.supersede_tag
+  if tag and tag in _tagged:
+    live = [m for m in _tagged[tag] if m is not msg]
+    if live:
+      _tagged[tag] = live
+    else:
+      del _tagged[tag]
+
+
+def _discard(m: QueuedMessage, now: float) -> None:
+  """Log and untrack an expired message. Caller must hold _queue_cv."""
+  logger.warning('Discarding %s (waited %.1fs, timeout=%ds)', m.name, now - m.scheduled_at, m.timeout)
+  _untrack(m)
+
+
+def _compact(now: float) -> None:
+  """Rebuild the heap without superseded or expired messages. Caller must hold _queue_cv."""
+  global _superseded, _compact_at
+  kept: list[QueuedMessage] = []
+  for m in _queue:
+    if m.superseded:
+      continue
+    if m.deadline < now:
+      _discard(m, now)
+    else:
+      kept.append(m)
+  _queue[:] = kept
+  _superseded = 0
+  _compact_at = max(_QUEUE_COMPACT_MIN, 2 * len(_queue))
+  heapq.heapify(_queue)
+
+
+def _push(msg: QueuedMessage) -> None:
+  """Push msg onto the queue and wake the worker. Caller must hold _queue_cv."""
+  global _last_arrival
+  heapq.heappush(_queue, msg)
+  _last_arrival = max(_last_arrival, msg.scheduled_at)
+  if msg.supersede_tag:
+    _tagged.setdefault(msg.supersede_tag, []).append(msg)
+  _queue_cv.notify()
+  if msg.priority >= _INTERRUPT_PRIORITY_THRESHOLD:
+    # A hold may now be preemptible; let it re-check instead of polling.
+    _hold_wake.set()
+
+
+def _put(msg: QueuedMessage) -> None:
+  """Push msg onto the queue and wake the worker."""
+  with _queue_cv:
+    _push(msg)
 
 
 def enqueue(
@@ -154,16 +262,12 @@ def enqueue(
   indefinite: bool = False,
   supersede_tag: str = '',
 ) -> None:
-  global _counter
-  with _counter_lock:
-    seq = _counter
-    _counter += 1
-
   msg = QueuedMessage(
     priority=priority,
-    seq=seq,
+    seq=_next_seq(),
     name=name,
     scheduled_at=time.monotonic(),
+    scheduled_wall=time.time(),
     data=data,
     hold=hold,
     timeout=timeout,
@@ -171,58 +275,69 @@ def enqueue(
     supersede_tag=supersede_tag,
   )
 
-  if supersede_tag:
-    with _queue.mutex:
-      before = len(_queue.queue)
-      _queue.queue[:] = [m for m in _queue.queue if m.supersede_tag != supersede_tag]
-      removed = before - len(_queue.queue)
-      if removed:
-        heapq.heapify(_queue.queue)
-        logger.debug('supersede removed %d queued message(s) with tag %r', removed, supersede_tag)
-
-  logger.debug('enqueued %s (priority=%d, seq=%d, hold=%ds, timeout=%ds)', name, priority, seq, hold, timeout)
-  _queue.put(msg)
-
-
-def pop_valid_message() -> QueuedMessage | None:
+  # Supersede and push in one critical section: producers take the lock
+  # once, and no same-tag message can slip in between marking and push.
+  global _superseded
+  removed = 0
+  with _queue_cv:
+    if supersede_tag:
+      for m in _tagged.pop(supersede_tag, ()):
+        m.superseded = True
+        removed += 1
+      _superseded += removed
+    if _superseded > len(_queue) // 2 or len(_queue) >= _compact_at:
+      _compact(msg.scheduled_at)
+    _push(msg)
+
+  if removed:
+    logger.debug('supersede removed %d queued message(s) with tag %r', removed, supersede_tag)
+  logger.debug('enqueued %s (priority=%d, seq=%d, hold=%ds, timeout=%ds)', name, priority, msg.seq, hold, timeout)
+
+
+def pop_valid_message(timeout: float | None = 1.0) -> QueuedMessage | None:
   """Return the highest-priority non-expired message, or None if the queue is empty.
 
-  After the first message arrives, waits _COALESCE_WINDOW seconds so that any
-  co-scheduled jobs (fired by APScheduler within milliseconds of each other) have
-  time to enqueue before we commit to a winner. All candidates are collected, expired
-  ones discarded, and the highest-priority valid message is returned; the rest are
-  re-enqueued for the next cycle.
-  """
-  try:
-    first = _queue.get(timeout=1)
-  except Empty:
-    return None
-
-  time.sleep(_COALESCE_WINDOW)
-
-  candidates = [first]
-  while True:
-    try:
-      candidates.append(_queue.get_nowait())
-    except Empty:
-      break
+  Blocks until a message is enqueued, for at most `timeout` seconds (None
+  waits indefinitely). Returns None if nothing arrives in time.
 
+  Waits until _COALESCE_WINDOW seconds have passed since the most recent
+  enqueue so that any co-scheduled jobs (fired by APScheduler within
+  milliseconds of each other) have time to enqueue before we commit to a
+  winner. Messages that queued up during a hold are past the window already
+  and are returned without delay. Expired and superseded messages at the top
+  of the heap are then dropped and the highest-priority valid message is
+  popped; the rest stay queued for the next cycle.
+  """
+  with _queue_cv:
+    if not _queue_cv.wait_for(_has_live, timeout=timeout):
+      return None
+    last_arrival = _last_arrival
+
+  delay = _COALESCE_WINDOW - (time.monotonic() - last_arrival)
+  if delay > 0:
+    time.sleep(delay)
+
+  # Pop in place rather than draining the heap and pushing the losers back,
+  # dropping dead entries only as they reach the top.
+  global _superseded
   now = time.monotonic()
-  valid: list[QueuedMessage] = []
-  for m in candidates:
-    waited = now - m.scheduled_at
-    if waited <= m.timeout:
-      valid.append(m)
-    else:
-      logger.warning('Discarding %s (waited %.1fs, timeout=%ds)', m.name, waited, m.timeout)
-
-  if not valid:
-    return None
-
-  best = min(valid)
-  for m in valid:
-    if m is not best:
-      _queue.put(m)
+  expired = 0
+  with _queue_cv:
+    while _queue and (_queue[0].superseded or _queue[0].deadline < now):
+      m = heapq.heappop(_queue)
+      if m.superseded:
+        _superseded -= 1
+        continue
+      _discard(m, now)
+      expired += 1
+      if expired >= _EXPIRED_COMPACT_THRESHOLD:
+        # A run of expired messages suggests more below; clear them in one pass.
+        _compact(now)
+        expired = 0
+    if not _queue:
+      return None
+    best = heapq.heappop(_queue)
+    _untrack(best)
   return best
 
 
@@ -230,13 +345,39 @@ def pop_valid_message() -> QueuedMessage | None:
 
 _LOCK_RETRY_DELAY = 60  # seconds to wait before retrying a 423-locked send
 _COALESCE_WINDOW = 0.1  # seconds to wait after first message arrives so co-scheduled jobs can enqueue
-_HOLD_POLL_INTERVAL = 1.0  # seconds between priority-peek checks during hold
+_PREFETCH_LEAD = 5.0  # seconds before a hold ends to start fetching the next message's variables
+_PREFETCH_MAX_AGE = 30.0  # prefetched variables older than this are fetched again
+_PREFETCH_WAIT_TIMEOUT = 60.0  # seconds the worker waits on an in-flight prefetch before skipping the message
 _INTERRUPT_PRIORITY_THRESHOLD = 8  # queued items at or above this can interrupt a hold early
 _REFRESH_MIN_INTERVAL = 30  # minimum allowed refresh_interval (seconds); prevents API hammering
 
+# Integration variables for the queue head, fetched on a helper thread near
+# the end of the current hold so the network round-trip overlaps the dwell
+# time instead of delaying the next send. (seq, started_at, future); only the
+# worker thread reads or writes it.
+_prefetch: tuple[int, float, Future[Any]] | None = None
+_prefetch_executor: ThreadPoolExecutor | None = None
+
+# One lock per integration, held around every variables fetch. The prefetch
+# thread and a hold's refresh_fn can fetch at the same time, and integration
+# caches (and Trakt's single-use refresh token) assume one caller at a time.
+_fetch_locks: dict[str, threading.Lock] = {name: threading.Lock() for name in _KNOWN_INTEGRATIONS}
+
+# Wakes _do_hold to re-check its exit conditions. Set when a message at or
+# above _INTERRUPT_PRIORITY_THRESHOLD is queued and whenever _hold_interrupt is
+# set, so a hold sleeps until its next deadline instead of polling.
+_hold_wake = threading.Event()
+
+
+class _HoldInterrupt(threading.Event):
+  def set(self) -> None:
+    super().set()
+    _hold_wake.set()
+
+
 # Set by the webhook server when a high-priority incoming message should cut
 # the current hold short. Cleared by the worker after each hold completes.
-_hold_interrupt = threading.Event()
+_hold_interrupt = _HoldInterrupt()
 
 # Tracks state of the message currently being held by the worker.
 # supersede_tag is '' and priority is None when the worker is idle.
@@ -273,6 +414,51 @@ def _get_min_hold() -> int:
     return 60
 
 
+def _clock(wall: float) -> str:
+  """Format a time.time() value as local HH:MM:SS for log lines."""
+  t = time.localtime(wall)
+  return f'{t.tm_hour:02d}:{t.tm_min:02d}:{t.tm_sec:02d}'
+
+
+def _call_integration(name: str, mod: Any, fn_name: str) -> Any:
+  with _fetch_locks[name]:
+    return getattr(mod, fn_name)()
+
+
+def _fetch_variables(data: dict[str, Any]) -> Any:
+  name = data['integration']
+  return _call_integration(name, _get_integration(name), data.get('integration_fn', 'get_variables'))
+
+
+def _start_prefetch() -> None:
+  """Start fetching the queue head's integration variables, if not already."""
+  global _prefetch, _prefetch_executor
+  with _queue_cv:
+    head = _head()
+  if head is None or 'integration' not in head.data:
+    return
+  if _prefetch is not None and _prefetch[0] == head.seq:
+    return
+  if _prefetch_executor is None:
+    _prefetch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='prefetch')
+  logger.debug('[hold] prefetching variables for %s', head.name)
+  _prefetch = (head.seq, time.monotonic(), _prefetch_executor.submit(_fetch_variables, head.data))
+
+
+def _take_variables(message: QueuedMessage) -> Any:
+  """Return message's integration variables, using a fresh prefetch if one matches."""
+  global _prefetch
+  prefetch, _prefetch = _prefetch, None
+  if prefetch is not None:
+    seq, started_at, future = prefetch
+    if seq == message.seq and time.monotonic() - started_at <= _PREFETCH_MAX_AGE:
+      try:
+        return future.result(timeout=_PREFETCH_WAIT_TIMEOUT)
+      except TimeoutError:
+        raise IntegrationDataUnavailableError(f'prefetch still running after {_PREFETCH_WAIT_TIMEOUT:.0f}s') from None
+  return _fetch_variables(message.data)
+
+
 def _do_hold(
   message: 'QueuedMessage',
   min_hold: int,
@@ -295,35 +481,49 @@ def _do_hold(
   If refresh_fn and refresh_interval are provided, refresh_fn() is called
   every refresh_interval seconds during the hold. Errors from refresh_fn are
   logged and the hold continues; the display keeps showing the last good content.
+
+  In the last _PREFETCH_LEAD seconds of a timed hold, the next queued
+  message's integration variables are prefetched (see _start_prefetch).
+
+  Between checks the hold sleeps until its next deadline (end of hold,
+  prefetch lead, min_hold, next refresh); _hold_wake cuts the sleep short.
   """
   hold_start = time.monotonic()
   last_refresh = hold_start
+  preemptible = message.priority < _INTERRUPT_PRIORITY_THRESHOLD
   while True:
-    elapsed = time.monotonic() - hold_start
+    if _hold_interrupt.is_set():
+      _hold_interrupt.clear()
+      logger.debug('[hold] %s interrupted at %.1fs', message.name, time.monotonic() - hold_start)
+      break
+
+    now = time.monotonic()
+    elapsed = now - hold_start
     remaining = message.hold - elapsed
     if remaining <= 0 and not message.indefinite:
       break
+    if remaining <= _PREFETCH_LEAD and not message.indefinite:
+      _start_prefetch()
+
+    if preemptible and elapsed >= min_hold:
+      with _queue_cv:
+        head = _head()
+        if head is not None and head.priority >= _INTERRUPT_PRIORITY_THRESHOLD:
+          logger.debug('[hold] %s preempted by higher-priority message at %.1fs', message.name, elapsed)
+          break
 
-    next_wake = _HOLD_POLL_INTERVAL if message.indefinite else min(_HOLD_POLL_INTERVAL, remaining)
+    deadlines: list[float] = []
+    if not message.indefinite:
+      deadlines.append(remaining - _PREFETCH_LEAD if remaining > _PREFETCH_LEAD else remaining)
+    if preemptible and elapsed < min_hold:
+      deadlines.append(min_hold - elapsed)
     if refresh_fn and refresh_interval:
-      time_until_refresh = refresh_interval - (time.monotonic() - last_refresh)
-      next_wake = min(next_wake, max(0.0, time_until_refresh))
-
-    interrupted = _hold_interrupt.wait(timeout=next_wake)
-    _hold_interrupt.clear()
-    if interrupted:
-      logger.debug('[hold] %s interrupted at %.1fs', message.name, time.monotonic() - hold_start)
-      break
-
-    if message.priority < _INTERRUPT_PRIORITY_THRESHOLD and elapsed >= min_hold:
-      with _queue.mutex:
-        if _queue.queue and _queue.queue[0].priority >= _INTERRUPT_PRIORITY_THRESHOLD:
-          logger.debug(
-            '[hold] %s preempted by higher-priority message at %.1fs',
-            message.name,
-            time.monotonic() - hold_start,
-          )
-          break
+      deadlines.append(max(0.0, refresh_interval - (now - last_refresh)))
+    # Cleared after the wait returns. A wake that lands between the wait and
+    # the clear is not lost only because the top of the loop re-checks
+    # _hold_interrupt and the queue head directly; keep those checks there.
+    _hold_wake.wait(timeout=min(deadlines, default=None))
+    _hold_wake.clear()
 
     if refresh_fn and refresh_interval:
       now = time.monotonic()
@@ -344,6 +544,8 @@ def worker() -> None:
   _idle_refresh_fn: Callable[[], None] | None = None
   _idle_refresh_interval: int | None = None
   _idle_last_refresh: float = 0.0
+  # config.toml is read once at startup, so resolve min_hold once too.
+  min_hold = _get_min_hold()
   while True:
     # Idle refresh: if the queue is empty and the previous integration message
     # is still on the board, keep refreshing at the same interval until a new
@@ -352,24 +554,28 @@ def worker() -> None:
       now = time.monotonic()
       if now - _idle_last_refresh >= _idle_refresh_interval:
         _idle_last_refresh = now
-        with _queue.mutex:
-          queue_pending = bool(_queue.queue)
+        with _queue_cv:
+          queue_pending = _has_live()
         if not queue_pending:
           try:
             _idle_refresh_fn()
           except Exception as e:  # noqa: BLE001
             logger.warning('Idle refresh error: %s', e)
 
-    message = pop_valid_message()
+    # Block until a message arrives; with an idle refresh pending, wake in
+    # time for it instead.
+    pop_timeout: float | None = None
+    if _idle_refresh_fn and _idle_refresh_interval:
+      pop_timeout = max(0.0, _idle_refresh_interval - (time.monotonic() - _idle_last_refresh))
+    message = pop_valid_message(timeout=pop_timeout)
     if message is None:
       continue
 
-    scheduled = datetime.fromtimestamp(time.time() - (time.monotonic() - message.scheduled_at))
     hold_desc = f'{message.hold}s (indefinite)' if message.indefinite else f'{message.hold}s'
     logger.info(
       'Sending %s | scheduled: %s | priority: %d | hold: %s',
       message.name,
-      scheduled.strftime('%H:%M:%S'),
+      _clock(message.scheduled_wall),
       message.priority,
       hold_desc,
     )
@@ -385,8 +591,7 @@ def worker() -> None:
     try:
       variables = message.data['variables']
       if 'integration' in message.data:
-        fn_name = message.data.get('integration_fn', 'get_variables')
-        variables = getattr(_get_integration(message.data['integration']), fn_name)()
+        variables = _take_variables(message)
       vestaboard.set_state(
         message.data['templates'],
         variables,
@@ -409,8 +614,8 @@ def worker() -> None:
       logger.warning('Board locked: %s. Retrying in %ds.', e, _LOCK_RETRY_DELAY)
       time.sleep(_LOCK_RETRY_DELAY)
       # Re-enqueue if the message hasn't exceeded its timeout.
-      if time.monotonic() - message.scheduled_at <= message.timeout:
-        _queue.put(message)
+      if time.monotonic() <= message.deadline:
+        _put(message)
       continue
     except Exception as e:
       with _current_hold_lock:
@@ -427,18 +632,21 @@ def worker() -> None:
     _refresh_fn: Callable[[], None] | None = None
     refresh_interval = message.data.get('refresh_interval')
     if refresh_interval and 'integration' in message.data:
-      _integration = _get_integration(message.data['integration'])
+      _name = message.data['integration']
+      _integration = _get_integration(_name)
       _fn_name = message.data.get('integration_fn', 'get_variables')
       _templates = message.data['templates']
       _truncation = message.data.get('truncation', 'hard')
 
       def _do_refresh(
+        _n: str = _name,
         _i: Any = _integration,
         _f: Any = _fn_name,
         _t: Any = _templates,
         _tr: Any = _truncation,
       ) -> None:
-        new_vars = getattr(_i, _f)()
+        # Same per-integration lock as the prefetch thread.
+        new_vars = _call_integration(_n, _i, _f)
         try:
           vestaboard.set_state(_t, new_vars, _tr)
         except vestaboard.DuplicateContentError, IntegrationDataUnavailableError:
@@ -453,11 +661,11 @@ def worker() -> None:
     # so _do_hold exits immediately and the worker processes the newer event.
     _hold_interrupt.clear()
     if message.supersede_tag:
-      with _queue.mutex:
-        if any(m.supersede_tag == message.supersede_tag for m in _queue.queue):
+      with _queue_cv:
+        if message.supersede_tag in _tagged:
           logger.debug('[hold] %s re-firing interrupt: same-tag message queued during set_state', message.name)
           _hold_interrupt.set()
-    _do_hold(message, _get_min_hold(), refresh_fn=_refresh_fn, refresh_interval=refresh_interval)
+    _do_hold(message, min_hold, refresh_fn=_refresh_fn, refresh_interval=refresh_interval)
     with _current_hold_lock:
       _current_hold_supersede_tag = ''
       _current_hold_priority = None
@@ -475,13 +683,112 @@ def worker() -> None:
 # --- Webhook Server ---
 
 _MAX_WEBHOOK_BODY = 64 * 1024  # 64 KB — generous limit for any webhook payload
+_MAX_WEBHOOK_CONCURRENCY = 4  # authenticated requests dispatched at once
+_MAX_WEBHOOK_CONNECTIONS = 16  # connection threads at once; further clients wait in the listen backlog
+_WEBHOOK_READ_TIMEOUT = 10  # seconds a client may stall while sending a request
+
+
+class _ArrivalOrder:
+  """Admits callers one at a time, in the order they took a ticket."""
+
+  def __init__(self) -> None:
+    self._cv = threading.Condition()
+    self._issued = 0
+    self._serving = 0
+
+  def ticket(self) -> int:
+    with self._cv:
+      ticket = self._issued
+      self._issued += 1
+      return ticket
+
+  @contextlib.contextmanager
+  def turn(self, ticket: int) -> Generator[None, None, None]:
+    """Block until every earlier ticket has finished its turn, then take this one."""
+    with self._cv:
+      self._cv.wait_for(lambda: self._serving == ticket)
+    try:
+      yield
+    finally:
+      with self._cv:
+        self._serving += 1
+        self._cv.notify_all()
+
+
+class _WebhookServer(ThreadingHTTPServer):
+  """ThreadingHTTPServer that runs at most max_connections handler threads.
+
+  When all are busy, the accept loop blocks, so new clients queue in the
+  kernel's listen backlog instead of each getting a thread.
+  """
+
+  def __init__(
+    self,
+    server_address: tuple[str, int],
+    handler: type[BaseHTTPRequestHandler],
+    max_connections: int = _MAX_WEBHOOK_CONNECTIONS,
+  ) -> None:
+    super().__init__(server_address, handler)
+    self._connection_slots = threading.BoundedSemaphore(max_connections)
+
+  def process_request(self, request: Any, client_address: Any) -> None:
+    self._connection_slots.acquire()
+    try:
+      super().process_request(request, client_address)
+    except BaseException:
+      self._connection_slots.release()
+      raise
+
+  def process_request_thread(self, request: Any, client_address: Any) -> None:
+    try:
+      super().process_request_thread(request, client_address)
+    finally:
+      self._connection_slots.release()
+
+
+# Matches a multipart/form-data Content-Type and captures its boundary
+# (quoted or bare). Media types and parameter names are case-insensitive.
+_MULTIPART_RE = re.compile(r'multipart/form-data\s*;(?:[^;]*;)*?\s*boundary=(?:"([^"]+)"|([^;\s]+))', re.IGNORECASE)
+
+
+def _multipart_boundary(content_type: str) -> str | None:
+  """Return the boundary of a multipart/form-data Content-Type, or None."""
+  m = _MULTIPART_RE.match(content_type.lstrip())
+  return (m.group(1) or m.group(2)) if m else None
+
+
+def _multipart_field(body: bytes, boundary: str, name: str) -> bytes | None:
+  """Return the raw value of form field `name` from a multipart/form-data body.
+
+  A direct byte scan rather than a MIME parse: split on the boundary, then
+  match each part's headers for the field name. Returns None if no part
+  carries the field.
+  """
+  marker = f'; name="{name}"'.encode()
+  for part in body.split(b'--' + boundary.encode()):
+    idx = part.find(b'\r\n\r\n')
+    if idx != -1 and marker in part[:idx]:
+      value = part[idx + 4 :]
+      # The CRLF before the next delimiter belongs to the delimiter, not the value.
+      return value.removesuffix(b'\r\n')
+  return None
 
 
 def _make_webhook_handler(secret: str) -> type:
-  """Return a BaseHTTPRequestHandler subclass bound to the given shared secret."""
+  """Return a BaseHTTPRequestHandler subclass bound to the given shared secret.
+
+  The server runs each request on its own thread. An authenticated request
+  takes a ticket for its integration as soon as its path is validated, before
+  the body is read. Requests for the same integration are then dispatched one
+  at a time in ticket order, so a small event cannot overtake a larger one that
+  arrived first. At most _MAX_WEBHOOK_CONCURRENCY dispatches run at once.
+  """
 
   class _WebhookHandler(BaseHTTPRequestHandler):
     _secret: str = secret
+    _slots = threading.BoundedSemaphore(_MAX_WEBHOOK_CONCURRENCY)
+    _arrival: dict[str, _ArrivalOrder] = {name: _ArrivalOrder() for name in _KNOWN_INTEGRATIONS}
+    timeout = _WEBHOOK_READ_TIMEOUT
 
     def do_POST(self) -> None:  # noqa: N802
       # Validate path: must be /webhook/<integration>
@@ -510,42 +817,49 @@ def _make_webhook_handler(secret: str) -> type:
         self._respond(404, f'Unknown integration: {integration_name!r}')
         return
 
-      # Parse body.
+      # Every ticket must take its turn, even if reading the body fails, or
+      # later requests for this integration would wait forever.
+      order = self._arrival[integration_name]
+      ticket = order.ticket()
+      try:
+        payload = self._read_payload()
+      except BaseException:
+        with order.turn(ticket):
+          raise
+      with order.turn(ticket):
+        if payload is not None:
+          with self._slots:
+            self._dispatch(integration_name, payload)
+
+    def _read_payload(self) -> dict[str, Any] | None:
+      # Returns the parsed body, or None after responding 400.
       try:
         content_length = min(int(self.headers.get('Content-Length') or 0), _MAX_WEBHOOK_BODY)
       except ValueError:
         content_length = 0
       body = self.rfile.read(content_length)
-      content_type = self.headers.get('Content-Type', '')
-      if 'multipart/form-data' in content_type:
+      boundary = _multipart_boundary(self.headers.get('Content-Type', ''))
+      if boundary:
         # Plex sends webhooks as multipart/form-data with JSON in a 'payload'
-        # field. Prepend the Content-Type header to form a parseable MIME
-        # message, then extract the named part.
-        raw = b'Content-Type: ' + content_type.encode() + b'\r\n\r\n' + body
-        msg = email.parser.BytesParser().parsebytes(raw)
-        json_bytes: bytes | None = None
-        if msg.is_multipart():
-          for part in msg.get_payload():  # type: ignore[union-attr]
-            if not isinstance(part, email.message.Message):
-              continue
-            if part.get_param('name', header='content-disposition') == 'payload':
-              json_bytes = part.get_payload(decode=True)  # type: ignore[assignment]
-              break
+        # field (and sometimes a binary 'thumb' part alongside it).
+        json_bytes = _multipart_field(body, boundary, 'payload')
         if not json_bytes:
           self._respond(400, 'Missing payload field in multipart body')
-          return
+          return None
+        # json.loads takes the bytes directly. ValueError covers both
+        # JSONDecodeError and the UnicodeDecodeError raised for non-UTF-8 input.
         try:
-          payload: dict[str, Any] = json.loads(json_bytes)
-        except json.JSONDecodeError:
+          return json.loads(json_bytes)
+        except ValueError:
           self._respond(400, 'Invalid JSON in payload field')
-          return
-      else:
-        try:
-          payload = json.loads(body) if body else {}
-        except json.JSONDecodeError:
-          self._respond(400, 'Invalid JSON')
-          return
+          return None
+      try:
+        return json.loads(body) if body else {}
+      except ValueError:
+        self._respond(400, 'Invalid JSON')
+        return None
 
+    def _dispatch(self, integration_name: str, payload: dict[str, Any]) -> None:
       # Load integration and check for webhook support.
       try:
         mod = _get_integration(integration_name)
@@ -637,7 +951,7 @@ def _start_webhook_server() -> None:
     )
 
   handler = _make_webhook_handler(secret)
-  server = HTTPServer((bind, port), handler)
+  server = _WebhookServer((bind, port), handler)
   threading.Thread(target=server.serve_forever, daemon=True).start()
   logger.info('Webhook listener started on %s:%d', bind, port)
 
@@ -645,12 +959,19 @@ def _start_webhook_server() -> None:
 # --- Scheduler ---
 
 
+# Cached because many templates share the same cron string. The returned dict
+# is shared between callers and must not be mutated (add_job unpacks it).
+@functools.lru_cache(maxsize=256)
 def parse_cron(cron: str) -> dict[str, str]:
   minute, hour, day, month, day_of_week = cron.split()
   return {'minute': minute, 'hour': hour, 'day': day, 'month': month, 'day_of_week': day_of_week}
 
 
 _VALID_TRUNCATION: frozenset[str] = frozenset({'hard', 'word', 'ellipsis'})
+# Schedule fields that must be non-negative integers.
+_SCHEDULE_INT_FIELDS = ('hold', 'timeout')
+# Schedule fields that config.toml [<stem>.schedules.<template>] may override.
+_SCHEDULE_OVERRIDE_FIELDS = ('cron', 'hold', 'timeout', 'refresh_interval')
 
 
 def _coerce_bool(val: object, label: str) -> bool | None:
@@ -692,7 +1013,7 @@ def _validate_template(name: str, template: dict[str, Any]) -> None:
   if not is_webhook:
     if not isinstance(cron, str) or not cron.strip():
       raise ValueError(f'{name}: schedule.cron must be a non-empty string')
-  for field in ('hold', 'timeout'):
+  for field in _SCHEDULE_INT_FIELDS:
     val = schedule.get(field)
     if not isinstance(val, int) or val < 0:
       raise ValueError(f'{name}: schedule.{field} must be a non-negative integer, got {val!r}')
@@ -723,21 +1044,47 @@ def _validate_template(name: str, template: dict[str, Any]) -> None:
     raise ValueError(f'{name}: integration_fn must be a string, got {integration_fn!r}')
 
 
-def _load_file(
-  scheduler: BackgroundScheduler,
-  content_file: Path,
-  public_mode: bool,
-) -> None:
-  # Parse and validate the file before touching the scheduler so that a bad
-  # file leaves existing jobs untouched.
-  with open(content_file) as f:
-    content = json.load(f)
+# Job ids registered by _load_file, per scheduler and per file stem, so
+# reloading a file removes its old jobs directly instead of scanning them all.
+_jobs_by_stem: weakref.WeakKeyDictionary[BackgroundScheduler, dict[str, list[str]]] = weakref.WeakKeyDictionary()
+
+
+@dataclass(frozen=True, slots=True)
+class _JobSpec:
+  """One validated template, with its schedule fields pulled out of the JSON."""
+
+  job_id: str
+  name: str  # template name within its file
+  priority: int
+  cron: str  # '' for webhook-only templates
+  hold: int
+  timeout: int
+  refresh_interval: int | None
+  data: dict[str, Any]
+  override: dict[str, Any] | None = None  # non-empty config.toml schedule override
+
+
+@dataclass
+class _ParsedFile:
+  """Validated jobs from one content file, ready to register."""
+
+  content_file: Path
+  stem: str
+  jobs: list[_JobSpec]
+  webhook_only_jobs: list[_JobSpec]
+  disabled_jobs: list[str]
+
+
+def _parse_file(content_file: Path, public_mode: bool) -> _ParsedFile:
+  # Parse and validate the file without touching the scheduler so that a bad
+  # file leaves existing jobs untouched. Safe to call from worker threads.
+  content = json.loads(content_file.read_bytes())
 
   # Prefix the stem with the parent directory name (user or contrib) so that
   # files with the same name in different directories don't collide.
   stem = f'{content_file.parent.name}.{content_file.stem}'
-  new_jobs = []
-  webhook_only_jobs: list[tuple[str, int, dict[str, Any], dict[str, Any]]] = []
+  new_jobs: list[_JobSpec] = []
+  webhook_only_jobs: list[_JobSpec] = []
   disabled_jobs: list[str] = []
   for template_name, template in content['templates'].items():
     if public_mode and template.get('private', False):
@@ -772,106 +1119,155 @@ def _load_file(
     if 'integration_fn' in template:
       data['integration_fn'] = template['integration_fn']
     schedule = template['schedule']
-    is_webhook = bool(template.get('webhook', False))
-    has_cron = isinstance(schedule.get('cron'), str) and bool(schedule['cron'].strip())
-    if is_webhook and not has_cron:
-      webhook_only_jobs.append((f'{stem}.{template_name}', priority, data, schedule))
+    cron = schedule.get('cron')
+    spec = _JobSpec(
+      job_id=f'{stem}.{template_name}',
+      name=template_name,
+      priority=priority,
+      cron=cron if isinstance(cron, str) and cron.strip() else '',
+      hold=schedule['hold'],
+      timeout=schedule['timeout'],
+      refresh_interval=schedule.get('refresh_interval'),
+      data=data,
+      override=override or None,
+    )
+    if template.get('webhook', False) and not spec.cron:
+      webhook_only_jobs.append(spec)
     else:
-      new_jobs.append((f'{stem}.{template_name}', priority, data, schedule))
+      new_jobs.append(spec)
+  return _ParsedFile(content_file, stem, new_jobs, webhook_only_jobs, disabled_jobs)
 
-  # Atomically swap out the old jobs for this file.
-  for job in scheduler.get_jobs():
-    if job.id.startswith(f'{stem}.'):
-      job.remove()
-
-  # First pass: apply overrides and collect effective values so column widths
-  # are computed from the values actually shown (not the pre-override JSON).
-  effective_jobs: list[tuple[str, int, dict[str, Any], dict[str, Any]]] = []
-  for job_id, priority, data, schedule in new_jobs:
-    template_name = job_id[len(stem) + 1 :]
-    # Merge any schedule overrides from config.toml (e.g. [bart.schedules.departures]).
-    override = _config_mod.get_schedule_override(f'{content_file.stem}.{template_name}')
-    effective = dict(schedule)
-    for field in ('cron', 'hold', 'timeout', 'refresh_interval'):
-      if field not in override:
-        continue
-      val = override[field]
-      if field == 'cron' and isinstance(val, str) and val.strip():
-        effective[field] = val
-      elif field in ('hold', 'timeout') and isinstance(val, int) and val >= 0:
-        effective[field] = val
-      elif field == 'refresh_interval':
-        if isinstance(val, int) and val >= _REFRESH_MIN_INTERVAL:
-          effective[field] = val
-        else:
-          logger.warning('ignoring invalid refresh_interval override for %s: %r', job_id, val)
-    if 'priority' in override:
-      val = override['priority']
-      if isinstance(val, int) and 0 <= val <= 10:
-        priority = val
+
+def _apply_override(spec: _JobSpec, override: dict[str, Any]) -> _JobSpec:
+  # Return spec with the valid fields of a config.toml override applied.
+  changes: dict[str, Any] = {}
+  for field in _SCHEDULE_OVERRIDE_FIELDS:
+    if field not in override:
+      continue
+    val = override[field]
+    if field == 'cron' and isinstance(val, str) and val.strip():
+      changes[field] = val
+    elif field in _SCHEDULE_INT_FIELDS and isinstance(val, int) and val >= 0:
+      changes[field] = val
+    elif field == 'refresh_interval':
+      if isinstance(val, int) and val >= _REFRESH_MIN_INTERVAL:
+        changes[field] = val
       else:
-        logger.warning('ignoring invalid priority override for %s: %r', job_id, val)
-    effective_jobs.append((job_id, priority, data, effective))
-
-  max_name = max((len(job_id[len(stem) + 1 :]) for job_id, *_ in effective_jobs), default=0)
-  max_cron = max((len(effective['cron']) for _, _, _, effective in effective_jobs), default=0)
-  max_priority = max((len(str(priority)) for _, priority, _, _ in effective_jobs), default=0)
-  # +1 for the 's' suffix so the whole "180s" token is padded together
-  max_hold = max((len(str(effective['hold'])) + 1 for _, _, _, effective in effective_jobs), default=0)
-  max_timeout = max((len(str(effective['timeout'])) + 1 for _, _, _, effective in effective_jobs), default=0)
-
-  if effective_jobs or webhook_only_jobs or disabled_jobs:
-    logger.info('Loaded %s/%s:', content_file.parent.name, content_file.name)
-  for job_id, priority, data, effective in effective_jobs:
-    template_name = job_id[len(stem) + 1 :]
+        logger.warning('ignoring invalid refresh_interval override for %s: %r', spec.job_id, val)
+  if 'priority' in override:
+    val = override['priority']
+    if isinstance(val, int) and 0 <= val <= 10:
+      changes['priority'] = val
+    else:
+      logger.warning('ignoring invalid priority override for %s: %r', spec.job_id, val)
+  return replace(spec, **changes) if changes else spec
+
+
+def _register_jobs(scheduler: BackgroundScheduler, parsed: _ParsedFile) -> set[str]:
+  # Must run on a single thread: swaps the file's jobs in the scheduler.
+  # Returns the integration names used by the scheduled jobs it added.
+  content_file, stem = parsed.content_file, parsed.stem
+  webhook_only_jobs, disabled_jobs = parsed.webhook_only_jobs, parsed.disabled_jobs
+
+  # Atomically swap out the old jobs for this file.
+  stem_jobs = _jobs_by_stem.setdefault(scheduler, {})
+  for old_id in stem_jobs.pop(stem, ()):
+    try:
+      scheduler.remove_job(old_id)
+    except JobLookupError:
+      pass  # already removed elsewhere
+  registered = stem_jobs[stem] = []
+  integrations: set[str] = set()
+
+  # First pass: apply overrides (e.g. [bart.schedules.departures]) and collect
+  # effective values so column widths are computed from the values actually
+  # shown (not the pre-override JSON). Most templates have no override.
+  effective_jobs: list[_JobSpec] = []
+  max_name = max_cron = max_priority = max_hold = max_timeout = 0
+  for spec in parsed.jobs:
+    if spec.override:
+      spec = _apply_override(spec, spec.override)
+    effective_jobs.append(spec)
+    max_name = max(max_name, len(spec.name))
+    max_cron = max(max_cron, len(spec.cron))
+    max_priority = max(max_priority, len(str(spec.priority)))
+    # +1 for the 's' suffix so the whole "180s" token is padded together
+    max_hold = max(max_hold, len(str(spec.hold)) + 1)
+    max_timeout = max(max_timeout, len(str(spec.timeout)) + 1)
+
+  # Summary lines are collected and logged as one record per file;
+  # _IndentedFormatter aligns the continuation lines under the first. The
+  # row format is built once per file with the column widths baked in.
+  lines = [f'Loaded {content_file.parent.name}/{content_file.name}:']
+  row = (
+    f'  · {{:<{max_name}}}  cron={{:<{max_cron + 2}}}  priority={{:<{max_priority}}}'
+    f'  hold={{:<{max_hold}}}  timeout={{:<{max_timeout}}}'
+  )
+  for spec in effective_jobs:
     # Propagate effective refresh_interval (may have been set or overridden) into data.
-    ri = effective.get('refresh_interval')
-    if ri is not None:
-      data['refresh_interval'] = ri
+    data = spec.data
+    if spec.refresh_interval is not None:
+      data['refresh_interval'] = spec.refresh_interval
     elif 'refresh_interval' in data:
       del data['refresh_interval']
     scheduler.add_job(
       enqueue,
       trigger='cron',
-      args=[priority, data, effective['hold'], effective['timeout'], job_id],
-      id=job_id,
-      **parse_cron(effective['cron']),  # type: ignore[arg-type]
-    )
-    logger.info(
-      '  · %s  %s  %s  %s  %s',
-      template_name.ljust(max_name),
-      f'cron="{effective["cron"]}"'.ljust(max_cron + 7),
-      f'priority={priority}'.ljust(max_priority + 9),
-      f'hold={effective["hold"]}s'.ljust(max_hold + 5),
-      f'timeout={effective["timeout"]}s'.ljust(max_timeout + 8),
+      args=[spec.priority, data, spec.hold, spec.timeout, spec.job_id],
+      id=spec.job_id,
+      **parse_cron(spec.cron),  # type: ignore[arg-type]
     )
+    registered.append(spec.job_id)
+    if 'integration' in data:
+      integrations.add(data['integration'])
+    lines.append(row.format(spec.name, f'"{spec.cron}"', spec.priority, f'{spec.hold}s', f'{spec.timeout}s'))
 
   if webhook_only_jobs:
-    max_wh_name = max((len(job_id[len(stem) + 1 :]) for job_id, *_ in webhook_only_jobs), default=0)
-    max_wh_hold = max((len(str(schedule['hold'])) + 1 for _, _, _, schedule in webhook_only_jobs), default=0)
-    max_wh_timeout = max((len(str(schedule['timeout'])) + 1 for _, _, _, schedule in webhook_only_jobs), default=0)
-    max_wh_priority = max((len(str(priority)) for _, priority, _, _ in webhook_only_jobs), default=0)
-    for job_id, priority, _, schedule in webhook_only_jobs:
-      template_name = job_id[len(stem) + 1 :]
-      logger.info(
-        '  · %s  %s  %s  %s  %s',
-        template_name.ljust(max_wh_name),
-        'webhook=true'.ljust(12),
-        f'priority={priority}'.ljust(max_wh_priority + 9),
-        f'hold={schedule["hold"]}s'.ljust(max_wh_hold + 5),
-        f'timeout={schedule["timeout"]}s'.ljust(max_wh_timeout + 8),
-      )
+    max_wh_name = max_wh_priority = max_wh_hold = max_wh_timeout = 0
+    for spec in webhook_only_jobs:
+      max_wh_name = max(max_wh_name, len(spec.name))
+      max_wh_priority = max(max_wh_priority, len(str(spec.priority)))
+      max_wh_hold = max(max_wh_hold, len(str(spec.hold)) + 1)
+      max_wh_timeout = max(max_wh_timeout, len(str(spec.timeout)) + 1)
+    wh_row = (
+      f'  · {{:<{max_wh_name}}}  webhook=true  priority={{:<{max_wh_priority}}}'
+      f'  hold={{:<{max_wh_hold}}}  timeout={{:<{max_wh_timeout}}}'
+    )
+    for spec in webhook_only_jobs:
+      lines.append(wh_row.format(spec.name, spec.priority, f'{spec.hold}s', f'{spec.timeout}s'))
 
   for template_name in disabled_jobs:
-    logger.info('  · %s  disabled', template_name)
+    lines.append(f'  · {template_name}  disabled')
+
+  if len(lines) > 1:
+    logger.info('%s', '\n'.join(lines))
+  return integrations
+
+
+def _load_file(
+  scheduler: BackgroundScheduler,
+  content_file: Path,
+  public_mode: bool,
+) -> set[str]:
+  return _register_jobs(scheduler, _parse_file(content_file, public_mode))
+
+
+def _json_files(directory: Path) -> list[Path]:
+  # Sorted *.json files in directory. scandir answers is_file() from the
+  # directory entry's type, so regular files cost no per-file stat (symlinks
+  # are still followed).
+  with os.scandir(directory) as it:
+    names = sorted(e.name for e in it if e.name.endswith('.json') and e.is_file())
+  return [directory / name for name in names]
 
 
 def load_content(
   scheduler: BackgroundScheduler,
   public_mode: bool = False,
   content_enabled: set[str] | None = None,
-) -> None:
-  # Reads JSON files from content/user/ and content/contrib/.
+) -> set[str]:
+  # Reads JSON files from content/user/ and content/contrib/ and returns the
+  # names of the integrations used by the scheduled jobs it registered.
   #
   # When content_enabled is None (key absent from config), user files always
   # load and no contrib files load — preserving the pre-filter default.
@@ -887,24 +1283,37 @@ def load_content(
 
   user_stems: set[str] = set()
   contrib_stems: set[str] = set()
+  files: list[Path] = []
 
   user_path = Path('content') / 'user'
   if user_path.is_dir():
-    for f in sorted(user_path.glob('*.json')):
+    for f in _json_files(user_path):
       if _enabled(f.stem):
         user_stems.add(f.stem)
-        try:
-          _load_file(scheduler, f, public_mode)
-        except Exception as e:  # noqa: BLE001
-          logger.warning('failed to load %s: %s', f, e)
+        files.append(f)
 
   contrib_path = Path('content') / 'contrib'
   if contrib_path.is_dir() and content_enabled:
-    for f in sorted(contrib_path.glob('*.json')):
+    for f in _json_files(contrib_path):
       if _enabled(f.stem):
         contrib_stems.add(f.stem)
+        files.append(f)
+
+  # Read and validate files in parallel, then register their jobs here in
+  # sorted order — add_job is not guaranteed to be thread-safe. A single file
+  # is loaded inline; a pool thread would cost more than it saves.
+  loaded_integrations: set[str] = set()
+  if len(files) == 1:
+    try:
+      loaded_integrations |= _load_file(scheduler, files[0], public_mode)
+    except Exception as e:  # noqa: BLE001
+      logger.warning('failed to load %s: %s', files[0], e)
+  elif files:
+    with ThreadPoolExecutor(max_workers=min(8, len(files))) as ex:
+      futures = [ex.submit(_parse_file, f, public_mode) for f in files]
+      for f, future in zip(files, futures, strict=True):
         try:
-          _load_file(scheduler, f, public_mode)
+          loaded_integrations |= _register_jobs(scheduler, future.result())
         except Exception as e:  # noqa: BLE001
           logger.warning('failed to load %s: %s', f, e)
 
@@ -920,6 +1329,31 @@ def load_content(
     for stem in sorted(content_enabled - found):
       logger.warning('content file not found for enabled stem %r — check [scheduler] enabled in config.toml', stem)
 
+  return loaded_integrations
+
+
+def _preflight(name: str) -> None:
+  mod = _get_integration(name)
+  if hasattr(mod, 'preflight'):
+    mod.preflight()
+
+
+def _run_preflights(names: set[str]) -> None:
+  """Run each integration's preflight() concurrently and wait for all of them.
+
+  Startup then waits only as long as the slowest check, not their sum.
+  Failures are logged per integration and do not stop the others.
+  """
+  if not names:
+    return
+  with ThreadPoolExecutor(max_workers=len(names)) as ex:
+    futures = {name: ex.submit(_preflight, name) for name in sorted(names)}
+  for name, future in futures.items():
+    try:
+      future.result()
+    except Exception as e:  # noqa: BLE001
+      logger.warning('preflight for %r failed: %s', name, e)
+
 
 def _validate_startup() -> None:
   """Check for bad Docker mount states before loading config or content.
@@ -929,7 +1363,14 @@ def _validate_startup() -> None:
   directory is empty.
   """
   config_path = Path('config.toml')
-  if config_path.is_dir():
+  # One stat answers all three checks below. Any OSError (missing, permission
+  # denied, a non-directory in the path) reports as not found, as the
+  # is_dir()/exists() checks this replaced did.
+  try:
+    st = config_path.stat()
+  except OSError:
+    st = None
+  if st is not None and stat.S_ISDIR(st.st_mode):
     print(
       f'Error: {config_path.resolve()} is a directory. '
       'Docker created it automatically because the host path did not exist at container start. '
@@ -937,7 +1378,7 @@ def _validate_startup() -> None:
       file=sys.stderr,
     )
     raise SystemExit(1)
-  if not config_path.exists():
+  if st is None:
     print(
       f'Error: config.toml not found at {config_path.resolve()}. '
       'Copy config.example.toml, fill in your API keys, '
@@ -945,15 +1386,19 @@ def _validate_startup() -> None:
       file=sys.stderr,
     )
     raise SystemExit(1)
-  if config_path.stat().st_size == 0:
+  if st.st_size == 0:
     print(
       'Error: config.toml is empty. Copy config.example.toml and fill in your API keys.',
       file=sys.stderr,
     )
     raise SystemExit(1)
 
-  user_path = Path('content') / 'user'
-  if user_path.is_dir() and not any(user_path.iterdir()):
+  try:
+    with os.scandir(Path('content') / 'user') as it:
+      user_empty = next(it, None) is None
+  except OSError:
+    user_empty = False
+  if user_empty:
     logger.warning(
       'user content directory is empty. '
       'If you intended to mount personal content, make sure the host path exists and '
@@ -962,6 +1407,16 @@ def _validate_startup() -> None:
     )
 
 
+# Set to make main() shut the scheduler down and return.
+_shutdown = threading.Event()
+
+
+def _raise_keyboard_interrupt(signum: int, frame: object) -> None:
+  # Raising (rather than setting _shutdown) is safe from a signal handler:
+  # Event.set() takes a lock the interrupted main thread may already hold.
+  raise KeyboardInterrupt
+
+
 def main() -> None:
   _handler = logging.StreamHandler()
   _handler.setFormatter(
@@ -1000,45 +1455,41 @@ def main() -> None:
     extras.append('no content loaded')
   if public_mode:
     extras.append('public mode')
-  version = importlib.metadata.version('e-note-ion')
-  logger.info('Starting e-note-ion v%s — %s, %s', version, board_desc, ', '.join(extras))
+  logger.info('Starting e-note-ion v%s — %s, %s', app_version(), board_desc, ', '.join(extras))
 
-  logger.info('Current message:')
+  # One record for the heading and the board so startup issues a single write;
+  # _IndentedFormatter aligns the board lines under the heading.
   try:
-    logger.info('%s', vestaboard.get_state())
+    current = str(vestaboard.get_state())
   except vestaboard.EmptyBoardError:
-    logger.info('(no current message)')
+    current = '(no current message)'
+  logger.info('Current message:\n%s', current)
   scheduler = BackgroundScheduler(
     misfire_grace_time=300,
     timezone=_config_mod.get_timezone(),
   )
-  load_content(scheduler, public_mode=public_mode, content_enabled=content_enabled)
+  loaded_integrations = load_content(scheduler, public_mode=public_mode, content_enabled=content_enabled)
   scheduler.start()
   logger.info('Scheduler started — %d job(s) registered', len(scheduler.get_jobs()))
 
-  loaded_integrations: set[str] = set()
-  for job in scheduler.get_jobs():
-    data = job.args[1]
-    if 'integration' in data:
-      loaded_integrations.add(data['integration'])
-  for name in loaded_integrations:
-    try:
-      mod = _get_integration(name)
-      if hasattr(mod, 'preflight'):
-        mod.preflight()
-    except Exception as e:  # noqa: BLE001
-      logger.warning('preflight for %r failed: %s', name, e)
+  _run_preflights(loaded_integrations)
 
   threading.Thread(target=worker, daemon=True).start()
 
   if _config_mod.has_section('webhook'):
     _start_webhook_server()
 
+  # Block without periodic wakeups. Ctrl-C raises KeyboardInterrupt out of the
+  # wait; SIGTERM (docker stop) is mapped onto the same path so the scheduler
+  # shuts down cleanly either way.
+  signal.signal(signal.SIGTERM, _raise_keyboard_interrupt)
   try:
-    while True:
-      time.sleep(1)
+    _shutdown.wait()
   except KeyboardInterrupt:
-    scheduler.shutdown()
+    pass
+  scheduler.shutdown()
+  if _prefetch_executor is not None:
+    _prefetch_executor.shutdown(wait=False, cancel_futures=True)
 
 
 if __name__ == '__main__':
@@ -1,25 +1,77 @@
 import os
-from typing import Generator
+from typing import TYPE_CHECKING, Generator
 
 import pytest
 
-import integrations.vestaboard as vestaboard
+if TYPE_CHECKING:
+  from apscheduler.schedulers.background import BackgroundScheduler
 
 
-@pytest.fixture(autouse=True)
+_OPT_IN_FIXTURES = {
+  'mutates_vb_model': 'reset_vestaboard_model',
+  'uses_vb_headers': 'reset_vestaboard_headers',
+}
+
+
+def pytest_collection_modifyitems(items: list[pytest.Item]) -> None:
+  """Apply the project's opt-in markers once, at collection time.
+
+  Tests marked mutates_vb_model get the reset_vestaboard_model fixture, and
+  tests marked uses_vb_headers get reset_vestaboard_headers. Tests marked
+  require_env are skipped if any listed env var is unset, so they are never
+  set up.
+  """
+  for item in items:
+    for marker_name, fixture in _OPT_IN_FIXTURES.items():
+      if item.get_closest_marker(marker_name) and fixture not in item.fixturenames:  # type: ignore[attr-defined]
+        item.fixturenames.append(fixture)  # type: ignore[attr-defined]
+    marker = item.get_closest_marker('require_env')
+    if marker is not None:
+      missing = next((var for var in marker.args if not os.environ.get(var, '').strip()), None)
+      if missing is not None:
+        item.add_marker(pytest.mark.skip(reason=f'{missing!r} not set'))
+
+
+@pytest.fixture
 def reset_vestaboard_model() -> Generator[None, None, None]:
-  """Reset the active board model to NOTE before every test."""
+  """Restore the active board model. Opt-in via @pytest.mark.mutates_vb_model."""
+  # Imported here rather than at module level so collection (e.g.
+  # --collect-only) doesn't pay for loading the integration.
+  import integrations.vestaboard as vestaboard
+
   original = vestaboard.model
   yield
   vestaboard.model = original
 
 
 @pytest.fixture
-def require_env(request: pytest.FixtureRequest) -> None:
-  """Skip the test if any env vars listed in @pytest.mark.require_env are unset."""
-  marker = request.node.get_closest_marker('require_env')
-  if marker is None:
-    return
-  for var in marker.args:
-    if not os.environ.get(var, '').strip():
-      pytest.skip(f'{var!r} not set')
+def reset_vestaboard_headers() -> Generator[None, None, None]:
+  """Drop cached auth headers on both sides of the test.
+
+  Opt-in via @pytest.mark.uses_vb_headers, for tests that build headers from a
+  patched config so neither an earlier nor a later test sees the wrong key.
+  """
+  import integrations.vestaboard as vestaboard
+
+  vestaboard._get_headers.cache_clear()  # noqa: SLF001
+  yield
+  vestaboard._get_headers.cache_clear()  # noqa: SLF001
+
+
+@pytest.fixture(scope='session')
+def bg_scheduler() -> Generator['BackgroundScheduler', None, None]:
+  """One never-started BackgroundScheduler shared by the whole session."""
+  from apscheduler.schedulers.background import BackgroundScheduler
+
+  s = BackgroundScheduler()
+  yield s
+  if s.running:
+    s.shutdown(wait=False)
+
+
+@pytest.fixture
+def clean_scheduler(bg_scheduler: 'BackgroundScheduler') -> Generator['BackgroundScheduler', None, None]:
+  """The shared scheduler with no jobs before and after the test."""
+  bg_scheduler.remove_all_jobs()
+  yield bg_scheduler
+  bg_scheduler.remove_all_jobs()
@@ -1,4 +1,4 @@
-from typing import Generator
+from typing import Any, Generator
 from unittest.mock import MagicMock, patch
 
 import pytest
@@ -8,6 +8,8 @@ import integrations.bart as bart
 import integrations.vestaboard as vb
 from exceptions import IntegrationDataUnavailableError
 
+_BART_CONFIG = {'api_key': 'test-bart-key', 'station': 'MLPT', 'line1_dest': 'DALY'}
+
 
 @pytest.fixture(autouse=True)
 def reset_caches() -> Generator[None, None, None]:
@@ -24,58 +26,59 @@ def bart_config(monkeypatch: pytest.MonkeyPatch) -> None:
   """Patch config to provide BART settings without a real config file."""
   import config as _cfg
 
-  monkeypatch.setattr(
-    _cfg,
-    '_config',
-    {'bart': {'api_key': 'test-bart-key', 'station': 'MLPT', 'line1_dest': 'DALY'}},
-  )
-
-
-def _mock_routes_empty() -> MagicMock:
-  """Routes API returning no routes (simplifies etd-only tests)."""
-  mock = MagicMock()
-  mock.raise_for_status.return_value = None
-  mock.json.return_value = {'root': {'routes': {'route': []}}}
-  return mock
-
-
-def _mock_etd(dest: str = 'DALY', minutes: str = '5', color: str = 'GREEN') -> MagicMock:
-  mock = MagicMock()
-  mock.raise_for_status.return_value = None
-  mock.json.return_value = {
-    'root': {
-      'station': [
-        {
-          'name': 'Milpitas',
-          'etd': [{'abbreviation': dest, 'estimate': [{'minutes': minutes, 'color': color}]}],
-        }
-      ]
-    }
-  }
-  return mock
-
+  monkeypatch.setitem(_cfg._config, 'bart', dict(_BART_CONFIG))
 
-# --- _format_minutes ---
 
+class _Resp:
+  """Minimal stand-in for a successful requests.Response."""
 
-def test_format_minutes_single_digit_zero_padded() -> None:
-  assert bart._format_minutes('5') == '05'
+  def __init__(self, payload: dict[str, Any]) -> None:
+    self._payload = payload
 
+  def raise_for_status(self) -> None:
+    return None
 
-def test_format_minutes_double_digit_unchanged() -> None:
-  assert bart._format_minutes('12') == '12'
+  def json(self) -> dict[str, Any]:
+    return self._payload
 
 
-def test_format_minutes_leaving_returns_zero() -> None:
-  assert bart._format_minutes('Leaving') == '00'
+def _mock_routes_empty() -> _Resp:
+  """Routes API returning no routes (simplifies etd-only tests)."""
+  return _Resp({'root': {'routes': {'route': []}}})
+
+
+def _mock_etd(dest: str = 'DALY', minutes: str = '5', color: str = 'GREEN') -> _Resp:
+  return _Resp(
+    {
+      'root': {
+        'station': [
+          {
+            'name': 'Milpitas',
+            'etd': [{'abbreviation': dest, 'estimate': [{'minutes': minutes, 'color': color}]}],
+          }
+        ]
+      }
+    }
+  )
 
 
-def test_format_minutes_zero_returns_zero() -> None:
-  assert bart._format_minutes('0') == '00'
+# --- _format_minutes ---
 
 
-def test_format_minutes_non_numeric_passthrough() -> None:
-  assert bart._format_minutes('unknown') == 'unknown'
+@pytest.mark.parametrize(
+  'mins,expected',
+  [
+    ('5', '05'),  # single digit zero-padded
+    ('12', '12'),  # double digit unchanged
+    ('Leaving', '00'),
+    ('0', '00'),
+    ('unknown', 'unknown'),  # non-numeric passthrough
+    ('120', '120'),  # outside the lookup table
+    ('007', '07'),
+  ],
+)
+def test_format_minutes(mins: str, expected: str) -> None:
+  assert bart._format_minutes(mins) == expected
 
 
 # --- get_variables ---
@@ -84,12 +87,7 @@ def test_format_minutes_non_numeric_passthrough() -> None:
 def test_get_variables_missing_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
-  def _raise(section: str, key: str) -> str:
-    if section == 'bart' and key == 'api_key':
-      raise ValueError('Missing required config key [bart].api_key in config.toml')
-    return 'value'
-
-  monkeypatch.setattr(_cfg, 'get', _raise)
+  monkeypatch.setitem(_cfg._config, 'bart', {k: v for k, v in _BART_CONFIG.items() if k != 'api_key'})
   with pytest.raises(ValueError, match='api_key'):
     bart.get_variables()
 
@@ -97,12 +95,7 @@ def test_get_variables_missing_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
 def test_get_variables_missing_station(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
-  def _raise(section: str, key: str) -> str:
-    if section == 'bart' and key == 'station':
-      raise ValueError('Missing required config key [bart].station in config.toml')
-    return 'value'
-
-  monkeypatch.setattr(_cfg, 'get', _raise)
+  monkeypatch.setitem(_cfg._config, 'bart', {k: v for k, v in _BART_CONFIG.items() if k != 'station'})
   with pytest.raises(ValueError, match='station'):
     bart.get_variables()
 
@@ -116,9 +109,7 @@ def test_get_variables_returns_station_and_line1(bart_config: None) -> None:
 
 
 def test_get_variables_no_service_when_dest_not_in_etd(bart_config: None) -> None:
-  mock_etd = MagicMock()
-  mock_etd.raise_for_status.return_value = None
-  mock_etd.json.return_value = {'root': {'station': [{'name': 'Milpitas', 'etd': []}]}}
+  mock_etd = _Resp({'root': {'station': [{'name': 'Milpitas', 'etd': []}]}})
   with patch('integrations.bart.fetch_with_retry', side_effect=[_mock_routes_empty(), mock_etd]):
     result = bart.get_variables()
   assert 'NO SERVICE' in result['line1'][0][0]
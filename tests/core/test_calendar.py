@@ -1,6 +1,7 @@
+import functools
 from datetime import datetime, timedelta, timezone
-from typing import Generator
-from unittest.mock import patch
+from typing import Any, Generator
+from unittest.mock import MagicMock, patch
 
 import pytest
 from icalendar import Calendar, Event
@@ -12,13 +13,10 @@ from exceptions import IntegrationDataUnavailableError
 
 
 @pytest.fixture(autouse=True)
-def reset_caches() -> Generator[None, None, None]:
-  """Reset module-level caches before each test."""
-  calendar._ics_cache.clear()
-  calendar._caldav_cache = None
-  yield
-  calendar._ics_cache.clear()
-  calendar._caldav_cache = None
+def reset_caches(monkeypatch: pytest.MonkeyPatch) -> None:
+  """Give each test fresh module-level caches; monkeypatch restores the originals."""
+  monkeypatch.setattr(calendar, '_ics_cache', {})
+  monkeypatch.setattr(calendar, '_caldav_cache', None)
 
 
 @pytest.fixture()
@@ -59,46 +57,97 @@ _UTC = timezone.utc
 # Pinned to noon UTC so events ±3 hours are always within the same calendar day.
 _FIXED_NOW = datetime(2026, 1, 15, 12, 0, 0, tzinfo=_UTC)
 
+# The offsets from _FIXED_NOW that the helpers and tests use, computed once.
+_MINUS_3H = _FIXED_NOW - timedelta(hours=3)
+_MINUS_2H = _FIXED_NOW - timedelta(hours=2)
+_PLUS_1H = _FIXED_NOW + timedelta(hours=1)
+_PLUS_2H = _FIXED_NOW + timedelta(hours=2)
+_PLUS_3H = _FIXED_NOW + timedelta(hours=3)
+_PLUS_4H = _FIXED_NOW + timedelta(hours=4)
+_HOURS_FROM_NOW: dict[float, datetime] = {
+  -3: _MINUS_3H,
+  -2: _MINUS_2H,
+  1: _PLUS_1H,
+  2: _PLUS_2H,
+  3: _PLUS_3H,
+  4: _PLUS_4H,
+}
 
-def _make_ics(events_data: list[dict]) -> bytes:
-  """Build raw ICS bytes from a list of event property dicts."""
+
+def _hours_from_now(hours: float) -> datetime:
+  t = _HOURS_FROM_NOW.get(hours)
+  return t if t is not None else _FIXED_NOW + timedelta(hours=hours)
+
+
+@pytest.fixture()
+def calendar_patches() -> Generator[None, None, None]:
+  """Pin the display timezone to UTC and the clock to _FIXED_NOW."""
+  with patch.multiple(
+    'integrations.calendar',
+    _display_tz=MagicMock(return_value=_UTC),
+    _get_now=MagicMock(return_value=_FIXED_NOW),
+  ):
+    yield
+
+
+# Events are frozen into tuples of (property, value) pairs so identical ICS
+# payloads are built and serialized once per session.
+_EventSpec = tuple[tuple[str, Any], ...]
+
+
+@functools.lru_cache(maxsize=None)
+def _ics_cached(spec: tuple[_EventSpec, ...], cal_color: str | None) -> bytes:
   cal = Calendar()
-  for ev_data in events_data:
+  if cal_color is not None:
+    cal.add('X-APPLE-CALENDAR-COLOR', cal_color)
+  for ev_items in spec:
     ev = Event()
-    for key, val in ev_data.items():
+    for key, val in ev_items:
       ev.add(key, val)
     cal.add_component(ev)
   return cal.to_ical()
 
 
+def _make_ics(events_data: list[dict]) -> bytes:
+  """Build raw ICS bytes from a list of event property dicts."""
+  return _ics_cached(tuple(tuple(ev.items()) for ev in events_data), None)
+
+
 def _make_ics_with_cal_color(events_data: list[dict], cal_color: str) -> bytes:
   """Build raw ICS bytes with an X-APPLE-CALENDAR-COLOR property on the VCALENDAR."""
-  cal = Calendar()
-  cal.add('X-APPLE-CALENDAR-COLOR', cal_color)
-  for ev_data in events_data:
-    ev = Event()
-    for key, val in ev_data.items():
-      ev.add(key, val)
-    cal.add_component(ev)
-  return cal.to_ical()
+  return _ics_cached(tuple(tuple(ev.items()) for ev in events_data), cal_color)
 
 
 def _future_event(title: str = 'MEETING', hours_ahead: float = 2.0) -> dict:
-  start = _FIXED_NOW + timedelta(hours=hours_ahead)
-  end = start + timedelta(hours=1)
+  start = _hours_from_now(hours_ahead)
+  end = _hours_from_now(hours_ahead + 1)
   return {'SUMMARY': title, 'DTSTART': start, 'DTEND': end}
 
 
 def _past_event(title: str = 'OLD MEETING') -> dict:
-  start = _FIXED_NOW - timedelta(hours=3)
-  end = _FIXED_NOW - timedelta(hours=2)
-  return {'SUMMARY': title, 'DTSTART': start, 'DTEND': end}
+  return {'SUMMARY': title, 'DTSTART': _MINUS_3H, 'DTEND': _MINUS_2H}
 
 
 def _allday_event(title: str = 'HOLIDAY') -> dict:
   return {'SUMMARY': title, 'DTSTART': _FIXED_NOW.date()}
 
 
+def _find_indices(lines: list[str], needles: list[str]) -> dict[str, int]:
+  """Map each needle to the index of the first line containing it, in one pass."""
+  found: dict[str, int] = {}
+  for i, ln in enumerate(lines):
+    for needle in needles:
+      if needle not in found and needle in ln:
+        found[needle] = i
+  return found
+
+
+@pytest.fixture(scope='module', autouse=True)
+def warm_icalendar() -> None:
+  """Build and parse one calendar up front so icalendar's lazy setup isn't charged to the first test."""
+  Calendar.from_ical(_make_ics([_future_event(), _allday_event()]))
+
+
 # ── Color helpers ──────────────────────────────────────────────────────────────
 
 
@@ -144,39 +193,33 @@ def test_ics_calendar_color_absent() -> None:
 # ── ICS mode: basic ────────────────────────────────────────────────────────────
 
 
-def test_get_variables_returns_events_key(ical_config_ics: None) -> None:
+def test_get_variables_returns_events_key(ical_config_ics: None, calendar_patches: None) -> None:
   ics = _make_ics([_future_event('TEAM MEETING')])
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
   assert 'events' in result
   assert len(result['events']) == 1
   assert len(result['events'][0]) >= 1
 
 
-def test_get_variables_24h_time_format(ical_config_ics: None) -> None:
+def test_get_variables_24h_time_format(ical_config_ics: None, calendar_patches: None) -> None:
   # Event at 14:30 UTC on the same day as _FIXED_NOW (noon UTC).
   start = _FIXED_NOW.replace(hour=14, minute=30, second=0, microsecond=0)
   end = start + timedelta(hours=1)
   ics = _make_ics([{'SUMMARY': 'DENTIST', 'DTSTART': start, 'DTEND': end}])
 
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
 
   lines = result['events'][0]
   assert any('14:30' in line for line in lines), f'Expected 14:30 in lines: {lines}'
   assert not any('AM' in line or 'PM' in line for line in lines)
 
 
-def test_get_variables_all_day_no_time_prefix(ical_config_ics: None) -> None:
+def test_get_variables_all_day_no_time_prefix(ical_config_ics: None, calendar_patches: None) -> None:
   ics = _make_ics([_allday_event('PROJECT DEADLINE')])
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
   lines = result['events'][0]
   assert any('PROJECT DEADLINE' in line for line in lines)
   # Should have no time component (no colon between two digits)
@@ -188,20 +231,18 @@ def test_get_variables_all_day_no_time_prefix(ical_config_ics: None) -> None:
 # ── ICS mode: color ────────────────────────────────────────────────────────────
 
 
-def test_get_variables_apple_color_auto_detected(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_apple_color_auto_detected(monkeypatch: pytest.MonkeyPatch, calendar_patches: None) -> None:
   import config as _cfg
 
   monkeypatch.setattr(_cfg, '_config', {'calendar': {'urls': ['https://example.com/cal.ics']}, 'scheduler': {}})
   ics = _make_ics_with_cal_color([_future_event('WORK MEETING')], '#007AFFFF')  # blue
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
   lines = result['events'][0]
   assert any(line.startswith('[B]') for line in lines)
 
 
-def test_get_variables_configured_color_used(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_configured_color_used(monkeypatch: pytest.MonkeyPatch, calendar_patches: None) -> None:
   import config as _cfg
 
   monkeypatch.setattr(
@@ -211,14 +252,14 @@ def test_get_variables_configured_color_used(monkeypatch: pytest.MonkeyPatch) ->
   )
   ics = _make_ics([_future_event('PERSONAL EVENT')])
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
   lines = result['events'][0]
   assert any(line.startswith('[V]') for line in lines)
 
 
-def test_get_variables_configured_color_overrides_apple(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_configured_color_overrides_apple(
+  monkeypatch: pytest.MonkeyPatch, calendar_patches: None
+) -> None:
   """User-configured color takes precedence over auto-detected X-APPLE-CALENDAR-COLOR."""
   import config as _cfg
 
@@ -229,9 +270,7 @@ def test_get_variables_configured_color_overrides_apple(monkeypatch: pytest.Monk
   )
   ics = _make_ics_with_cal_color([_future_event('MEETING')], '#FF2D30FF')  # red in ICS
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
   lines = result['events'][0]
   assert any(line.startswith('[G]') for line in lines)
 
@@ -239,69 +278,56 @@ def test_get_variables_configured_color_overrides_apple(monkeypatch: pytest.Monk
 # ── ICS mode: filtering ────────────────────────────────────────────────────────
 
 
-def test_get_variables_timed_event_ended_skipped(ical_config_ics: None) -> None:
+def test_get_variables_timed_event_ended_skipped(ical_config_ics: None, calendar_patches: None) -> None:
   ics = _make_ics([_past_event('FINISHED MEETING')])
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        with pytest.raises(IntegrationDataUnavailableError):
-          calendar.get_variables()
+    with pytest.raises(IntegrationDataUnavailableError):
+      calendar.get_variables()
 
 
-def test_get_variables_no_summary_skipped(ical_config_ics: None) -> None:
-  start = _FIXED_NOW + timedelta(hours=1)
-  end = _FIXED_NOW + timedelta(hours=2)
-  ics = _make_ics([{'DTSTART': start, 'DTEND': end}])
+def test_get_variables_no_summary_skipped(ical_config_ics: None, calendar_patches: None) -> None:
+  ics = _make_ics([{'DTSTART': _PLUS_1H, 'DTEND': _PLUS_2H}])
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        with pytest.raises(IntegrationDataUnavailableError):
-          calendar.get_variables()
+    with pytest.raises(IntegrationDataUnavailableError):
+      calendar.get_variables()
 
 
-def test_get_variables_cancelled_skipped(ical_config_ics: None) -> None:
+def test_get_variables_cancelled_skipped(ical_config_ics: None, calendar_patches: None) -> None:
   ics = _make_ics(
     [
       {
         'SUMMARY': 'CANCELLED MEETING',
         'STATUS': 'CANCELLED',
-        'DTSTART': _FIXED_NOW + timedelta(hours=1),
-        'DTEND': _FIXED_NOW + timedelta(hours=2),
+        'DTSTART': _PLUS_1H,
+        'DTEND': _PLUS_2H,
       }
     ]
   )
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        with pytest.raises(IntegrationDataUnavailableError):
-          calendar.get_variables()
+    with pytest.raises(IntegrationDataUnavailableError):
+      calendar.get_variables()
 
 
-def test_get_variables_no_events_raises(ical_config_ics: None) -> None:
+def test_get_variables_no_events_raises(ical_config_ics: None, calendar_patches: None) -> None:
   ics = _make_ics([])
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        with pytest.raises(IntegrationDataUnavailableError, match='no events today'):
-          calendar.get_variables()
+    with pytest.raises(IntegrationDataUnavailableError, match='no events today'):
+      calendar.get_variables()
 
 
 # ── ICS mode: sort order ───────────────────────────────────────────────────────
 
 
-def test_get_variables_timed_before_allday(ical_config_ics: None) -> None:
+def test_get_variables_timed_before_allday(ical_config_ics: None, calendar_patches: None) -> None:
   ics = _make_ics([_allday_event('ALL DAY EVENT'), _future_event('TIMED EVENT')])
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
   lines = result['events'][0]
-  timed_idx = next(i for i, ln in enumerate(lines) if 'TIMED EVENT' in ln)
-  allday_idx = next(i for i, ln in enumerate(lines) if 'ALL DAY EVENT' in ln)
-  assert timed_idx < allday_idx
+  idx = _find_indices(lines, ['TIMED EVENT', 'ALL DAY EVENT'])
+  assert idx['TIMED EVENT'] < idx['ALL DAY EVENT']
 
 
-def test_get_variables_url_order_tiebreaker(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_url_order_tiebreaker(monkeypatch: pytest.MonkeyPatch, calendar_patches: None) -> None:
   """When two events have the same start time, the event from URL 0 comes first."""
   import config as _cfg
 
@@ -310,8 +336,7 @@ def test_get_variables_url_order_tiebreaker(monkeypatch: pytest.MonkeyPatch) ->
     '_config',
     {'calendar': {'urls': ['https://example.com/a.ics', 'https://example.com/b.ics']}, 'scheduler': {}},
   )
-  start = _FIXED_NOW + timedelta(hours=2)
-  end = start + timedelta(hours=1)
+  start, end = _PLUS_2H, _PLUS_3H
   ics_a = _make_ics([{'SUMMARY': 'URL A EVENT', 'DTSTART': start, 'DTEND': end}])
   ics_b = _make_ics([{'SUMMARY': 'URL B EVENT', 'DTSTART': start, 'DTEND': end}])
 
@@ -319,16 +344,13 @@ def test_get_variables_url_order_tiebreaker(monkeypatch: pytest.MonkeyPatch) ->
     return ics_a if 'a.ics' in url else ics_b
 
   with patch('integrations.calendar._fetch_ics_bytes', side_effect=fake_fetch):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
   lines = result['events'][0]
-  a_idx = next(i for i, ln in enumerate(lines) if 'URL A EVENT' in ln)
-  b_idx = next(i for i, ln in enumerate(lines) if 'URL B EVENT' in ln)
-  assert a_idx < b_idx
+  idx = _find_indices(lines, ['URL A EVENT', 'URL B EVENT'])
+  assert idx['URL A EVENT'] < idx['URL B EVENT']
 
 
-def test_get_variables_multiple_urls_merged(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_multiple_urls_merged(monkeypatch: pytest.MonkeyPatch, calendar_patches: None) -> None:
   import config as _cfg
 
   monkeypatch.setattr(
@@ -343,9 +365,7 @@ def test_get_variables_multiple_urls_merged(monkeypatch: pytest.MonkeyPatch) ->
     return ics_a if 'a.ics' in url else ics_b
 
   with patch('integrations.calendar._fetch_ics_bytes', side_effect=fake_fetch):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
   lines = result['events'][0]
   assert any('EVENT FROM A' in ln for ln in lines)
   assert any('EVENT FROM B' in ln for ln in lines)
@@ -354,7 +374,7 @@ def test_get_variables_multiple_urls_merged(monkeypatch: pytest.MonkeyPatch) ->
 # ── ICS mode: failure handling ─────────────────────────────────────────────────
 
 
-def test_get_variables_one_url_fails_gracefully(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_one_url_fails_gracefully(monkeypatch: pytest.MonkeyPatch, calendar_patches: None) -> None:
   """If one URL fails with no cache, it is skipped; events from the other URL still show."""
   import config as _cfg
 
@@ -371,9 +391,7 @@ def test_get_variables_one_url_fails_gracefully(monkeypatch: pytest.MonkeyPatch)
     return ics_ok
 
   with patch('integrations.calendar._fetch_ics_bytes', side_effect=fake_fetch):
-    with patch('integrations.calendar._display_tz', return_value=_UTC):
-      with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-        result = calendar.get_variables()
+    result = calendar.get_variables()
   lines = result['events'][0]
   assert any('OK EVENT' in ln for ln in lines)
 
@@ -433,7 +451,7 @@ def test_nearest_color_tag_black() -> None:
 # ── Both modes simultaneously ──────────────────────────────────────────────────
 
 
-def test_get_variables_both_modes_merged(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_both_modes_merged(monkeypatch: pytest.MonkeyPatch, calendar_patches: None) -> None:
   """Events from ICS and CalDAV are merged into a single sorted list."""
   from unittest.mock import MagicMock
 
@@ -464,20 +482,19 @@ def test_get_variables_both_modes_merged(monkeypatch: pytest.MonkeyPatch) -> Non
 
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
     with patch('integrations.calendar._get_caldav_calendars', return_value=[(fake_caldav_cal, '[G]')]):
-      with patch('integrations.calendar._display_tz', return_value=_UTC):
-        with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-          result = calendar.get_variables()
+      result = calendar.get_variables()
 
   lines = result['events'][0]
   assert any('ICS EVENT' in ln for ln in lines), f'ICS event missing from: {lines}'
   assert any('CALDAV EVENT' in ln for ln in lines), f'CalDAV event missing from: {lines}'
   # ICS event is 1h ahead, CalDAV is 3h ahead → ICS should sort first.
-  ics_idx = next(i for i, ln in enumerate(lines) if 'ICS EVENT' in ln)
-  caldav_idx = next(i for i, ln in enumerate(lines) if 'CALDAV EVENT' in ln)
-  assert ics_idx < caldav_idx
+  idx = _find_indices(lines, ['ICS EVENT', 'CALDAV EVENT'])
+  assert idx['ICS EVENT'] < idx['CALDAV EVENT']
 
 
-def test_get_variables_caldav_absent_does_not_block_ics(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_caldav_absent_does_not_block_ics(
+  monkeypatch: pytest.MonkeyPatch, calendar_patches: None
+) -> None:
   """If CalDAV returns no calendars, ICS events still appear."""
   import config as _cfg
 
@@ -499,9 +516,7 @@ def test_get_variables_caldav_absent_does_not_block_ics(monkeypatch: pytest.Monk
 
   with patch('integrations.calendar._fetch_ics_bytes', return_value=ics):
     with patch('integrations.calendar._get_caldav_calendars', return_value=[]):
-      with patch('integrations.calendar._display_tz', return_value=_UTC):
-        with patch('integrations.calendar._get_now', return_value=_FIXED_NOW):
-          result = calendar.get_variables()
+      result = calendar.get_variables()
 
   lines = result['events'][0]
   assert any('ICS ONLY EVENT' in ln for ln in lines)
@@ -1,5 +1,5 @@
 from typing import Any, Generator
-from unittest.mock import MagicMock, patch
+from unittest.mock import patch
 
 import pytest
 import requests
@@ -9,13 +9,10 @@ from exceptions import IntegrationDataUnavailableError
 
 
 @pytest.fixture(autouse=True)
-def reset_caches() -> Generator[None, None, None]:
-  """Reset module-level caches before each test."""
-  discogs._username_cache = None
-  discogs._collection_cache = None
-  yield
-  discogs._username_cache = None
-  discogs._collection_cache = None
+def reset_caches(monkeypatch: pytest.MonkeyPatch) -> None:
+  """Give each test fresh module-level caches; monkeypatch restores the originals."""
+  monkeypatch.setattr(discogs, '_username_cache', None)
+  monkeypatch.setattr(discogs, '_collection_cache', None)
 
 
 @pytest.fixture(autouse=True)
@@ -33,11 +30,21 @@ def discogs_config(monkeypatch: pytest.MonkeyPatch) -> None:
   monkeypatch.setattr(_cfg, '_config', {'discogs': {'token': 'test-token'}})
 
 
-def _mock_identity(username: str = 'testuser') -> MagicMock:
-  mock = MagicMock()
-  mock.raise_for_status.return_value = None
-  mock.json.return_value = {'username': username, 'id': 1}
-  return mock
+class _Resp:
+  """Minimal stand-in for a successful requests.Response."""
+
+  def __init__(self, payload: dict[str, Any]) -> None:
+    self._payload = payload
+
+  def raise_for_status(self) -> None:
+    return None
+
+  def json(self) -> dict[str, Any]:
+    return self._payload
+
+
+def _mock_identity(username: str = 'testuser') -> _Resp:
+  return _Resp({'username': username, 'id': 1})
 
 
 def _mock_page(
@@ -45,14 +52,13 @@ def _mock_page(
   total: int,
   page: int = 1,
   pages: int = 1,
-) -> MagicMock:
-  mock = MagicMock()
-  mock.raise_for_status.return_value = None
-  mock.json.return_value = {
-    'pagination': {'items': total, 'pages': pages, 'page': page, 'per_page': 50},
-    'releases': releases,
-  }
-  return mock
+) -> _Resp:
+  return _Resp(
+    {
+      'pagination': {'items': total, 'pages': pages, 'page': page, 'per_page': 50},
+      'releases': releases,
+    }
+  )
 
 
 def _release(
@@ -9,7 +9,8 @@ from integrations.http import CacheEntry, fetch_with_retry, user_agent
 
 @pytest.fixture(autouse=True)
 def reset_ua_cache() -> None:
-  """Reset the user_agent cache so each test starts clean."""
+  """Reset the version and user_agent caches so each test starts clean."""
+  http_mod._version_cache = None
   http_mod._ua_cache = None
 
 
@@ -153,3 +154,21 @@ def test_user_agent_cached() -> None:
     user_agent()
     user_agent()
   mock_ver.assert_called_once()
+
+
+def test_app_version_shares_cache_with_user_agent() -> None:
+  with patch('integrations.http.importlib.metadata.version', return_value='2.0.0') as mock_ver:
+    assert http_mod.app_version() == '2.0.0'
+    assert user_agent() == 'e-note-ion/2.0.0'
+  mock_ver.assert_called_once()
+
+
+def test_fetch_with_retry_uses_session_when_given() -> None:
+  resp = _mock_response(200)
+  session = MagicMock(spec=requests.Session)
+  session.request.return_value = resp
+  with patch('integrations.http.requests.request') as mock_req:
+    result = fetch_with_retry('GET', 'https://example.com', session=session, timeout=5)
+  assert result is resp
+  session.request.assert_called_once_with('GET', 'https://example.com', timeout=5)
+  mock_req.assert_not_called()
@@ -1,8 +1,9 @@
+import heapq
 import json
 import threading
 import time
+from concurrent.futures import Future
 from pathlib import Path
-from queue import Empty
 from typing import Any, Generator
 from unittest.mock import MagicMock, patch
 
@@ -15,21 +16,21 @@ from exceptions import IntegrationDataUnavailableError
 
 
 @pytest.fixture()
-def sched() -> Generator[BackgroundScheduler, None, None]:
-  s = BackgroundScheduler()
-  yield s
-  if s.running:
-    s.shutdown(wait=False)
+def sched(clean_scheduler: BackgroundScheduler) -> BackgroundScheduler:
+  # The scheduler is shared across tests; forget the stems earlier tests loaded.
+  _mod._jobs_by_stem.pop(clean_scheduler, None)
+  return clean_scheduler
 
 
 @pytest.fixture(autouse=True)
 def drain_queue() -> Generator[None, None, None]:
   """Drain the shared queue before each test to prevent cross-test pollution."""
-  while True:
-    try:
-      _mod._queue.get_nowait()
-    except Empty:
-      break
+  _mod._queue.clear()
+  _mod._tagged.clear()
+  _mod._superseded = 0
+  _mod._compact_at = _mod._QUEUE_COMPACT_MIN
+  _mod._last_arrival = 0.0
+  _mod._prefetch = None
   yield
 
 
@@ -57,6 +58,10 @@ def test_parse_cron_too_many_fields() -> None:
     _mod.parse_cron('0 8 * * * extra')
 
 
+def test_parse_cron_cached() -> None:
+  assert _mod.parse_cron('0 * * * *') is _mod.parse_cron('0 * * * *')
+
+
 # --- QueuedMessage ordering ---
 
 
@@ -85,7 +90,7 @@ def test_pop_valid_message_returns_message() -> None:
     hold=60,
     timeout=60,
   )
-  _mod._queue.put(msg)
+  _mod._put(msg)
   with patch('time.sleep'):
     result = _mod.pop_valid_message()
   assert result is msg
@@ -110,8 +115,8 @@ def test_pop_valid_message_discards_expired_returns_next() -> None:
     hold=60,
     timeout=60,
   )
-  _mod._queue.put(expired)
-  _mod._queue.put(valid)
+  _mod._put(expired)
+  _mod._put(valid)
   with patch('time.sleep'):
     result = _mod.pop_valid_message()
   assert result is not None
@@ -124,11 +129,127 @@ def test_pop_valid_message_returns_none_when_empty() -> None:
   assert result is None
 
 
+def test_pop_valid_message_honours_timeout() -> None:
+  start = time.monotonic()
+  assert _mod.pop_valid_message(timeout=0.05) is None
+  assert time.monotonic() - start < 0.5
+
+
+def test_pop_valid_message_skips_coalesce_for_waiting_messages() -> None:
+  msg = _mod.QueuedMessage(
+    priority=5, seq=0, name='waited', scheduled_at=time.monotonic() - 5, data={}, hold=60, timeout=60
+  )
+  _mod._put(msg)
+  with patch('time.sleep') as mock_sleep:
+    assert _mod.pop_valid_message() is msg
+  mock_sleep.assert_not_called()
+
+
+def test_pop_valid_message_coalesces_fresh_arrivals() -> None:
+  _mod.enqueue(5, {}, 60, 60, 'fresh')
+  with patch('time.sleep') as mock_sleep:
+    _mod.pop_valid_message()
+  mock_sleep.assert_called_once()
+  assert 0 < mock_sleep.call_args.args[0] <= _mod._COALESCE_WINDOW
+
+
+def test_pop_valid_message_wakes_on_enqueue() -> None:
+  """A blocked pop returns as soon as another thread enqueues, not on a poll tick."""
+  timer = threading.Timer(0.05, _mod.enqueue, args=(5, {}, 60, 60, 'late'))
+  timer.start()
+  start = time.monotonic()
+  result = _mod.pop_valid_message(timeout=None)
+  timer.join()
+  assert result is not None
+  assert result.name == 'late'
+  assert time.monotonic() - start < 0.5
+
+
+def test_queued_message_deadline_from_schedule_and_timeout() -> None:
+  msg = _mod.QueuedMessage(priority=0, seq=0, name='m', scheduled_at=100.0, data={}, hold=60, timeout=30)
+  assert msg.deadline == 130.0
+
+
+def test_clock_matches_strftime() -> None:
+  wall = time.time()
+  assert _mod._clock(wall) == time.strftime('%H:%M:%S', time.localtime(wall))
+
+
+def test_enqueue_records_wall_clock_time() -> None:
+  before = time.time()
+  _mod.enqueue(5, {}, 60, 60, 'm')
+  assert before <= _mod._queue[0].scheduled_wall <= time.time()
+
+
+def test_queued_message_derives_wall_clock_when_unset() -> None:
+  msg = _mod.QueuedMessage(
+    priority=0, seq=0, name='m', scheduled_at=time.monotonic() - 10, data={}, hold=60, timeout=30
+  )
+  assert abs(msg.scheduled_wall - (time.time() - 10)) < 1
+
+
+def test_enqueue_leaves_expired_messages_below_compaction_size() -> None:
+  expired = _mod.QueuedMessage(
+    priority=9, seq=0, name='expired', scheduled_at=time.monotonic() - 100, data={}, hold=60, timeout=10
+  )
+  _mod._put(expired)
+  _mod.enqueue(5, {}, 60, 60, 'new')
+  assert sorted(m.name for m in _mod._queue) == ['expired', 'new']
+
+
+def test_enqueue_prunes_expired_messages_once_heap_reaches_compaction_size(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(_mod, '_compact_at', 2)
+  expired = _mod.QueuedMessage(
+    priority=9, seq=0, name='expired', scheduled_at=time.monotonic() - 100, data={}, hold=60, timeout=10
+  )
+  alive = _mod.QueuedMessage(
+    priority=1, seq=1, name='alive', scheduled_at=time.monotonic(), data={}, hold=60, timeout=60
+  )
+  _mod._put(expired)
+  _mod._put(alive)
+  _mod.enqueue(5, {}, 60, 60, 'new')
+  assert sorted(m.name for m in _mod._queue) == ['alive', 'new']
+  assert heapq.heappop(_mod._queue).name == 'new'  # heap order preserved after pruning
+  assert _mod._compact_at == _mod._QUEUE_COMPACT_MIN
+
+
+def test_pop_valid_message_compacts_after_run_of_expired(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(_mod, '_EXPIRED_COMPACT_THRESHOLD', 2)
+  old = time.monotonic() - 100
+  for seq, priority in enumerate([9, 8, 1]):
+    _mod._put(
+      _mod.QueuedMessage(
+        priority=priority, seq=seq, name=f'expired{seq}', scheduled_at=old, data={}, hold=60, timeout=10
+      )
+    )
+  valid = _mod.QueuedMessage(
+    priority=5, seq=3, name='valid', scheduled_at=time.monotonic(), data={}, hold=60, timeout=60
+  )
+  _mod._put(valid)
+  with patch('time.sleep'):
+    assert _mod.pop_valid_message() is valid
+  # The low-priority expired message below 'valid' went with the compaction.
+  assert not _mod._queue
+
+
+def test_pop_valid_message_coalesce_uses_latest_push() -> None:
+  _mod._put(
+    _mod.QueuedMessage(priority=5, seq=0, name='old', scheduled_at=time.monotonic() - 5, data={}, hold=60, timeout=60)
+  )
+  assert _mod._last_arrival < time.monotonic() - 4
+  _mod.enqueue(1, {}, 60, 60, 'fresh')
+  with patch('time.sleep') as mock_sleep:
+    result = _mod.pop_valid_message()
+  assert result is not None
+  assert result.name == 'old'
+  mock_sleep.assert_called_once()
+
+
 def test_pop_valid_message_prefers_higher_priority_coscheduled() -> None:
   low = _mod.QueuedMessage(priority=0, seq=0, name='low', scheduled_at=time.monotonic(), data={}, hold=60, timeout=60)
   high = _mod.QueuedMessage(priority=9, seq=1, name='high', scheduled_at=time.monotonic(), data={}, hold=60, timeout=60)
-  _mod._queue.put(low)
-  _mod._queue.put(high)
+  _mod._put(low)
+  _mod._put(high)
   with patch('time.sleep'):
     result = _mod.pop_valid_message()
   assert result is not None
@@ -138,15 +259,28 @@ def test_pop_valid_message_prefers_higher_priority_coscheduled() -> None:
 def test_pop_valid_message_requeues_lower_priority() -> None:
   low = _mod.QueuedMessage(priority=0, seq=0, name='low', scheduled_at=time.monotonic(), data={}, hold=60, timeout=60)
   high = _mod.QueuedMessage(priority=9, seq=1, name='high', scheduled_at=time.monotonic(), data={}, hold=60, timeout=60)
-  _mod._queue.put(low)
-  _mod._queue.put(high)
+  _mod._put(low)
+  _mod._put(high)
   with patch('time.sleep'):
     _mod.pop_valid_message()
-  assert not _mod._queue.empty()
-  requeued = _mod._queue.get_nowait()
+  assert _mod._queue
+  requeued = heapq.heappop(_mod._queue)
   assert requeued.name == 'low'
 
 
+def test_pop_valid_message_leaves_rest_in_priority_order() -> None:
+  for seq, priority in enumerate([3, 7, 1, 9, 5, 7]):
+    _mod._put(
+      _mod.QueuedMessage(
+        priority=priority, seq=seq, name=str(seq), scheduled_at=time.monotonic(), data={}, hold=60, timeout=60
+      )
+    )
+  with patch('time.sleep'):
+    popped = [_mod.pop_valid_message() for _ in range(6)]
+  assert [(m.priority, m.seq) for m in popped if m is not None] == [(9, 3), (7, 1), (7, 5), (5, 4), (3, 0), (1, 2)]
+  assert not _mod._queue
+
+
 def test_pop_valid_message_discards_expired_in_batch() -> None:
   expired = _mod.QueuedMessage(
     priority=9, seq=0, name='expired', scheduled_at=time.monotonic() - 100, data={}, hold=60, timeout=10
@@ -154,13 +288,13 @@ def test_pop_valid_message_discards_expired_in_batch() -> None:
   valid = _mod.QueuedMessage(
     priority=0, seq=1, name='valid', scheduled_at=time.monotonic(), data={}, hold=60, timeout=60
   )
-  _mod._queue.put(expired)
-  _mod._queue.put(valid)
+  _mod._put(expired)
+  _mod._put(valid)
   with patch('time.sleep'):
     result = _mod.pop_valid_message()
   assert result is not None
   assert result.name == 'valid'
-  assert _mod._queue.empty()
+  assert not _mod._queue
 
 
 # --- _load_file ---
@@ -283,6 +417,28 @@ def test_load_file_registers_job(sched: BackgroundScheduler, tmp_path: Path) ->
   assert len(sched.get_jobs()) == 1
 
 
+def test_load_file_reload_replaces_jobs(sched: BackgroundScheduler, tmp_path: Path) -> None:
+  f = tmp_path / 'test.json'
+  f.write_text(json.dumps(_make_content()))
+  _mod._load_file(sched, f, False)
+  content = _make_content()
+  content['templates']['other'] = content['templates'].pop('tmpl')
+  f.write_text(json.dumps(content))
+  _mod._load_file(sched, f, False)
+  assert [job.id for job in sched.get_jobs()] == [f'{tmp_path.name}.test.other']
+
+
+def test_load_file_reload_leaves_other_files_alone(sched: BackgroundScheduler, tmp_path: Path) -> None:
+  a = tmp_path / 'a.json'
+  b = tmp_path / 'b.json'
+  a.write_text(json.dumps(_make_content()))
+  b.write_text(json.dumps(_make_content()))
+  _mod._load_file(sched, a, False)
+  _mod._load_file(sched, b, False)
+  _mod._load_file(sched, a, False)
+  assert sorted(job.id for job in sched.get_jobs()) == [f'{tmp_path.name}.a.tmpl', f'{tmp_path.name}.b.tmpl']
+
+
 def test_load_file_invalid_priority_raises(sched: BackgroundScheduler, tmp_path: Path) -> None:
   f = tmp_path / 'bad.json'
   f.write_text(json.dumps(_make_content(priority=99)))
@@ -316,7 +472,7 @@ def test_load_file_public_mode_keeps_non_private(sched: BackgroundScheduler, tmp
 
 def test_enqueue_puts_message_on_queue() -> None:
   _mod.enqueue(priority=5, data={'x': 1}, hold=30, timeout=60, name='test')
-  msg = _mod._queue.get_nowait()
+  msg = heapq.heappop(_mod._queue)
   assert msg.priority == 5
   assert msg.name == 'test'
   assert msg.hold == 30
@@ -328,8 +484,8 @@ def test_enqueue_seq_increments() -> None:
   _mod.enqueue(priority=5, data={}, hold=10, timeout=10, name='first')
   _mod.enqueue(priority=5, data={}, hold=10, timeout=10, name='second')
   # Both have the same priority, so lower seq is popped first.
-  msg1 = _mod._queue.get_nowait()
-  msg2 = _mod._queue.get_nowait()
+  msg1 = heapq.heappop(_mod._queue)
+  msg2 = heapq.heappop(_mod._queue)
   assert msg1.seq < msg2.seq
 
 
@@ -337,8 +493,8 @@ def test_enqueue_supersede_tag_removes_earlier_same_tagged() -> None:
   _mod.enqueue(priority=8, data={}, hold=60, timeout=60, name='first', supersede_tag='plex')
   _mod.enqueue(priority=8, data={}, hold=60, timeout=60, name='second', supersede_tag='plex')
   # Only the latest tagged message should remain.
-  assert _mod._queue.qsize() == 1
-  msg = _mod._queue.get_nowait()
+  assert len(_mod._queue) == 1
+  msg = heapq.heappop(_mod._queue)
   assert msg.name == 'second'
 
 
@@ -347,15 +503,56 @@ def test_enqueue_supersede_tag_leaves_other_tags_intact() -> None:
   _mod.enqueue(priority=8, data={}, hold=60, timeout=60, name='paused', supersede_tag='plex')
   _mod.enqueue(priority=8, data={}, hold=60, timeout=60, name='now_playing', supersede_tag='plex')
   # aria (no tag) must survive; only the latest plex-tagged message remains.
-  assert _mod._queue.qsize() == 2
+  assert sorted(m.name for m in _mod._queue if not m.superseded) == ['aria', 'now_playing']
   with patch('time.sleep'):
     first = _mod.pop_valid_message()
   assert first is not None
   assert first.name == 'aria'
-  second = _mod._queue.get_nowait()
+  second = _mod._head()  # skips the superseded tombstone
+  assert second is not None
   assert second.name == 'now_playing'
 
 
+def test_enqueue_supersede_marks_instead_of_rebuilding() -> None:
+  _mod.enqueue(priority=5, data={}, hold=60, timeout=60, name='a')
+  _mod.enqueue(priority=5, data={}, hold=60, timeout=60, name='b')
+  _mod.enqueue(priority=8, data={}, hold=60, timeout=60, name='old', supersede_tag='plex')
+  old = next(m for m in _mod._queue if m.name == 'old')
+  _mod.enqueue(priority=8, data={}, hold=60, timeout=60, name='new', supersede_tag='plex')
+  assert old.superseded
+  assert old in _mod._queue  # left in place as a tombstone
+  assert _mod._superseded == 1
+  with patch('time.sleep'):
+    result = _mod.pop_valid_message()
+  assert result is not None
+  assert result.name == 'new'
+  assert _mod._superseded == 0
+  assert sorted(m.name for m in _mod._queue) == ['a', 'b']
+
+
+def test_do_hold_ignores_superseded_head() -> None:
+  _mod.enqueue(priority=9, data={}, hold=60, timeout=60, name='old', supersede_tag='plex')
+  _mod.enqueue(priority=1, data={}, hold=60, timeout=60, name='filler')
+  _mod.enqueue(priority=1, data={}, hold=60, timeout=60, name='new', supersede_tag='plex')
+  with _mod._queue_cv:
+    head = _mod._head()
+  assert head is not None
+  assert head.name != 'old'
+
+
+def test_enqueue_supersede_tag_concurrent_leaves_one() -> None:
+  def burst() -> None:
+    for _ in range(50):
+      _mod.enqueue(priority=8, data={}, hold=60, timeout=60, name='plex', supersede_tag='plex')
+
+  threads = [threading.Thread(target=burst) for _ in range(4)]
+  for t in threads:
+    t.start()
+  for t in threads:
+    t.join()
+  assert sum(not m.superseded for m in _mod._queue) == 1
+
+
 # --- load_content ---
 
 
@@ -417,6 +614,42 @@ def test_load_content_missing_dirs_dont_raise(
   assert len(sched.get_jobs()) == 0
 
 
+def test_load_content_returns_scheduled_integrations(
+  sched: BackgroundScheduler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+  user_dir = tmp_path / 'content' / 'user'
+  user_dir.mkdir(parents=True)
+  (user_dir / 'bart.json').write_text(json.dumps(_make_content_with_refresh(60)))
+  _make_file(user_dir)
+  monkeypatch.chdir(tmp_path)
+  assert _mod.load_content(sched) == {'bart'}
+  assert _mod.load_content(sched, content_enabled={'test'}) == set()
+
+
+def test_load_content_ignores_non_json_and_directories(
+  sched: BackgroundScheduler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+  user_dir = tmp_path / 'content' / 'user'
+  user_dir.mkdir(parents=True)
+  _make_file(user_dir)
+  _make_file(user_dir, 'notes.txt')
+  (user_dir / 'dir.json').mkdir()
+  monkeypatch.chdir(tmp_path)
+  _mod.load_content(sched)
+  assert [job.id for job in sched.get_jobs()] == ['user.test.tmpl']
+
+
+def test_load_content_follows_symlinked_files(
+  sched: BackgroundScheduler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+  user_dir = tmp_path / 'content' / 'user'
+  user_dir.mkdir(parents=True)
+  (user_dir / 'test.json').symlink_to(_make_file(tmp_path, 'target.json'))
+  monkeypatch.chdir(tmp_path)
+  _mod.load_content(sched)
+  assert [job.id for job in sched.get_jobs()] == ['user.test.tmpl']
+
+
 def test_load_content_user_filtered_when_content_enabled_set(
   sched: BackgroundScheduler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
 ) -> None:
@@ -562,6 +795,34 @@ def test_load_file_skips_disabled_template(
   assert len(sched.get_jobs()) == 0
 
 
+def test_parse_file_records_only_non_empty_overrides(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+  import config as _cfg
+
+  content = _make_content()
+  content['templates']['other'] = dict(content['templates']['tmpl'])
+  f = tmp_path / 'test.json'
+  f.write_text(json.dumps(content))
+  monkeypatch.setattr(_cfg, '_config', {'test': {'schedules': {'other': {'hold': 5}}}})
+  parsed = _mod._parse_file(f, False)
+  assert {spec.name: spec.override for spec in parsed.jobs} == {'tmpl': None, 'other': {'hold': 5}}
+
+
+def test_load_file_logs_summary_as_one_record(
+  sched: BackgroundScheduler, tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+  content = _make_content()
+  content['templates']['other'] = dict(content['templates']['tmpl'])
+  f = tmp_path / 'test.json'
+  f.write_text(json.dumps(content))
+  with caplog.at_level('INFO', logger='scheduler'):
+    _mod._load_file(sched, f, False)
+  records = [r for r in caplog.records if r.getMessage().startswith('Loaded ')]
+  assert len(records) == 1
+  lines = records[0].getMessage().splitlines()
+  assert lines[0] == f'Loaded {tmp_path.name}/test.json:'
+  assert [line.split()[1] for line in lines[1:]] == ['tmpl', 'other']
+
+
 def test_load_file_disabled_false_does_not_skip(
   sched: BackgroundScheduler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch
 ) -> None:
@@ -695,7 +956,7 @@ def test_worker_board_locked_requeues_within_timeout() -> None:
   ):
     with pytest.raises(KeyboardInterrupt):
       _mod.worker()
-  assert not _mod._queue.empty()
+  assert _mod._queue
 
 
 def test_worker_board_locked_discards_after_timeout() -> None:
@@ -707,7 +968,7 @@ def test_worker_board_locked_discards_after_timeout() -> None:
   ):
     with pytest.raises(KeyboardInterrupt):
       _mod.worker()
-  assert _mod._queue.empty()
+  assert not _mod._queue
 
 
 def test_worker_log_includes_template_name(caplog: pytest.LogCaptureFixture) -> None:
@@ -749,6 +1010,28 @@ def test_worker_clears_stale_hold_interrupt_before_hold() -> None:
   assert hold_calls == [False], '_hold_interrupt must be cleared before _do_hold is called'
 
 
+def test_worker_reads_min_hold_once() -> None:
+  msg = _make_worker_msg(scheduled_at=time.monotonic(), timeout=3600)
+  holds: list[int] = []
+
+  def _fake_do_hold(m: Any, min_hold: int, **kw: Any) -> None:
+    holds.append(min_hold)
+    if len(holds) == 2:
+      raise KeyboardInterrupt()
+
+  with (
+    patch.object(_mod, 'pop_valid_message', return_value=msg),
+    patch('integrations.vestaboard.set_state'),
+    patch.object(_mod, '_do_hold', side_effect=_fake_do_hold),
+    patch.object(_mod, '_get_min_hold', return_value=42) as mock_min_hold,
+  ):
+    with pytest.raises(KeyboardInterrupt):
+      _mod.worker()
+
+  assert holds == [42, 42]
+  mock_min_hold.assert_called_once()
+
+
 def test_worker_sets_hold_tag_before_set_state() -> None:
   # Regression: board displacement checks in concurrent webhook handlers
   # (e.g. Plex pause arriving while now_playing is being sent to the board)
@@ -883,7 +1166,7 @@ def test_worker_refires_interrupt_when_same_tag_message_queued_during_set_state(
 
   def _fake_set_state(*_args: Any, **_kwargs: Any) -> None:
     # Simulate pause arriving during the set_state API call.
-    _mod._queue.put(paused)
+    _mod._put(paused)
 
   with (
     patch.object(_mod, 'pop_valid_message', return_value=now_playing),
@@ -1022,11 +1305,12 @@ def test_main_note_startup_banner(monkeypatch: pytest.MonkeyPatch, caplog: pytes
     patch('config.get_model', return_value='note'),
     patch('config.get_public_mode', return_value=False),
     patch('config.get_content_enabled', return_value=None),
-    patch.object(_mod, 'load_content'),
+    patch.object(_mod, 'load_content', return_value=set()),
     patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
     patch('threading.Thread'),
     patch('apscheduler.schedulers.background.BackgroundScheduler', return_value=mock_sched),
-    patch('time.sleep', side_effect=KeyboardInterrupt),
+    patch('signal.signal'),
+    patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
   ):
     _mod.main()
   assert 'Note (3×15)' in caplog.text
@@ -1040,17 +1324,20 @@ def test_main_version_in_banner(caplog: pytest.LogCaptureFixture) -> None:
     patch('config.get_model', return_value='note'),
     patch('config.get_public_mode', return_value=False),
     patch('config.get_content_enabled', return_value=None),
-    patch.object(_mod, 'load_content'),
+    patch.object(_mod, 'load_content', return_value=set()),
     patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
     patch('threading.Thread'),
     patch('apscheduler.schedulers.background.BackgroundScheduler', return_value=mock_sched),
-    patch('time.sleep', side_effect=KeyboardInterrupt),
+    patch('signal.signal'),
+    patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
     patch('importlib.metadata.version', return_value='1.2.3'),
+    patch('integrations.http._version_cache', None),
   ):
     _mod.main()
   assert 'v1.2.3' in caplog.text
 
 
+@pytest.mark.mutates_vb_model
 def test_main_flagship_sets_model_and_banner(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
   monkeypatch.setattr(vb, 'model', vb.VestaboardModel.NOTE)  # ensures restoration
   mock_sched = _mock_sched()
@@ -1060,11 +1347,12 @@ def test_main_flagship_sets_model_and_banner(monkeypatch: pytest.MonkeyPatch, ca
     patch('config.get_model', return_value='flagship'),
     patch('config.get_public_mode', return_value=False),
     patch('config.get_content_enabled', return_value=None),
-    patch.object(_mod, 'load_content'),
+    patch.object(_mod, 'load_content', return_value=set()),
     patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
     patch('threading.Thread'),
     patch('apscheduler.schedulers.background.BackgroundScheduler', return_value=mock_sched),
-    patch('time.sleep', side_effect=KeyboardInterrupt),
+    patch('signal.signal'),
+    patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
   ):
     _mod.main()
   assert vb.model is vb.VestaboardModel.FLAGSHIP
@@ -1079,11 +1367,12 @@ def test_main_public_mode_in_banner(monkeypatch: pytest.MonkeyPatch, caplog: pyt
     patch('config.get_model', return_value='note'),
     patch('config.get_public_mode', return_value=True),
     patch('config.get_content_enabled', return_value=None),
-    patch.object(_mod, 'load_content'),
+    patch.object(_mod, 'load_content', return_value=set()),
     patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
     patch('threading.Thread'),
     patch('apscheduler.schedulers.background.BackgroundScheduler', return_value=mock_sched),
-    patch('time.sleep', side_effect=KeyboardInterrupt),
+    patch('signal.signal'),
+    patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
   ):
     _mod.main()
   assert 'public mode' in caplog.text
@@ -1097,11 +1386,12 @@ def test_main_content_enabled_in_banner(monkeypatch: pytest.MonkeyPatch, caplog:
     patch('config.get_model', return_value='note'),
     patch('config.get_public_mode', return_value=False),
     patch('config.get_content_enabled', return_value={'bart'}),
-    patch.object(_mod, 'load_content'),
+    patch.object(_mod, 'load_content', return_value=set()),
     patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
     patch('threading.Thread'),
     patch('apscheduler.schedulers.background.BackgroundScheduler', return_value=mock_sched),
-    patch('time.sleep', side_effect=KeyboardInterrupt),
+    patch('signal.signal'),
+    patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
   ):
     _mod.main()
   assert 'content: bart' in caplog.text
@@ -1115,14 +1405,43 @@ def test_main_empty_board_on_startup(monkeypatch: pytest.MonkeyPatch, caplog: py
     patch('config.get_model', return_value='note'),
     patch('config.get_public_mode', return_value=False),
     patch('config.get_content_enabled', return_value=None),
-    patch.object(_mod, 'load_content'),
+    patch.object(_mod, 'load_content', return_value=set()),
     patch('integrations.vestaboard.get_state', side_effect=vb.EmptyBoardError('no message')),
     patch('threading.Thread'),
     patch('apscheduler.schedulers.background.BackgroundScheduler', return_value=mock_sched),
-    patch('time.sleep', side_effect=KeyboardInterrupt),
+    patch('signal.signal'),
+    patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
   ):
     _mod.main()
   assert '(no current message)' in caplog.text
+  assert 'Current message:\n(no current message)' in caplog.messages
+
+
+def test_main_waits_for_shutdown_and_stops_scheduler() -> None:
+  import signal
+
+  mock_sched = _mock_sched()
+  with (
+    patch.object(_mod, '_validate_startup'),
+    patch('config.load_config'),
+    patch('config.get_model', return_value='note'),
+    patch('config.get_public_mode', return_value=False),
+    patch('config.get_content_enabled', return_value=None),
+    patch.object(_mod, 'load_content', return_value=set()),
+    patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
+    patch('threading.Thread'),
+    patch('scheduler.BackgroundScheduler', return_value=mock_sched),
+    patch('signal.signal') as mock_signal,
+    patch.object(_mod, '_shutdown') as mock_shutdown,
+    patch.object(_mod, '_prefetch_executor') as mock_prefetch_executor,
+  ):
+    _mod.main()
+  mock_signal.assert_called_once_with(signal.SIGTERM, _mod._raise_keyboard_interrupt)
+  mock_shutdown.wait.assert_called_once_with()
+  mock_sched.shutdown.assert_called_once()
+  mock_prefetch_executor.shutdown.assert_called_once_with(wait=False, cancel_futures=True)
+  with pytest.raises(KeyboardInterrupt):
+    _mod._raise_keyboard_interrupt(signal.SIGTERM, None)
 
 
 def test_main_passes_timezone_to_scheduler(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -1138,11 +1457,12 @@ def test_main_passes_timezone_to_scheduler(monkeypatch: pytest.MonkeyPatch) -> N
     patch('config.get_model', return_value='note'),
     patch('config.get_public_mode', return_value=False),
     patch('config.get_content_enabled', return_value=None),
-    patch.object(_mod, 'load_content'),
+    patch.object(_mod, 'load_content', return_value=set()),
     patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
     patch('threading.Thread'),
     patch('scheduler.BackgroundScheduler', return_value=mock_sched) as mock_bs,
-    patch('time.sleep', side_effect=KeyboardInterrupt),
+    patch('signal.signal'),
+    patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
   ):
     _mod.main()
   mock_bs.assert_called_once_with(
@@ -1240,6 +1560,7 @@ def test_get_integration_path_traversal_raises() -> None:
 def test_get_integration_known_loads_module() -> None:
   import integrations.bart as bart_mod
 
+  _mod._load_integration.cache_clear()
   with patch('importlib.import_module', return_value=bart_mod) as mock_import:
     result = _mod._get_integration('bart')
   mock_import.assert_called_once_with('integrations.bart')
@@ -1247,7 +1568,7 @@ def test_get_integration_known_loads_module() -> None:
 
 
 def test_get_integration_missing_deps_raises_runtime_error() -> None:
-  _mod._integrations.pop('bart', None)
+  _mod._load_integration.cache_clear()
   with patch('importlib.import_module', side_effect=ImportError('No module named requests')):
     with pytest.raises(RuntimeError, match='missing dependencies'):
       _mod._get_integration('bart')
@@ -1257,7 +1578,7 @@ def test_get_integration_caches_module() -> None:
   import integrations.bart as bart_mod
 
   # Clear cache so the test starts fresh.
-  _mod._integrations.pop('bart', None)
+  _mod._load_integration.cache_clear()
   with patch('importlib.import_module', return_value=bart_mod) as mock_import:
     _mod._get_integration('bart')
     _mod._get_integration('bart')
@@ -1295,7 +1616,7 @@ def test_worker_silently_skips_on_data_unavailable() -> None:
       _mod.worker()
 
   mock_set_state.assert_not_called()
-  assert _mod._queue.empty()
+  assert not _mod._queue
 
 
 # --- worker: integration_fn ---
@@ -1380,6 +1701,31 @@ def test_validate_template_integration_fn_non_string_raises() -> None:
     _mod._validate_template('ctx.tmpl', t)
 
 
+# --- _run_preflights ---
+
+
+def test_run_preflights_runs_concurrently_and_isolates_failures(caplog: pytest.LogCaptureFixture) -> None:
+  def _slow() -> None:
+    time.sleep(0.3)
+
+  def _broken() -> None:
+    time.sleep(0.3)
+    raise RuntimeError('auth down')
+
+  mods = {
+    'bart': MagicMock(preflight=_slow),
+    'trakt': MagicMock(preflight=_broken),
+    'weather': MagicMock(spec=[]),  # no preflight
+  }
+  with patch.object(_mod, '_get_integration', side_effect=mods.__getitem__):
+    start = time.monotonic()
+    _mod._run_preflights(set(mods))
+    elapsed = time.monotonic() - start
+  assert elapsed < 0.55
+  assert "preflight for 'trakt' failed: auth down" in caplog.text
+  assert 'bart' not in caplog.text
+
+
 # --- _validate_startup ---
 
 
@@ -1403,6 +1749,15 @@ def test_validate_startup_errors_on_missing_config(
   assert 'not found' in capsys.readouterr().err.lower()
 
 
+def test_validate_startup_unreadable_config_path_reports_not_found(
+  tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
+) -> None:
+  monkeypatch.chdir(tmp_path)
+  with patch.object(Path, 'stat', side_effect=PermissionError('denied')), pytest.raises(SystemExit):
+    _mod._validate_startup()
+  assert 'not found' in capsys.readouterr().err.lower()
+
+
 def test_validate_startup_errors_on_empty_config(
   tmp_path: Path, monkeypatch: pytest.MonkeyPatch, capsys: pytest.CaptureFixture[str]
 ) -> None:
@@ -1424,6 +1779,19 @@ def test_validate_startup_warns_on_empty_content_dir(
   assert 'WARNING' in caplog.text
 
 
+def test_validate_startup_no_warning_for_populated_or_missing_content_dir(
+  tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+  (tmp_path / 'config.toml').write_text('[vestaboard]\napi_key = "x"\n')
+  monkeypatch.chdir(tmp_path)
+  _mod._validate_startup()  # no content/ dir at all
+  user_dir = tmp_path / 'content' / 'user'
+  user_dir.mkdir(parents=True)
+  _make_file(user_dir)
+  _mod._validate_startup()
+  assert 'WARNING' not in caplog.text
+
+
 def test_validate_startup_passes_with_valid_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
   (tmp_path / 'config.toml').write_text('[vestaboard]\napi_key = "x"\n')
   monkeypatch.chdir(tmp_path)
@@ -1447,7 +1815,63 @@ def _make_message(priority: int, hold: int = 120) -> _mod.QueuedMessage:
 
 def _enqueue_priority(priority: int) -> None:
   """Put a bare message with the given priority directly onto the shared queue."""
-  _mod._queue.put(_make_message(priority))
+  _mod._put(_make_message(priority))
+
+
+def test_do_hold_prefetches_next_integration_variables() -> None:
+  message = _make_message(priority=4, hold=1)
+  nxt = _mod.QueuedMessage(
+    priority=4,
+    seq=7,
+    name='next',
+    scheduled_at=time.monotonic(),
+    data={'integration': 'weather', 'templates': []},
+    hold=60,
+    timeout=300,
+  )
+  _mod._put(nxt)
+  _mod._hold_interrupt.clear()
+  mock_mod = MagicMock()
+  mock_mod.get_variables.return_value = {'temp': [['72F']]}
+  with patch.object(_mod, '_get_integration', return_value=mock_mod):
+    _mod._do_hold(message, min_hold=60)
+    assert _mod._take_variables(nxt) == {'temp': [['72F']]}
+  mock_mod.get_variables.assert_called_once()
+  assert _mod._prefetch is None
+
+
+def test_take_variables_ignores_prefetch_for_other_message() -> None:
+  stale: Any = MagicMock()
+  _mod._prefetch = (99, time.monotonic(), stale)
+  msg = _mod.QueuedMessage(
+    priority=4, seq=1, name='m', scheduled_at=time.monotonic(), data={'integration': 'weather'}, hold=60, timeout=60
+  )
+  mock_mod = MagicMock()
+  mock_mod.get_variables.return_value = {'temp': [['60F']]}
+  with patch.object(_mod, '_get_integration', return_value=mock_mod):
+    assert _mod._take_variables(msg) == {'temp': [['60F']]}
+  stale.result.assert_not_called()
+
+
+def test_take_variables_skips_message_when_prefetch_hangs(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(_mod, '_PREFETCH_WAIT_TIMEOUT', 0.01)
+  _mod._prefetch = (1, time.monotonic(), Future())  # never completes
+  msg = _mod.QueuedMessage(
+    priority=4, seq=1, name='m', scheduled_at=time.monotonic(), data={'integration': 'weather'}, hold=60, timeout=60
+  )
+  with pytest.raises(IntegrationDataUnavailableError, match='prefetch still running'):
+    _mod._take_variables(msg)
+
+
+def test_fetch_variables_holds_the_integration_lock() -> None:
+  """Prefetch and refresh_fn both go through _fetch_variables, so they never overlap per integration."""
+  held: list[bool] = []
+  mock_mod = MagicMock()
+  mock_mod.get_variables.side_effect = lambda: held.append(_mod._fetch_locks['weather'].locked()) or {}
+  with patch.object(_mod, '_get_integration', return_value=mock_mod):
+    _mod._fetch_variables({'integration': 'weather'})
+  assert held == [True]
+  assert not _mod._fetch_locks['weather'].locked()
 
 
 def test_do_hold_runs_full_duration_no_queue(monkeypatch: pytest.MonkeyPatch) -> None:
@@ -1479,6 +1903,20 @@ def test_do_hold_interrupts_after_min_hold(monkeypatch: pytest.MonkeyPatch) -> N
   assert elapsed < 10  # exited early, not the full 30s
 
 
+def test_do_hold_wakes_on_high_priority_enqueue() -> None:
+  """A high-priority message queued mid-hold preempts it without waiting on a poll interval."""
+  message = _make_message(priority=4, hold=30)
+  _mod._hold_interrupt.clear()
+  t = threading.Timer(0.2, _enqueue_priority, args=(8,))
+  t.start()
+  start = time.monotonic()
+  try:
+    _mod._do_hold(message, min_hold=0)
+  finally:
+    t.cancel()
+  assert time.monotonic() - start < 0.9
+
+
 def test_do_hold_not_interrupted_before_min_hold(monkeypatch: pytest.MonkeyPatch) -> None:
   """High-priority item in queue but min_hold not elapsed — hold runs to completion."""
   message = _make_message(priority=4, hold=2)
@@ -1738,6 +2176,35 @@ def test_worker_idle_refresh_called_after_hold_expires() -> None:
   assert len(set_state_calls) >= 2
 
 
+def test_worker_blocks_without_timeout_when_no_idle_refresh() -> None:
+  msg = _make_worker_msg(scheduled_at=time.monotonic(), timeout=3600)
+  with (
+    patch.object(_mod, 'pop_valid_message', side_effect=[msg, KeyboardInterrupt()]) as mock_pop,
+    patch('integrations.vestaboard.set_state'),
+    patch.object(_mod, '_do_hold'),
+  ):
+    with pytest.raises(KeyboardInterrupt):
+      _mod.worker()
+  assert [c.kwargs['timeout'] for c in mock_pop.call_args_list] == [None, None]
+
+
+def test_worker_pop_timeout_bounded_by_idle_refresh() -> None:
+  msg = _make_integration_msg_with_refresh(30)
+  mock_integration = MagicMock()
+  mock_integration.get_variables.return_value = {'greeting': [['HELLO']]}
+  with (
+    patch.object(_mod, 'pop_valid_message', side_effect=[msg, None, KeyboardInterrupt()]) as mock_pop,
+    patch.object(_mod, '_get_integration', return_value=mock_integration),
+    patch('integrations.vestaboard.set_state'),
+    patch.object(_mod, '_do_hold'),
+  ):
+    with pytest.raises(KeyboardInterrupt):
+      _mod.worker()
+  timeouts = [c.kwargs['timeout'] for c in mock_pop.call_args_list]
+  assert timeouts[0] is None
+  assert all(t is not None and 0 <= t <= 30 for t in timeouts[1:])
+
+
 def test_worker_idle_refresh_cleared_on_new_send() -> None:
   """Idle refresh state is cleared when a new message is successfully sent."""
   msg1 = _make_integration_msg_with_refresh(30)
@@ -1819,7 +2286,7 @@ def test_worker_idle_refresh_skipped_when_queue_pending() -> None:
 
   # Pre-populate the real queue so the guard sees a pending message.
   pending = _make_worker_msg(scheduled_at=time.monotonic(), timeout=3600)
-  _mod._queue.put(pending)
+  _mod._put(pending)
   try:
     with (
       patch.object(_mod, 'pop_valid_message', side_effect=[msg, None, KeyboardInterrupt()]),
@@ -1831,11 +2298,7 @@ def test_worker_idle_refresh_skipped_when_queue_pending() -> None:
         _mod.worker()
   finally:
     # Drain the queue so it doesn't leak into other tests.
-    while not _mod._queue.empty():
-      try:
-        _mod._queue.get_nowait()
-      except Exception:  # noqa: BLE001
-        break
+    _mod._queue.clear()
 
   # Only the initial send; idle refresh was suppressed by the pending message.
   assert len(set_state_calls) == 1
@@ -1909,13 +2372,13 @@ def test_do_hold_non_indefinite_unchanged() -> None:
 def test_enqueue_propagates_indefinite_true() -> None:
   enqueue = _mod.enqueue
   enqueue(priority=5, data={}, hold=60, timeout=30, indefinite=True)
-  msg = _mod._queue.get_nowait()
+  msg = heapq.heappop(_mod._queue)
   assert msg.indefinite is True
 
 
 def test_enqueue_indefinite_defaults_false() -> None:
   _mod.enqueue(priority=5, data={}, hold=60, timeout=30)
-  msg = _mod._queue.get_nowait()
+  msg = heapq.heappop(_mod._queue)
   assert msg.indefinite is False
 
 
@@ -2043,6 +2506,54 @@ def test_load_content_warns_on_malformed_json(
   assert 'bad.json' in output
 
 
+def test_load_content_bad_file_does_not_block_others(
+  sched: BackgroundScheduler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+  user_dir = tmp_path / 'content' / 'user'
+  user_dir.mkdir(parents=True)
+  _make_file(user_dir, 'a.json')
+  (user_dir / 'b.json').write_text('{ not valid json }')
+  _make_file(user_dir, 'c.json')
+  monkeypatch.chdir(tmp_path)
+  _mod.load_content(sched)
+  assert sorted(job.id for job in sched.get_jobs()) == ['user.a.tmpl', 'user.c.tmpl']
+  assert 'b.json' in caplog.text
+
+
+def test_load_content_registers_in_sorted_order(
+  sched: BackgroundScheduler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
+) -> None:
+  user_dir = tmp_path / 'content' / 'user'
+  contrib_dir = tmp_path / 'content' / 'contrib'
+  user_dir.mkdir(parents=True)
+  contrib_dir.mkdir(parents=True)
+  for name in ('m', 'b', 'x', 'a', 'k', 'c', 'z', 'e', 'q', 'd'):
+    _make_file(user_dir, f'{name}.json')
+  _make_file(contrib_dir, 'bart.json')
+  monkeypatch.chdir(tmp_path)
+  with caplog.at_level('INFO', logger='scheduler'):
+    _mod.load_content(sched, content_enabled={'*'})
+  loaded = [r.getMessage().split(':')[0] for r in caplog.records if r.getMessage().startswith('Loaded ')]
+  expected = [f'Loaded user/{n}.json' for n in 'abcdekmqxz'] + ['Loaded contrib/bart.json']
+  assert loaded == expected
+
+
+def test_parse_file_does_not_touch_scheduler(tmp_path: Path) -> None:
+  f = _make_file(tmp_path)
+  parsed = _mod._parse_file(f, False)
+  assert parsed.stem == f'{tmp_path.name}.test'
+  assert [spec.job_id for spec in parsed.jobs] == [f'{tmp_path.name}.test.tmpl']
+
+
+def test_parse_file_extracts_schedule_fields(tmp_path: Path) -> None:
+  f = _make_file(tmp_path)
+  (spec,) = _mod._parse_file(f, False).jobs
+  schedule = _make_content()['templates']['tmpl']['schedule']
+  assert (spec.cron, spec.hold, spec.timeout) == (schedule['cron'], schedule['hold'], schedule['timeout'])
+  with pytest.raises(AttributeError):
+    spec.priority = 1  # type: ignore[misc]
+
+
 def test_load_content_warns_on_unknown_stem(
   sched: BackgroundScheduler, tmp_path: Path, monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture
 ) -> None:
@@ -1,5 +1,6 @@
 """Unit tests for integrations/trakt.py (mocked — no real API calls)."""
 
+import json
 import re
 import time
 from pathlib import Path
@@ -22,6 +23,8 @@ def reset_trakt_state() -> None:
   trakt._next_up_cache = None
   trakt._last_watching_vars = None
   trakt._stop_pending = False
+  trakt._token_cache = None
+  trakt._headers_cache = None
 
 
 @pytest.fixture()
@@ -201,6 +204,33 @@ def test_token_refresh_not_called_when_fresh(config_with_tokens: Path) -> None:
   mock_refresh.assert_not_called()
 
 
+def test_get_token_fresh_token_served_from_memory(config_with_tokens: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+  assert trakt._get_token() == 'test-access'
+  # Once cached, a fresh token is returned without consulting config.
+  monkeypatch.setattr(_cfg, '_config', {})
+  assert trakt._get_token() == 'test-access'
+
+
+def test_get_token_near_expiry_not_cached(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(
+    _cfg,
+    '_config',
+    {'trakt': {'access_token': 'old-access', 'expires_at': int(time.time()) + 100}},
+  )
+  with patch.object(trakt, '_refresh_token'):
+    trakt._get_token()
+  assert trakt._token_cache is None
+
+
+def test_store_and_clear_tokens_update_memory_cache(config_without_tokens: Path) -> None:
+  trakt._store_tokens({'access_token': 'a', 'refresh_token': 'r', 'expires_in': 7776000})
+  assert trakt._token_cache is not None
+  assert trakt._token_cache[0] == 'a'
+
+  trakt._clear_tokens()
+  assert trakt._token_cache is None
+
+
 def test_token_refresh_called_when_near_expiry(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
   cfg_file = tmp_path / 'config.toml'
   cfg_file.write_text(
@@ -226,8 +256,9 @@ def test_token_refresh_called_when_near_expiry(tmp_path: Path, monkeypatch: pyte
   )
   monkeypatch.chdir(tmp_path)
 
-  def fake_refresh() -> None:
+  def fake_refresh() -> str:
     _cfg._config['trakt']['access_token'] = 'new-access'
+    return 'new-access'
 
   with patch.object(trakt, '_refresh_token', side_effect=fake_refresh) as mock_refresh:
     token = trakt._get_token()
@@ -364,8 +395,9 @@ def test_handle_api_401_refreshes_and_returns_new_token(
 ) -> None:
   """_handle_api_401 calls _refresh_token and returns the updated access token."""
 
-  def fake_refresh() -> None:
+  def fake_refresh() -> str:
     _cfg._config['trakt']['access_token'] = 'refreshed-token'
+    return 'refreshed-token'
 
   with patch.object(trakt, '_refresh_token', side_effect=fake_refresh):
     token = trakt._handle_api_401()
@@ -390,6 +422,39 @@ def test_handle_api_401_refresh_failure_clears_tokens_and_triggers_reauth(
   assert _cfg._config['trakt']['access_token'] == ''
 
 
+def test_handle_api_401_skips_refresh_when_token_already_replaced() -> None:
+  """A 401 on a token another thread already rotated reuses the new token."""
+  trakt._token_cache = ('new-token', int(time.time()) + 3600)
+
+  with patch.object(trakt, '_refresh_token') as mock_refresh:
+    token = trakt._handle_api_401('old-token')
+
+  assert token == 'new-token'
+  mock_refresh.assert_not_called()
+
+
+def test_get_token_rechecks_cache_after_acquiring_lock() -> None:
+  """A caller that waited on the lock uses the token the holder refreshed."""
+  with trakt._token_lock:
+    trakt._token_cache = ('fresh', int(time.time()) + trakt._TOKEN_REFRESH_WINDOW + 3600)
+    with patch.object(trakt, '_refresh_token') as mock_refresh:
+      token = trakt._get_token_locked()
+
+  assert token == 'fresh'
+  mock_refresh.assert_not_called()
+
+
+def test_request_headers_reused_until_token_changes() -> None:
+  first = trakt._request_headers('tok-1', 'cid')
+  assert first['Authorization'] == 'Bearer tok-1'
+  assert first['trakt-api-key'] == 'cid'
+  assert trakt._request_headers('tok-1', 'cid') is first
+
+  rotated = trakt._request_headers('tok-2', 'cid')
+  assert rotated is not first
+  assert rotated['Authorization'] == 'Bearer tok-2'
+
+
 def test_get_variables_calendar_401_retries_with_refreshed_token(config_with_tokens: Path) -> None:
   """A 401 from the calendar endpoint triggers a token refresh and retries."""
   unauth = MagicMock()
@@ -400,8 +465,9 @@ def test_get_variables_calendar_401_retries_with_refreshed_token(config_with_tok
   ok.raise_for_status.return_value = None
   ok.json.return_value = _CALENDAR_RESPONSE
 
-  def fake_refresh() -> None:
+  def fake_refresh() -> str:
     _cfg._config['trakt']['access_token'] = 'new-token'
+    return 'new-token'
 
   with patch.object(trakt, '_refresh_token', side_effect=fake_refresh):
     with patch('integrations.trakt.fetch_with_retry', side_effect=[unauth, ok]):
@@ -424,8 +490,9 @@ def test_get_variables_watching_401_retries_with_refreshed_token(config_with_tok
     'episode': {'season': 1, 'number': 1, 'title': 'Pilot'},
   }
 
-  def fake_refresh() -> None:
+  def fake_refresh() -> str:
     _cfg._config['trakt']['access_token'] = 'new-token'
+    return 'new-token'
 
   with patch.object(trakt, '_refresh_token', side_effect=fake_refresh):
     with patch('integrations.trakt.fetch_with_retry', side_effect=[unauth, ok]):
@@ -442,8 +509,9 @@ def test_get_variables_next_up_401_retries_with_refreshed_token(config_with_toke
   watched = _mock_watched_ok([_WATCHED_SHOWS_RESPONSE[0]])
   progress = _mock_progress_ok(_PROGRESS_WITH_NEXT)
 
-  def fake_refresh() -> None:
+  def fake_refresh() -> str:
     _cfg._config['trakt']['access_token'] = 'new-token'
+    return 'new-token'
 
   with patch.object(trakt, '_refresh_token', side_effect=fake_refresh):
     with patch('integrations.trakt.fetch_with_retry', side_effect=[unauth, watched, progress]):
@@ -465,6 +533,24 @@ def test_store_tokens_writes_to_config(config_without_tokens: Path, monkeypatch:
   assert 'expires_at = ' in text
 
 
+def test_store_tokens_returns_absolute_expiry(config_without_tokens: Path) -> None:
+  before = int(time.time())
+  expires_at = trakt._store_tokens({'access_token': 'a', 'refresh_token': 'r', 'expires_in': 3600})
+  assert before + 3600 <= expires_at <= int(time.time()) + 3600
+  assert trakt._token_cache == ('a', expires_at)
+
+
+def test_store_tokens_caps_expires_in(config_without_tokens: Path) -> None:
+  expires_at = trakt._store_tokens({'access_token': 'a', 'refresh_token': 'r', 'expires_in': 10**9})
+  assert expires_at <= int(time.time()) + trakt._TOKEN_MAX_LIFETIME
+
+
+def test_store_tokens_missing_expires_in_warns(config_without_tokens: Path, caplog: pytest.LogCaptureFixture) -> None:
+  expires_at = trakt._store_tokens({'access_token': 'a', 'refresh_token': 'r'})
+  assert expires_at <= int(time.time()) + trakt._TOKEN_MAX_LIFETIME
+  assert 'no expires_in' in caplog.text
+
+
 def test_write_tokens_errors_on_missing_config(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> None:
   monkeypatch.chdir(tmp_path)
   # No config.toml in tmp_path
@@ -486,8 +572,11 @@ def test_token_refresh_updates_config(config_with_tokens: Path, monkeypatch: pyt
   }
 
   with patch('requests.post', return_value=mock_response):
-    trakt._refresh_token()
+    token = trakt._refresh_token()
 
+  assert token == 'refreshed-access'
+  assert trakt._token_cache is not None
+  assert trakt._token_cache[0] == 'refreshed-access'
   assert _cfg._config['trakt']['access_token'] == 'refreshed-access'
   assert _cfg._config['trakt']['refresh_token'] == 'refreshed-refresh'
 
@@ -549,6 +638,121 @@ def test_auth_thread_writes_tokens_on_success(
   assert 'access_token = "new-access"' in text
 
 
+def test_auth_thread_reuses_serialized_poll_body(config_without_tokens: Path) -> None:
+  code_response = MagicMock()
+  code_response.status_code = 200
+  code_response.json.return_value = {
+    'device_code': 'dc',
+    'user_code': 'UC',
+    'verification_url': 'https://trakt.tv/activate',
+    'expires_in': 600,
+    'interval': 1,
+  }
+  pending_response = MagicMock()
+  pending_response.status_code = 400
+  token_response = MagicMock()
+  token_response.status_code = 200
+  token_response.json.return_value = {'access_token': 'a', 'refresh_token': 'r', 'expires_in': 7776000}
+
+  with patch('requests.post', side_effect=[code_response, pending_response, token_response]) as mock_post:
+    with patch('time.sleep'):
+      trakt._run_auth_flow()
+
+  poll_calls = mock_post.call_args_list[1:]
+  assert len(poll_calls) == 2
+  assert poll_calls[0].kwargs['data'] is poll_calls[1].kwargs['data']
+  assert json.loads(poll_calls[0].kwargs['data']) == {
+    'code': 'dc',
+    'client_id': 'test-id',
+    'client_secret': 'test-secret',
+  }
+
+
+def _device_code_response() -> MagicMock:
+  code_response = MagicMock()
+  code_response.status_code = 200
+  code_response.json.return_value = {
+    'device_code': 'dc',
+    'user_code': 'UC',
+    'verification_url': 'https://trakt.tv/activate',
+    'expires_in': 600,
+    'interval': 4,
+  }
+  return code_response
+
+
+def test_auth_thread_backs_off_while_pending(config_without_tokens: Path) -> None:
+  pending = MagicMock()
+  pending.status_code = 400
+  expired = MagicMock()
+  expired.status_code = 410
+
+  with patch('requests.post', side_effect=[_device_code_response(), pending, pending, expired]):
+    with patch('time.sleep') as mock_sleep:
+      trakt._run_auth_flow()
+
+  assert [c.args[0] for c in mock_sleep.call_args_list] == [4, 6.0, 9.0]
+
+
+def test_auth_thread_pending_backoff_is_capped(config_without_tokens: Path) -> None:
+  pending = MagicMock()
+  pending.status_code = 400
+  expired = MagicMock()
+  expired.status_code = 410
+
+  with patch('requests.post', side_effect=[_device_code_response()] + [pending] * 20 + [expired]):
+    with patch('time.sleep') as mock_sleep:
+      trakt._run_auth_flow()
+
+  assert max(c.args[0] for c in mock_sleep.call_args_list) == trakt._AUTH_POLL_MAX_INTERVAL
+
+
+def test_auth_thread_honours_retry_after_on_429(config_without_tokens: Path) -> None:
+  limited = MagicMock()
+  limited.status_code = 429
+  limited.headers = {'Retry-After': '30'}
+  expired = MagicMock()
+  expired.status_code = 410
+
+  with patch('requests.post', side_effect=[_device_code_response(), limited, expired]):
+    with patch('time.sleep') as mock_sleep:
+      trakt._run_auth_flow()
+
+  assert [c.args[0] for c in mock_sleep.call_args_list] == [4, 30.0]
+
+
+def test_auth_thread_clamps_long_retry_after_to_deadline(
+  config_without_tokens: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+  limited = MagicMock()
+  limited.status_code = 429
+  limited.headers = {'Retry-After': '3600'}
+  pending = MagicMock()
+  pending.status_code = 400
+  clock = [0.0]
+
+  def fake_sleep(seconds: float) -> None:
+    clock[0] += seconds
+
+  with patch('requests.post', side_effect=[_device_code_response(), limited, pending]):
+    with patch('time.monotonic', side_effect=lambda: clock[0]):
+      with patch('time.sleep', side_effect=fake_sleep) as mock_sleep:
+        trakt._run_auth_flow()
+
+  # expires_in is 600: after the first 4s poll the 3600s Retry-After is cut
+  # to the 596s left, and the flow gives up at the deadline.
+  assert [c.args[0] for c in mock_sleep.call_args_list] == [4, 596.0]
+  assert clock[0] == 600.0
+  assert 'timed out' in caplog.text
+
+
+def test_parse_retry_after_seconds_and_http_date() -> None:
+  assert trakt._parse_retry_after('12') == 12.0
+  assert trakt._parse_retry_after(None) is None
+  assert trakt._parse_retry_after('soon') is None
+  assert trakt._parse_retry_after('Wed, 21 Oct 2015 07:28:00 GMT') == 0.0
+
+
 def test_auth_thread_logs_error_on_expired(config_without_tokens: Path, caplog: pytest.LogCaptureFixture) -> None:
   code_response = MagicMock()
   code_response.status_code = 200
@@ -684,6 +888,20 @@ def test_get_variables_calendar_returns_expected_vars(
   assert re.match(r'^\d{2}:\d{2}$', result['air_time'][0][0])
 
 
+def test_get_variables_calendar_url_uses_local_date(
+  config_with_tokens: Path,
+) -> None:
+  mock_response = MagicMock()
+  mock_response.status_code = 200
+  mock_response.json.return_value = _CALENDAR_RESPONSE
+
+  with patch('integrations.trakt.fetch_with_retry', return_value=mock_response) as mock_fetch:
+    trakt.get_variables_calendar()
+
+  url = mock_fetch.call_args[0][1]
+  assert url.endswith(f'/calendars/my/shows/{time.strftime("%Y-%m-%d")}/7')
+
+
 def test_get_variables_calendar_empty_raises_unavailable(
   config_with_tokens: Path,
 ) -> None:
@@ -723,6 +941,24 @@ def test_get_variables_calendar_skips_past_entries(
   assert result['episode_ref'] == [['S2E5']]
 
 
+def test_get_variables_calendar_picks_earliest_unsorted_entry(
+  config_with_tokens: Path,
+) -> None:
+  later = {
+    'first_aired': '2099-12-01T01:00:00.000Z',
+    'episode': {'season': 9, 'number': 9, 'title': 'Later'},
+    'show': {'title': 'Later Show'},
+  }
+  mock_response = MagicMock()
+  mock_response.status_code = 200
+  mock_response.json.return_value = [later] + _CALENDAR_RESPONSE_ALL_PAST + _CALENDAR_RESPONSE
+
+  with patch('integrations.trakt.fetch_with_retry', return_value=mock_response):
+    result = trakt.get_variables_calendar()
+
+  assert result['show_name'] == [['GREAT SHOW']]
+
+
 def test_get_variables_calendar_http_error_raised(
   config_with_tokens: Path,
 ) -> None:
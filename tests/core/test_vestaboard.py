@@ -283,6 +283,21 @@ def test_expand_format_missing_variable_is_blank() -> None:
   assert result == ['']
 
 
+def test_expand_format_inline_multiple_and_repeated() -> None:
+  result = vb._expand_format(['{a}-{b}-{a}'], {'a': [['X']], 'b': [['Y']]})  # noqa: SLF001
+  assert result == ['X-Y-X']
+
+
+def test_expand_format_inline_non_name_braces_left_literal() -> None:
+  result = vb._expand_format(['{a b} {} {v}'], {'v': [['OK']]})  # noqa: SLF001
+  assert result == ['{a b} {} OK']
+
+
+def test_expand_format_inline_unclosed_brace_then_var() -> None:
+  result = vb._expand_format(['{x {v}'], {'v': [['OK']]})  # noqa: SLF001
+  assert result == ['{x OK']
+
+
 # --- _build_grid ---
 
 
@@ -307,6 +322,12 @@ def test_build_grid_flagship_dimensions(monkeypatch: pytest.MonkeyPatch) -> None
   assert all(len(row) == vb.VestaboardModel.FLAGSHIP.cols for row in grid)
 
 
+def test_build_grid_blank_rows_are_independent() -> None:
+  grid = vb._build_grid([])  # noqa: SLF001
+  grid[0][0] = 1
+  assert all(row[0] == 0 for row in grid[1:])
+
+
 # --- _next_token ---
 
 
@@ -393,9 +414,41 @@ def test_expand_format_escaped_brace_whole_line_not_expanded() -> None:
   assert result == ['{lines}']
 
 
+@pytest.mark.parametrize(
+  'entry,expected',
+  [
+    ('{lines}', ['A', 'B']),
+    ('  {lines}  ', ['A', 'B']),
+    ('{}', ['{}']),
+    ('{lines} x', ['A x']),
+    ('{a b}', ['{a b}']),
+  ],
+)
+def test_expand_format_whole_line_detection(entry: str, expected: list[str]) -> None:
+  assert vb._expand_format([entry], {'lines': [['A', 'B']]}) == expected  # noqa: SLF001
+
+
+def test_expand_format_literal_entry_skips_substitution() -> None:
+  with patch.object(vb, '_substitute_inline') as mock_sub:
+    result = vb._expand_format(['PLAIN TEXT'], {'x': [['X']]})  # noqa: SLF001
+  assert result == ['PLAIN TEXT']
+  mock_sub.assert_not_called()
+
+
+def test_expand_format_lone_closing_escape_still_unescaped() -> None:
+  assert vb._expand_format(['A }} B'], {}) == ['A } B']  # noqa: SLF001
+
+
+def test_expand_format_one_sided_escapes_with_variable() -> None:
+  variables = {'name': [['WORLD']]}
+  assert vb._expand_format(['{name} }}'], variables) == ['WORLD }']  # noqa: SLF001
+  assert vb._expand_format(['{{ {name}'], variables) == ['{ WORLD']  # noqa: SLF001
+
+
 # --- _get_headers ---
 
 
+@pytest.mark.uses_vb_headers
 def test_get_headers_uses_config_key(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -405,6 +458,7 @@ def test_get_headers_uses_config_key(monkeypatch: pytest.MonkeyPatch) -> None:
   assert headers['Content-Type'] == 'application/json'
 
 
+@pytest.mark.uses_vb_headers
 def test_get_headers_missing_key_propagates(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -413,9 +467,22 @@ def test_get_headers_missing_key_propagates(monkeypatch: pytest.MonkeyPatch) ->
     vb._get_headers()  # noqa: SLF001
 
 
+@pytest.mark.uses_vb_headers
+def test_get_headers_cached_until_cleared(monkeypatch: pytest.MonkeyPatch) -> None:
+  import config as _cfg
+
+  monkeypatch.setattr(_cfg, '_config', {'vestaboard': {'api_key': 'first'}})
+  first = vb._get_headers()  # noqa: SLF001
+  monkeypatch.setattr(_cfg, '_config', {'vestaboard': {'api_key': 'second'}})
+  assert vb._get_headers() is first  # noqa: SLF001
+  vb._get_headers.cache_clear()  # noqa: SLF001
+  assert vb._get_headers()['X-Vestaboard-Read-Write-Key'] == 'second'  # noqa: SLF001
+
+
 # --- get_state ---
 
 
+@pytest.mark.uses_vb_headers
 def test_get_state_returns_state(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -430,13 +497,14 @@ def test_get_state_returns_state(monkeypatch: pytest.MonkeyPatch) -> None:
     }
   }
   mock_resp.raise_for_status.return_value = None
-  with patch('integrations.vestaboard.requests.get', return_value=mock_resp):
+  with patch('integrations.vestaboard._SESSION.get', return_value=mock_resp):
     state = vb.get_state()
   assert state.id == 'abc123'
   assert state.appeared == '2024-01-01T00:00:00Z'
   assert state.layout == layout
 
 
+@pytest.mark.uses_vb_headers
 def test_get_state_passes_auth_header(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -445,7 +513,7 @@ def test_get_state_passes_auth_header(monkeypatch: pytest.MonkeyPatch) -> None:
   mock_resp = MagicMock()
   mock_resp.json.return_value = {'currentMessage': {'id': 'x', 'appeared': 'y', 'layout': json.dumps(layout)}}
   mock_resp.raise_for_status.return_value = None
-  with patch('integrations.vestaboard.requests.get', return_value=mock_resp) as mock_get:
+  with patch('integrations.vestaboard._SESSION.get', return_value=mock_resp) as mock_get:
     vb.get_state()
   _, kwargs = mock_get.call_args
   assert kwargs['headers']['X-Vestaboard-Read-Write-Key'] == 'sentinel-key'
@@ -454,6 +522,7 @@ def test_get_state_passes_auth_header(monkeypatch: pytest.MonkeyPatch) -> None:
 # --- set_state ---
 
 
+@pytest.mark.uses_vb_headers
 def test_set_state_posts_grid_to_api(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -461,26 +530,28 @@ def test_set_state_posts_grid_to_api(monkeypatch: pytest.MonkeyPatch) -> None:
   mock_resp = MagicMock()
   mock_resp.status_code = 200
   mock_resp.raise_for_status.return_value = None
-  with patch('integrations.vestaboard.requests.post', return_value=mock_resp) as mock_post:
+  with patch('integrations.vestaboard._SESSION.post', return_value=mock_resp) as mock_post:
     vb.set_state([{'format': ['HELLO']}], {})
   mock_post.assert_called_once()
   _, kwargs = mock_post.call_args
-  grid = kwargs['json']
+  grid = json.loads(kwargs['data'])
   assert len(grid) == vb.model.rows
   assert all(len(row) == vb.model.cols for row in grid)
 
 
+@pytest.mark.uses_vb_headers
 def test_set_state_raises_board_locked_on_423(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
   monkeypatch.setattr(_cfg, '_config', {'vestaboard': {'api_key': 'test-key'}})
   mock_resp = MagicMock()
   mock_resp.status_code = 423
-  with patch('integrations.vestaboard.requests.post', return_value=mock_resp):
+  with patch('integrations.vestaboard._SESSION.post', return_value=mock_resp):
     with pytest.raises(vb.BoardLockedError):
       vb.set_state([{'format': ['HELLO']}], {})
 
 
+@pytest.mark.uses_vb_headers
 def test_set_state_propagates_http_error(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -489,11 +560,12 @@ def test_set_state_propagates_http_error(monkeypatch: pytest.MonkeyPatch) -> Non
   mock_resp.status_code = 500
   mock_resp.reason = 'Internal Server Error'
   mock_resp.raise_for_status.side_effect = requests.HTTPError(response=mock_resp)
-  with patch('integrations.vestaboard.requests.post', return_value=mock_resp):
+  with patch('integrations.vestaboard._SESSION.post', return_value=mock_resp):
     with pytest.raises(requests.HTTPError, match='Vestaboard API error: 500'):
       vb.set_state([{'format': ['HELLO']}], {})
 
 
+@pytest.mark.uses_vb_headers
 def test_set_state_http_error_does_not_leak_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -502,34 +574,37 @@ def test_set_state_http_error_does_not_leak_api_key(monkeypatch: pytest.MonkeyPa
   mock_resp.status_code = 500
   mock_resp.reason = 'Internal Server Error'
   mock_resp.raise_for_status.side_effect = requests.HTTPError(response=mock_resp)
-  with patch('integrations.vestaboard.requests.post', return_value=mock_resp):
+  with patch('integrations.vestaboard._SESSION.post', return_value=mock_resp):
     with pytest.raises(requests.HTTPError) as exc_info:
       vb.set_state([{'format': ['HELLO']}], {})
   assert 'sentinel-key' not in str(exc_info.value)
 
 
+@pytest.mark.uses_vb_headers
 def test_set_state_raises_duplicate_on_409(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
   monkeypatch.setattr(_cfg, '_config', {'vestaboard': {'api_key': 'test-key'}})
   mock_resp = MagicMock()
   mock_resp.status_code = 409
-  with patch('integrations.vestaboard.requests.post', return_value=mock_resp):
+  with patch('integrations.vestaboard._SESSION.post', return_value=mock_resp):
     with pytest.raises(vb.DuplicateContentError):
       vb.set_state([{'format': ['HELLO']}], {})
 
 
+@pytest.mark.uses_vb_headers
 def test_get_state_raises_empty_board_on_404(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
   monkeypatch.setattr(_cfg, '_config', {'vestaboard': {'api_key': 'test-key'}})
   mock_resp = MagicMock()
   mock_resp.status_code = 404
-  with patch('integrations.vestaboard.requests.get', return_value=mock_resp):
+  with patch('integrations.vestaboard._SESSION.get', return_value=mock_resp):
     with pytest.raises(vb.EmptyBoardError):
       vb.get_state()
 
 
+@pytest.mark.uses_vb_headers
 def test_get_state_http_error_does_not_leak_api_key(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -538,12 +613,13 @@ def test_get_state_http_error_does_not_leak_api_key(monkeypatch: pytest.MonkeyPa
   mock_resp.status_code = 401
   mock_resp.reason = 'Unauthorized'
   mock_resp.raise_for_status.side_effect = requests.HTTPError(response=mock_resp)
-  with patch('integrations.vestaboard.requests.get', return_value=mock_resp):
+  with patch('integrations.vestaboard._SESSION.get', return_value=mock_resp):
     with pytest.raises(requests.HTTPError, match='Vestaboard API error: 401') as exc_info:
       vb.get_state()
   assert 'sentinel-key' not in str(exc_info.value)
 
 
+@pytest.mark.uses_vb_headers
 def test_set_state_passes_auth_header(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -551,12 +627,13 @@ def test_set_state_passes_auth_header(monkeypatch: pytest.MonkeyPatch) -> None:
   mock_resp = MagicMock()
   mock_resp.status_code = 200
   mock_resp.raise_for_status.return_value = None
-  with patch('integrations.vestaboard.requests.post', return_value=mock_resp) as mock_post:
+  with patch('integrations.vestaboard._SESSION.post', return_value=mock_resp) as mock_post:
     vb.set_state([{'format': ['HELLO']}], {})
   _, kwargs = mock_post.call_args
   assert kwargs['headers']['X-Vestaboard-Read-Write-Key'] == 'sentinel-key'
 
 
+@pytest.mark.uses_vb_headers
 def test_set_state_retries_on_429_then_succeeds(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -567,7 +644,7 @@ def test_set_state_retries_on_429_then_succeeds(monkeypatch: pytest.MonkeyPatch)
   ok.status_code = 200
   ok.raise_for_status.return_value = None
   with (
-    patch('integrations.vestaboard.requests.post', side_effect=[rate_limited, ok]) as mock_post,
+    patch('integrations.vestaboard._SESSION.post', side_effect=[rate_limited, ok]) as mock_post,
     patch('integrations.vestaboard.time.sleep') as mock_sleep,
   ):
     vb.set_state([{'format': ['HELLO']}], {})
@@ -575,6 +652,7 @@ def test_set_state_retries_on_429_then_succeeds(monkeypatch: pytest.MonkeyPatch)
   mock_sleep.assert_called_once_with(vb._RATE_LIMIT_BACKOFF)  # noqa: SLF001
 
 
+@pytest.mark.uses_vb_headers
 def test_set_state_raises_after_exhausted_429_retries(monkeypatch: pytest.MonkeyPatch) -> None:
   import config as _cfg
 
@@ -582,7 +660,7 @@ def test_set_state_raises_after_exhausted_429_retries(monkeypatch: pytest.Monkey
   rate_limited = MagicMock()
   rate_limited.status_code = 429
   with (
-    patch('integrations.vestaboard.requests.post', return_value=rate_limited) as mock_post,
+    patch('integrations.vestaboard._SESSION.post', return_value=rate_limited) as mock_post,
     patch('integrations.vestaboard.time.sleep'),
   ):
     with pytest.raises(requests.HTTPError, match='429 Too Many Requests'):
@@ -590,6 +668,7 @@ def test_set_state_raises_after_exhausted_429_retries(monkeypatch: pytest.Monkey
   assert mock_post.call_count == vb._RATE_LIMIT_RETRIES + 1  # noqa: SLF001
 
 
+@pytest.mark.uses_vb_headers
 def test_set_state_logs_warning_on_429_retry(monkeypatch: pytest.MonkeyPatch, caplog: pytest.LogCaptureFixture) -> None:
   import config as _cfg
 
@@ -600,7 +679,7 @@ def test_set_state_logs_warning_on_429_retry(monkeypatch: pytest.MonkeyPatch, ca
   ok.status_code = 200
   ok.raise_for_status.return_value = None
   with (
-    patch('integrations.vestaboard.requests.post', side_effect=[rate_limited, ok]),
+    patch('integrations.vestaboard._SESSION.post', side_effect=[rate_limited, ok]),
     patch('integrations.vestaboard.time.sleep'),
     caplog.at_level(logging.WARNING, logger='integrations.vestaboard'),
   ):
@@ -637,3 +716,221 @@ def test_render_grid_flagship_dimensions(monkeypatch: pytest.MonkeyPatch) -> Non
   output = vb.render_grid(grid)
   lines = output.splitlines()
   assert len(lines) == vb.VestaboardModel.FLAGSHIP.rows + 2
+
+
+# --- fast paths ---
+
+
+def test_fast_codes_match_encode_char() -> None:
+  for ch, code in vb._FAST_CODES.items():  # noqa: SLF001
+    assert vb._encode_char(ch) == code, ch  # noqa: SLF001
+
+
+def test_encode_line_lowercase_matches_uppercase() -> None:
+  assert vb._encode_line('hello world') == vb._encode_line('HELLO WORLD')  # noqa: SLF001
+
+
+def test_encode_line_plain_ascii_unknown_chars_blank() -> None:
+  result = vb._encode_line('Ab*c_')  # noqa: SLF001
+  assert result[:6] == [1, 2, 0, 3, 0, 0]
+  assert len(result) == vb.model.cols
+
+
+def test_encode_line_plain_ascii_matches_token_path() -> None:
+  # A trailing ❤️ forces the token-by-token loop for the same ASCII prefix.
+  text = 'Hi! 5% off @ 9:30'[: vb.model.cols - 1]
+  fast = vb._encode_line(text)  # noqa: SLF001
+  slow = vb._encode_line(text + '❤️')  # noqa: SLF001
+  assert fast[: len(text)] == slow[: len(text)]
+
+
+def test_strip_unsupported_plain_ascii_drops_unmapped() -> None:
+  assert vb._strip_unsupported(' A*B  c_ ') == 'AB c'  # noqa: SLF001
+
+
+def test_encode_char_ascii_table_matches_slow_path() -> None:
+  for i in range(128):
+    assert vb._encode_char(chr(i)) == vb._encode_char_slow(chr(i)), repr(chr(i))  # noqa: SLF001
+
+
+def test_fold_char_is_cached() -> None:
+  vb._fold_char.cache_clear()  # noqa: SLF001
+  vb._encode_line('ÉÉÉ')  # noqa: SLF001
+  info = vb._fold_char.cache_info()  # noqa: SLF001
+  assert info.misses == 1
+  assert info.hits == 2
+
+
+def test_display_heart_depends_on_model() -> None:
+  black = vb.VestaboardColor.BLACK
+  assert vb._DISPLAY[vb.VestaboardModel.NOTE, black][62].endswith('❤')  # noqa: SLF001
+  assert vb._DISPLAY[vb.VestaboardModel.FLAGSHIP, black][62] == '°'  # noqa: SLF001
+
+
+def test_display_filled_depends_on_board_color() -> None:
+  note = vb.VestaboardModel.NOTE
+  assert vb._DISPLAY[note, vb.VestaboardColor.BLACK][71] == '\033[38;2;255;255;255m▉'  # noqa: SLF001
+  assert vb._DISPLAY[note, vb.VestaboardColor.WHITE][71] == '\033[38;2;0;0;0m▉'  # noqa: SLF001
+
+
+def test_render_grid_out_of_range_code_is_placeholder() -> None:
+  assert '│ ?A │' in vb.render_grid([[99, 1]])
+
+
+def test_render_grid_plain_row_has_no_escape_codes() -> None:
+  grid = [vb._encode_line('HI')]  # noqa: SLF001
+  row = vb.render_grid(grid).splitlines()[1]
+  assert '\033' not in row
+  assert row == '│ HI' + ' ' * (vb.model.cols - 2) + ' │'
+
+
+def test_render_grid_resets_after_color_cell() -> None:
+  grid = [vb._encode_line('[G]A')]  # noqa: SLF001
+  row = vb.render_grid(grid).splitlines()[1]
+  assert row.startswith('│ \033[38;2;58;140;66m▉\033[0mA')
+
+
+@pytest.mark.parametrize(
+  'text,i,expected',
+  [
+    ('A', 0, ('A', 1)),
+    ('❤️X', 0, ('❤️', 2)),
+    ('❤', 0, ('❤', 1)),
+    ('[R]x', 0, ('[R]', 3)),
+    ('[[R]]', 0, ('[[R]]', 5)),
+    ('[[R]', 0, ('[', 1)),
+    ('[', 0, ('[', 1)),
+    ('x[Z]', 1, ('[', 1)),
+  ],
+)
+def test_next_token_peek(text: str, i: int, expected: tuple[str, int]) -> None:
+  assert vb._next_token(text, i) == expected  # noqa: SLF001
+
+
+def test_render_is_cached_per_template_and_options() -> None:
+  vb._render.cache_clear()  # noqa: SLF001
+  chosen = (('name', ('ALICE',)),)
+  first = vb._render(('HI {name}',), chosen, 'hard', vb.model)  # noqa: SLF001
+  second = vb._render(('HI {name}',), chosen, 'hard', vb.model)  # noqa: SLF001
+  assert first is second
+  assert vb._render.cache_info().hits == 1  # noqa: SLF001
+  assert first[0] == bytes(vb._encode_line('HI ALICE'))  # noqa: SLF001
+
+
+def test_render_cache_keyed_on_model(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(vb, 'model', vb.VestaboardModel.NOTE)
+  note = vb._render(('HI',), (), 'hard', vb.model)  # noqa: SLF001
+  monkeypatch.setattr(vb, 'model', vb.VestaboardModel.FLAGSHIP)
+  flagship = vb._render(('HI',), (), 'hard', vb.model)  # noqa: SLF001
+  assert len(note) == vb.VestaboardModel.NOTE.rows
+  assert len(flagship) == vb.VestaboardModel.FLAGSHIP.rows
+
+
+@pytest.mark.uses_vb_headers
+def test_set_state_posts_same_body_from_cached_render(monkeypatch: pytest.MonkeyPatch) -> None:
+  import config as _cfg
+
+  monkeypatch.setattr(_cfg, '_config', {'vestaboard': {'api_key': 'test-key'}})
+  mock_resp = MagicMock()
+  mock_resp.status_code = 200
+  with patch('integrations.vestaboard._SESSION.post', return_value=mock_resp) as mock_post:
+    vb.set_state([{'format': ['{v}']}], {'v': [['HELLO']]})
+    vb.set_state([{'format': ['{v}']}], {'v': [['HELLO']]})
+  first = mock_post.call_args_list[0].kwargs['data']
+  second = mock_post.call_args_list[1].kwargs['data']
+  assert first == second
+  assert json.loads(first)[0] == vb._encode_line('HELLO')  # noqa: SLF001
+
+
+@pytest.mark.uses_vb_headers
+def test_set_state_posts_compact_json_body(monkeypatch: pytest.MonkeyPatch) -> None:
+  import config as _cfg
+
+  monkeypatch.setattr(_cfg, '_config', {'vestaboard': {'api_key': 'test-key'}})
+  mock_resp = MagicMock()
+  mock_resp.status_code = 200
+  with patch('integrations.vestaboard._SESSION.post', return_value=mock_resp) as mock_post:
+    vb.set_state([{'format': ['HI']}], {})
+  kwargs = mock_post.call_args.kwargs
+  assert ' ' not in kwargs['data']
+  assert 'json' not in kwargs
+  assert kwargs['headers']['Content-Type'] == 'application/json'
+  assert kwargs['headers']['X-Vestaboard-Read-Write-Key'] == 'test-key'
+
+
+def test_render_grid_borders_follow_model(monkeypatch: pytest.MonkeyPatch) -> None:
+  monkeypatch.setattr(vb, 'model', vb.VestaboardModel.FLAGSHIP)
+  out = vb.render_grid(vb._build_grid(['HI'])).splitlines()  # noqa: SLF001
+  assert out[0] == '┌' + '─' * 24 + '┐'
+  assert out[-1] == '└' + '─' * 24 + '┘'
+  assert len(out) == vb.VestaboardModel.FLAGSHIP.rows + 2
+
+
+@pytest.mark.uses_vb_headers
+def test_get_and_set_state_share_session(monkeypatch: pytest.MonkeyPatch) -> None:
+  import config as _cfg
+
+  monkeypatch.setattr(_cfg, '_config', {'vestaboard': {'api_key': 'test-key'}})
+  get_resp = MagicMock(status_code=200)
+  layout = json.dumps(vb._build_grid([]))  # noqa: SLF001
+  get_resp.json.return_value = {'currentMessage': {'id': 'abc', 'appeared': 0, 'layout': layout}}
+  post_resp = MagicMock(status_code=200)
+  with (
+    patch.object(vb._SESSION, 'get', return_value=get_resp) as mock_get,  # noqa: SLF001
+    patch.object(vb._SESSION, 'post', return_value=post_resp) as mock_post,  # noqa: SLF001
+  ):
+    vb.get_state()
+    vb.get_state()
+    vb.set_state([{'format': ['HI']}], {})
+  assert mock_get.call_count == 2
+  mock_post.assert_called_once()
+
+
+@pytest.mark.parametrize('strategy', ['hard', 'word', 'ellipsis'])
+@pytest.mark.parametrize(
+  'text,max_cols',
+  [
+    ('HELLO WORLD FOO', 8),
+    ('HELLO WORLD', 5),
+    ('HELLO WORLD', 6),
+    ('ABCDEFGHIJ', 4),
+    (' LEADING SPACE', 5),
+    ('HELLO', 2),
+    ('HELLO', 0),
+  ],
+)
+def test_truncate_line_plain_fast_path_matches_token_loop(
+  text: str, max_cols: int, strategy: vb.TruncationStrategy
+) -> None:
+  # A trailing escaped tag forces the token-aware loop without changing the
+  # result, since it always lies past the cut.
+  slow = vb.truncate_line(text + '[[R]]', max_cols, strategy)
+  assert vb.truncate_line(text, max_cols, strategy) == slow
+
+
+def test_render_grid_emits_color_once_per_run() -> None:
+  grid = [vb._encode_line('[R][R][R]A[G]')]  # noqa: SLF001
+  row = vb.render_grid(grid).splitlines()[1]
+  red_sgr = vb._DISPLAY[vb.model, vb.VestaboardColor.BLACK][63][:-1]  # noqa: SLF001
+  assert row.count(red_sgr) == 1
+  assert '▉▉▉\033[0mA' in row
+  # A color cell at the end of the row's content still gets reset before
+  # the trailing blanks and border.
+  assert row.endswith(' │')
+  assert row.count('\033[0m') == 2
+
+
+def test_tokenize_codes_give_display_width() -> None:
+  toks = vb._tokenize('A❤️[G][[R]]é')  # noqa: SLF001
+  assert [tok for tok, _ in toks] == ['A', '❤️', '[G]', '[[R]]', 'é']
+  assert [len(codes) for _, codes in toks] == [1, 1, 1, 3, 1]
+  assert [code for _, codes in toks for code in codes] == vb._encode_line('A❤️[G][[R]]é')[:7]  # noqa: SLF001
+
+
+def test_tokenize_shared_between_measure_and_encode() -> None:
+  vb._tokenize.cache_clear()  # noqa: SLF001
+  line = '[R] HOT [B] COLD'
+  vb.display_len(line)
+  vb._encode_line(line)  # noqa: SLF001
+  info = vb._tokenize.cache_info()  # noqa: SLF001
+  assert (info.misses, info.hits) == (1, 1)
@@ -1,3 +1,5 @@
+import json
+from pathlib import Path
 from typing import Generator
 from unittest.mock import MagicMock, patch
 
@@ -10,13 +12,18 @@ from exceptions import IntegrationDataUnavailableError
 
 
 @pytest.fixture(autouse=True)
-def reset_caches() -> Generator[None, None, None]:
-  """Reset module-level caches before each test."""
+def reset_caches(tmp_path: Path, monkeypatch: pytest.MonkeyPatch) -> Generator[None, None, None]:
+  """Reset module-level caches and point the on-disk geocode cache at tmp_path."""
+  monkeypatch.setattr(weather, '_GEOCODE_CACHE_PATH', tmp_path / 'geocode.json')
   weather._geocode_cache = None
   weather._forecast_cache = None
+  weather._forecast_memo = None
+  weather._config_cache = None
   yield
   weather._geocode_cache = None  # type: ignore[assignment]
   weather._forecast_cache = None
+  weather._forecast_memo = None
+  weather._config_cache = None
 
 
 @pytest.fixture()
@@ -189,11 +196,54 @@ def test_geocoding_cached_after_first_call(weather_config_imperial: None) -> Non
     'integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast(), _mock_forecast()]
   ) as mock_fetch:
     weather.get_variables()
+    weather._forecast_memo = None  # force a second forecast fetch
     weather.get_variables()
   # First call: 2 requests (geocode + forecast). Second call: 1 request (forecast only).
   assert mock_fetch.call_count == 3
 
 
+def test_geocoding_persisted_across_restarts(weather_config_imperial: None) -> None:
+  """A fresh process (empty in-memory cache) reuses the on-disk geocode result."""
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast()]):
+    weather.get_variables()
+  stored = json.loads(weather._GEOCODE_CACHE_PATH.read_text())
+  assert stored == {'san francisco': [37.7749, -122.4194, 'San Francisco']}
+
+  weather._geocode_cache = None
+  weather._forecast_memo = None
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_forecast()]) as mock_fetch:
+    result = weather.get_variables()
+  assert mock_fetch.call_count == 1
+  assert result['city'] == [['San Francisco']]
+
+
+def test_geocoding_ignores_corrupt_cache_file(weather_config_imperial: None) -> None:
+  weather._GEOCODE_CACHE_PATH.write_text('not json')
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast()]) as mock_fetch:
+    weather.get_variables()
+  assert mock_fetch.call_count == 2
+  assert 'san francisco' in json.loads(weather._GEOCODE_CACHE_PATH.read_text())
+
+
+def test_geocoding_unwritable_cache_is_not_fatal(
+  weather_config_imperial: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+  blocker = weather._GEOCODE_CACHE_PATH.parent / 'blocker'
+  blocker.write_text('')
+  monkeypatch.setattr(weather, '_GEOCODE_CACHE_PATH', blocker / 'geocode.json')
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast()]):
+    result = weather.get_variables()
+  assert result['city'] == [['San Francisco']]
+
+
+def test_geocode_and_forecast_share_session(weather_config_imperial: None) -> None:
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast()]) as mock_fetch:
+    weather.get_variables()
+  sessions = [c.kwargs['session'] for c in mock_fetch.call_args_list]
+  assert sessions[0] is sessions[1] is weather._get_session()
+  assert sessions[0].headers['User-Agent'].startswith('e-note-ion/')
+
+
 def test_geocoding_uses_count2_with_country_code(monkeypatch: pytest.MonkeyPatch) -> None:
   """count=2 must be sent when a country code is present (Open-Meteo count=1+countryCode bug)."""
   import config as _cfg
@@ -302,34 +352,22 @@ def test_get_variables_high_low_three_digit_fits_note_cols(weather_config_imperi
   )
 
 
-def test_wmo_condition_clear() -> None:
-  condition, tag = weather._wmo_condition(0)
-  assert condition == 'CLEAR'
-  assert tag == '[Y]'
-
-
-def test_wmo_condition_rain() -> None:
-  condition, tag = weather._wmo_condition(63)
-  assert condition == 'RAIN'
-  assert tag == '[B]'
-
-
-def test_wmo_condition_thunderstorm() -> None:
-  condition, tag = weather._wmo_condition(95)
-  assert condition == 'THUNDERSTORM'
-  assert tag == '[R]'
+def test_wmo_rendered_known_codes() -> None:
+  assert weather._WMO_RENDERED[0] == '[Y] CLEAR'
+  assert weather._WMO_RENDERED[63] == '[B] RAIN'
+  assert weather._WMO_RENDERED[95] == '[R] THUNDERSTORM'
+  assert weather._WMO_RENDERED[73] == '[W] SNOW'
 
 
-def test_wmo_condition_snow() -> None:
-  condition, tag = weather._wmo_condition(73)
-  assert condition == 'SNOW'
-  assert tag == '[W]'
+def test_wmo_rendered_unknown_code_falls_back() -> None:
+  assert 999 not in weather._WMO_RENDERED
+  assert weather._WMO_UNKNOWN == '[K] UNKNOWN'
 
 
-def test_wmo_condition_unknown_code() -> None:
-  condition, tag = weather._wmo_condition(999)
-  assert condition == 'UNKNOWN'
-  assert tag == '[K]'
+def test_wmo_rendered_matches_condition_tuples() -> None:
+  assert weather._WMO_RENDERED.keys() == weather._WMO_CONDITIONS.keys()
+  for code, (condition, tag) in weather._WMO_CONDITIONS.items():
+    assert weather._WMO_RENDERED[code] == f'{tag} {condition}'
 
 
 def test_condition_string_fits_note_cols() -> None:
@@ -349,6 +387,7 @@ def test_forecast_cache_hit_within_ttl_returns_cached_value(weather_config_imper
   """On API failure within TTL, cached forecast is returned instead of raising."""
   with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast(temp=72.0)]):
     weather.get_variables()
+  weather._forecast_memo = None
 
   with patch(
     'integrations.weather.fetch_with_retry',
@@ -371,6 +410,7 @@ def test_forecast_cache_expired_raises_unavailable(
   # Expire the cache by backdating its timestamp beyond the TTL.
   assert weather._forecast_cache is not None
   monkeypatch.setattr(weather._forecast_cache, 'cached_at', time.monotonic() - weather._FORECAST_CACHE_TTL - 1)
+  weather._forecast_memo = None
 
   with patch('integrations.weather.fetch_with_retry', side_effect=[requests.ConnectionError()]):
     with pytest.raises(IntegrationDataUnavailableError):
@@ -391,3 +431,163 @@ def test_forecast_cache_updated_on_success(weather_config_imperial: None) -> Non
     weather.get_variables()
   assert weather._forecast_cache is not None
   assert weather._forecast_cache.value['temp'][0][0] == '65F'
+
+
+# --- forecast memo ---
+
+
+def test_forecast_memo_skips_fetch_within_ttl(weather_config_imperial: None) -> None:
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast()]) as mock_fetch:
+    first = weather.get_variables()
+    second = weather.get_variables()
+  assert mock_fetch.call_count == 2  # geocode + one forecast
+  assert second is first
+
+
+def test_forecast_memo_expires_after_ttl(weather_config_imperial: None, monkeypatch: pytest.MonkeyPatch) -> None:
+  import time
+
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast(temp=60.0)]):
+    weather.get_variables()
+  assert weather._forecast_memo is not None
+  monkeypatch.setattr(weather._forecast_memo[1], 'cached_at', time.monotonic() - weather._FORECAST_MEMO_TTL - 1)
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_forecast(temp=61.0)]) as mock_fetch:
+    result = weather.get_variables()
+  mock_fetch.assert_called_once()
+  assert result['temp'] == [['61F']]
+
+
+def test_forecast_memo_keyed_on_units(weather_config_imperial: None, monkeypatch: pytest.MonkeyPatch) -> None:
+  import config as _cfg
+
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast()]):
+    weather.get_variables()
+  monkeypatch.setattr(_cfg, '_config', {'weather': {'city': 'san francisco', 'units': 'metric'}})
+  weather._config_cache = None
+  with patch('integrations.weather.fetch_with_retry', side_effect=[_mock_forecast(temp=22.0)]) as mock_fetch:
+    result = weather.get_variables()
+  mock_fetch.assert_called_once()
+  assert result['temp'] == [['22C']]
+
+
+def test_forecast_memo_shared_by_concurrent_calls(weather_config_imperial: None) -> None:
+  import threading
+  import time
+
+  def slow_fetch(method: str, url: str, **kwargs: object) -> MagicMock:
+    if url == weather._GEOCODING_URL:
+      return _mock_geocode()
+    time.sleep(0.05)  # widen the window in which a sibling call could race
+    return _mock_forecast()
+
+  results: list[dict[str, list[list[str]]]] = []
+  with patch('integrations.weather.fetch_with_retry', side_effect=slow_fetch) as mock_fetch:
+    threads = [threading.Thread(target=lambda: results.append(weather.get_variables())) for _ in range(4)]
+    for t in threads:
+      t.start()
+    for t in threads:
+      t.join()
+  assert mock_fetch.call_count == 2  # geocode + one forecast
+  assert len(results) == 4
+
+
+def test_concurrent_call_waits_for_in_flight_fetch(
+  weather_config_imperial: None, monkeypatch: pytest.MonkeyPatch
+) -> None:
+  import threading
+  from concurrent.futures import Future
+
+  monkeypatch.setattr(weather, '_FORECAST_MEMO_TTL', -1)  # no memo: the waiter must share the fetch
+  fetching = threading.Event()
+  waiting = threading.Event()
+  release = threading.Event()
+  lock_held: list[bool] = []
+
+  class _WatchedFuture(Future[dict[str, list[list[str]]]]):
+    def result(self, timeout: float | None = None) -> dict[str, list[list[str]]]:
+      waiting.set()
+      return super().result(timeout)
+
+  monkeypatch.setattr(weather, 'Future', _WatchedFuture)
+
+  def blocking_fetch(method: str, url: str, **kwargs: object) -> MagicMock:
+    if url == weather._GEOCODING_URL:
+      return _mock_geocode()
+    lock_held.append(weather._fetch_lock.locked())
+    fetching.set()
+    assert release.wait(5)
+    return _mock_forecast()
+
+  results: dict[str, dict[str, list[list[str]]]] = {}
+  with patch('integrations.weather.fetch_with_retry', side_effect=blocking_fetch) as mock_fetch:
+    owner = threading.Thread(target=lambda: results.update(owner=weather.get_variables()))
+    owner.start()
+    assert fetching.wait(5)
+    waiter = threading.Thread(target=lambda: results.update(waiter=weather.get_variables()))
+    waiter.start()
+    assert waiting.wait(5)
+    release.set()
+    owner.join(5)
+    waiter.join(5)
+  assert mock_fetch.call_count == 2  # geocode + one forecast
+  assert lock_held == [False]  # the request ran outside _fetch_lock
+  assert results['waiter'] is results['owner']
+  assert weather._inflight is None
+
+
+def test_concurrent_call_sees_in_flight_error(weather_config_imperial: None) -> None:
+  from concurrent.futures import Future
+
+  future: Future[dict[str, list[list[str]]]] = Future()
+  future.set_exception(IntegrationDataUnavailableError('Weather: forecast error'))
+  weather._inflight = future
+  try:
+    with patch('integrations.weather.fetch_with_retry') as mock_fetch:
+      with pytest.raises(IntegrationDataUnavailableError):
+        weather.get_variables()
+    mock_fetch.assert_not_called()
+  finally:
+    weather._inflight = None
+
+
+# --- config cache ---
+
+
+def test_config_read_once(weather_config_imperial: None, monkeypatch: pytest.MonkeyPatch) -> None:
+  import config as _cfg
+
+  assert weather._get_config() == ('san francisco', 'imperial', 'fahrenheit', 'mph')
+  monkeypatch.setattr(_cfg, '_config', {'weather': {'city': 'London', 'units': 'metric'}})
+  assert weather._get_config()[0] == 'san francisco'
+
+
+def test_reset_cache_rereads_config(weather_config_imperial: None, monkeypatch: pytest.MonkeyPatch) -> None:
+  import config as _cfg
+
+  weather._get_config()
+  weather._geocode_cache = (1.0, 2.0, 'Somewhere')
+  monkeypatch.setattr(_cfg, '_config', {'weather': {'city': 'London', 'units': 'metric'}})
+  weather.reset_cache()
+  assert weather._geocode_cache is None
+  assert weather._get_config() == ('London', 'metric', 'celsius', 'kmh')
+
+
+def test_forecast_params_built_once_per_location(weather_config_imperial: None) -> None:
+  with patch(
+    'integrations.weather.fetch_with_retry', side_effect=[_mock_geocode(), _mock_forecast(), _mock_forecast()]
+  ) as mock_fetch:
+    weather.get_variables()
+    weather._forecast_memo = None
+    weather.get_variables()
+  first = mock_fetch.call_args_list[1].kwargs['params']
+  second = mock_fetch.call_args_list[2].kwargs['params']
+  assert first is second
+  assert first['current'].split(',') == [
+    'temperature_2m',
+    'apparent_temperature',
+    'weather_code',
+    'wind_speed_10m',
+    'precipitation_probability',
+  ]
+  assert first['temperature_unit'] == 'fahrenheit'
+  assert first['wind_speed_unit'] == 'mph'
@@ -1,9 +1,10 @@
 import http.client
 import json
+import socket
 import sys
 import threading
 import time
-from http.server import HTTPServer
+from collections.abc import Callable
 from typing import Any, Generator
 from unittest.mock import MagicMock, patch
 
@@ -22,10 +23,10 @@ _SECRET = 'test-secret-value'
 _BOUNDARY = 'TestBoundary1234'
 
 
-def _start_test_server(secret: str = _SECRET) -> tuple[HTTPServer, int]:
+def _start_test_server(secret: str = _SECRET, **kwargs: Any) -> tuple[_mod._WebhookServer, int]:
   """Start a webhook server on an OS-assigned port and return (server, port)."""
   handler = _mod._make_webhook_handler(secret)
-  server = HTTPServer(('127.0.0.1', 0), handler)
+  server = _mod._WebhookServer(('127.0.0.1', 0), handler, **kwargs)
   port = server.server_address[1]
   threading.Thread(target=server.serve_forever, daemon=True).start()
   return server, port
@@ -109,11 +110,12 @@ def test_webhook_server_not_started_when_no_section(
     with (
       patch.object(_mod, '_validate_startup'),
       patch('config.load_config'),
-      patch.object(_mod, 'load_content'),
+      patch.object(_mod, 'load_content', return_value=set()),
       patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
       patch('threading.Thread'),
       patch('apscheduler.schedulers.background.BackgroundScheduler', return_value=mock_sched),
-      patch('time.sleep', side_effect=KeyboardInterrupt),
+      patch('signal.signal'),
+      patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
     ):
       monkeypatch.setattr(sys, 'argv', ['scheduler.py'])
       _mod.main()
@@ -130,11 +132,12 @@ def test_webhook_server_started_when_section_present(
     with (
       patch.object(_mod, '_validate_startup'),
       patch('config.load_config'),
-      patch.object(_mod, 'load_content'),
+      patch.object(_mod, 'load_content', return_value=set()),
       patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
       patch('threading.Thread'),
       patch('apscheduler.schedulers.background.BackgroundScheduler', return_value=mock_sched),
-      patch('time.sleep', side_effect=KeyboardInterrupt),
+      patch('signal.signal'),
+      patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
     ):
       monkeypatch.setattr(sys, 'argv', ['scheduler.py'])
       _mod.main()
@@ -170,10 +173,7 @@ def test_wrong_secret_returns_401() -> None:
 
 
 def test_missing_secret_returns_401() -> None:
-  handler = _mod._make_webhook_handler(_SECRET)
-  server = HTTPServer(('127.0.0.1', 0), handler)
-  port = server.server_address[1]
-  threading.Thread(target=server.serve_forever, daemon=True).start()
+  server, port = _start_test_server()
   try:
     encoded = b'{}'
     conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
@@ -678,6 +678,152 @@ def test_malformed_json_returns_400() -> None:
     server.shutdown()
 
 
+def _wait_for(predicate: Callable[[], bool], timeout: float = 5.0) -> None:
+  """Poll predicate until it holds; fail the test if it never does."""
+  deadline = time.monotonic() + timeout
+  while not predicate():
+    if time.monotonic() > deadline:
+      pytest.fail('condition not reached')
+    time.sleep(0.005)
+
+
+def test_webhooks_for_different_integrations_run_concurrently() -> None:
+  # Each handler waits for the other at a barrier; it only trips if both
+  # dispatches are in flight at the same time.
+  barrier = threading.Barrier(2, timeout=5)
+
+  def handler(payload: dict[str, Any]) -> None:
+    barrier.wait()
+
+  mock_mod = MagicMock()
+  mock_mod.handle_webhook.side_effect = handler
+  results: list[int] = []
+  server, port = _start_test_server()
+  try:
+    with patch.object(_mod, '_get_integration', return_value=mock_mod):
+      threads = [
+        threading.Thread(target=lambda p=path: results.append(_post(port, p)[0]))
+        for path in ('/webhook/plex', '/webhook/bart')
+      ]
+      for t in threads:
+        t.start()
+      for t in threads:
+        t.join()
+  finally:
+    server.shutdown()
+  assert results == [200, 200]
+
+
+def test_webhooks_for_same_integration_dispatch_in_arrival_order() -> None:
+  """A later, smaller request waits for an earlier one still sending its body."""
+  dispatched: list[str] = []
+  active = 0
+  peak = 0
+  lock = threading.Lock()
+
+  def handler(payload: dict[str, Any]) -> None:
+    nonlocal active, peak
+    with lock:
+      active += 1
+      peak = max(peak, active)
+    dispatched.append(payload['event'])
+    with lock:
+      active -= 1
+
+  mock_mod = MagicMock()
+  mock_mod.handle_webhook.side_effect = handler
+  order = None
+  server, port = _start_test_server()
+  try:
+    with patch.object(_mod, '_get_integration', return_value=mock_mod):
+      order = server.RequestHandlerClass._arrival['plex']  # type: ignore[attr-defined]
+      start = order._issued
+      # First request: headers and only half of the body.
+      first_body = json.dumps({'event': 'media.play', 'pad': 'x' * 1000}).encode()
+      slow = socket.create_connection(('127.0.0.1', port), timeout=5)
+      slow.sendall(
+        b'POST /webhook/plex HTTP/1.1\r\nHost: x\r\nContent-Type: application/json\r\n'
+        + f'X-Webhook-Secret: {_SECRET}\r\nContent-Length: {len(first_body)}\r\n\r\n'.encode()
+        + first_body[:500]
+      )
+      _wait_for(lambda: order._issued == start + 1)
+      # Second request: complete, and it takes its ticket while the first is still reading.
+      second = threading.Thread(target=_post, args=(port, '/webhook/plex', {'event': 'media.stop'}))
+      second.start()
+      _wait_for(lambda: order._issued == start + 2)
+      assert dispatched == []
+      slow.sendall(first_body[500:])
+      assert slow.recv(1024).startswith(b'HTTP/1.0 200')
+      slow.close()
+      second.join()
+  finally:
+    server.shutdown()
+  assert dispatched == ['media.play', 'media.stop']
+  assert peak == 1
+
+
+def test_unauthenticated_request_takes_no_ticket() -> None:
+  server, port = _start_test_server()
+  try:
+    order = server.RequestHandlerClass._arrival['bart']  # type: ignore[attr-defined]
+    start = order._issued
+    status, _ = _post(port, '/webhook/bart', secret='wrong-secret')
+    assert status == 401
+    assert order._issued == start
+  finally:
+    server.shutdown()
+
+
+def test_server_caps_connection_threads() -> None:
+  """With one connection slot, a second request is not handled until the first finishes."""
+  second_started = threading.Event()
+  first_saw_second: list[bool] = []
+
+  def handler(payload: dict[str, Any]) -> None:
+    if payload.get('n') == 1:
+      first_saw_second.append(second_started.wait(0.5))
+    else:
+      second_started.set()
+
+  mock_mod = MagicMock()
+  mock_mod.handle_webhook.side_effect = handler
+  server, port = _start_test_server(max_connections=1)
+  try:
+    with patch.object(_mod, '_get_integration', return_value=mock_mod):
+      first = threading.Thread(target=_post, args=(port, '/webhook/plex', {'n': 1}))
+      first.start()
+      _wait_for(lambda: mock_mod.handle_webhook.call_count == 1)
+      second = threading.Thread(target=_post, args=(port, '/webhook/bart', {'n': 2}))
+      second.start()
+      first.join()
+      second.join()
+  finally:
+    server.shutdown()
+  assert first_saw_second == [False]
+  assert second_started.is_set()
+
+
+def test_non_utf8_body_returns_400() -> None:
+  server, port = _start_test_server()
+  try:
+    conn = http.client.HTTPConnection('127.0.0.1', port, timeout=5)
+    bad_body = b'{"a": "\xff"}'
+    conn.request(
+      'POST',
+      '/webhook/bart',
+      body=bad_body,
+      headers={
+        'Content-Type': 'application/json',
+        'Content-Length': str(len(bad_body)),
+        'X-Webhook-Secret': _SECRET,
+      },
+    )
+    resp = conn.getresponse()
+    assert resp.status == 400
+  finally:
+    server.shutdown()
+
+
 def test_handle_webhook_exception_returns_500_server_survives() -> None:
   mock_mod = MagicMock()
   mock_mod.handle_webhook.side_effect = RuntimeError('boom')
@@ -707,7 +853,7 @@ def test_secret_autogenerated_when_absent(
   monkeypatch.chdir(tmp_path)
   monkeypatch.setattr(_cfg, '_config', {'webhook': {'port': '8080'}})
 
-  with patch('scheduler.HTTPServer') as mock_http:
+  with patch('scheduler._WebhookServer') as mock_http:
     mock_http.return_value = MagicMock()
     with patch('threading.Thread'):
       _mod._start_webhook_server()
@@ -725,7 +871,7 @@ def test_existing_secret_not_overwritten(
   monkeypatch.chdir(tmp_path)
   monkeypatch.setattr(_cfg, '_config', {'webhook': {'port': '8080', 'secret': existing}})
 
-  with patch('scheduler.HTTPServer') as mock_http:
+  with patch('scheduler._WebhookServer') as mock_http:
     mock_http.return_value = MagicMock()
     with patch('threading.Thread'):
       _mod._start_webhook_server()
@@ -745,7 +891,7 @@ def test_multipart_payload_field_is_parsed_as_json() -> None:
   mock_mod.handle_webhook.return_value = None
   server, port = _start_test_server()
   try:
-    with patch.dict('scheduler._integrations', {'plex': mock_mod}):
+    with patch.object(_mod, '_get_integration', return_value=mock_mod):
       status, _ = _post_multipart(port, '/webhook/plex', '{"event": "media.play"}')
     assert status == 200
     mock_mod.handle_webhook.assert_called_once_with({'event': 'media.play'})
@@ -781,3 +927,29 @@ def test_multipart_invalid_json_in_payload_returns_400() -> None:
     assert status == 400
   finally:
     server.shutdown()
+
+
+def test_multipart_field_skips_other_parts_and_quoted_boundary() -> None:
+  body = (
+    b'--bx\r\nContent-Disposition: form-data; name="thumb"; filename="payload"\r\n'
+    b'Content-Type: image/jpeg\r\n\r\n\xff\xd8\r\n'
+    b'--bx\r\nContent-Disposition: form-data; name="payload"\r\n'
+    b'Content-Type: application/json\r\n\r\n{"a": 1}\r\n--bx--\r\n'
+  )
+  assert _mod._multipart_field(body, 'bx', 'payload') == b'{"a": 1}'
+  assert _mod._multipart_field(body, 'bx', 'missing') is None
+
+
+@pytest.mark.parametrize(
+  ('content_type', 'expected'),
+  [
+    ('multipart/form-data; boundary=abc', 'abc'),
+    ('Multipart/Form-Data; charset=utf-8; Boundary="a b"', 'a b'),
+    ('multipart/form-data;boundary=abc; charset=utf-8', 'abc'),
+    ('multipart/form-data', None),
+    ('application/json', None),
+    ('text/plain; boundary=abc', None),
+  ],
+)
+def test_multipart_boundary(content_type: str, expected: str | None) -> None:
+  assert _mod._multipart_boundary(content_type) == expected
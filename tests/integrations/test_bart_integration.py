@@ -17,7 +17,7 @@ import integrations.vestaboard as vb
 
 @pytest.mark.integration
 @pytest.mark.require_env('BART_API_KEY')
-def test_get_variables_real_api(require_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_real_api(monkeypatch: pytest.MonkeyPatch) -> None:
   """get_variables() returns a valid variables dict from the live BART API."""
   monkeypatch.setattr(
     _cfg,
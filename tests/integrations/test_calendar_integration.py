@@ -30,7 +30,7 @@ def reset_caches() -> Generator[None, None, None]:
 
 @pytest.mark.integration
 @pytest.mark.require_env('CALENDAR_URL')
-def test_ics_mode_real_feed(require_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_ics_mode_real_feed(monkeypatch: pytest.MonkeyPatch) -> None:
   """get_variables() returns valid events or raises cleanly from a real .ics feed."""
   monkeypatch.setattr(_cfg, '_config', {'calendar': {'urls': [os.environ['CALENDAR_URL']]}, 'scheduler': {}})
 
@@ -49,7 +49,7 @@ def test_ics_mode_real_feed(require_env: None, monkeypatch: pytest.MonkeyPatch)
 
 @pytest.mark.integration
 @pytest.mark.require_env('CALENDAR_CALDAV_URL', 'CALENDAR_USERNAME', 'CALENDAR_PASSWORD')
-def test_caldav_mode_real_icloud(require_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_caldav_mode_real_icloud(monkeypatch: pytest.MonkeyPatch) -> None:
   """get_variables() connects to a real CalDAV server and returns valid events or raises cleanly."""
   monkeypatch.setattr(
     _cfg,
@@ -26,7 +26,7 @@ def reset_caches() -> Generator[None, None, None]:
 
 @pytest.mark.integration
 @pytest.mark.require_env('DISCOGS_TOKEN')
-def test_get_variables_returns_artist_and_album(require_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_returns_artist_and_album(monkeypatch: pytest.MonkeyPatch) -> None:
   """get_variables() returns a valid variables dict from the live Discogs API."""
   monkeypatch.setattr(_cfg, '_config', {'discogs': {'token': os.environ['DISCOGS_TOKEN']}})
 
@@ -7,6 +7,8 @@ No API key required. Open-Meteo is free for non-commercial use.
 The morning integration has no env vars of its own; it reuses [weather] config.
 """
 
+from pathlib import Path
+
 import pytest
 
 import config as _cfg
@@ -30,9 +32,10 @@ def _count_visual_width(row: str) -> int:
 
 
 @pytest.mark.integration
-def test_get_variables_live(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_live(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
   """get_variables() returns a valid 7-wide visual using live Open-Meteo data."""
   monkeypatch.setattr(_cfg, '_config', {'weather': {'city': 'San Francisco', 'units': 'imperial'}})
+  monkeypatch.setattr(weather, '_GEOCODE_CACHE_PATH', tmp_path / 'geocode.json')
   weather._geocode_cache = None
   weather._forecast_cache = None
 
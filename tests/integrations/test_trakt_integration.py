@@ -36,7 +36,7 @@ def _patch_config(monkeypatch: pytest.MonkeyPatch) -> None:
 
 @pytest.mark.integration
 @pytest.mark.require_env('TRAKT_CLIENT_ID', 'TRAKT_CLIENT_SECRET', 'TRAKT_ACCESS_TOKEN')
-def test_get_variables_calendar_live(require_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_calendar_live(monkeypatch: pytest.MonkeyPatch) -> None:
   """get_variables_calendar() returns a valid variables dict from the live Trakt API."""
   _patch_config(monkeypatch)
   trakt._auth_started = False
@@ -60,7 +60,7 @@ def test_get_variables_calendar_live(require_env: None, monkeypatch: pytest.Monk
 
 @pytest.mark.integration
 @pytest.mark.require_env('TRAKT_CLIENT_ID', 'TRAKT_CLIENT_SECRET', 'TRAKT_ACCESS_TOKEN')
-def test_get_variables_watching_live(require_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_watching_live(monkeypatch: pytest.MonkeyPatch) -> None:
   """get_variables_watching() returns valid vars or raises DataUnavailable — both are correct."""
   _patch_config(monkeypatch)
   trakt._auth_started = False
@@ -76,7 +76,7 @@ def test_get_variables_watching_live(require_env: None, monkeypatch: pytest.Monk
 
 @pytest.mark.integration
 @pytest.mark.require_env('TRAKT_CLIENT_ID', 'TRAKT_CLIENT_SECRET', 'TRAKT_ACCESS_TOKEN')
-def test_get_variables_next_up_live(require_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_next_up_live(monkeypatch: pytest.MonkeyPatch) -> None:
   """get_variables_next_up() returns valid vars or raises DataUnavailable — both are correct."""
   _patch_config(monkeypatch)
   trakt._auth_started = False
@@ -17,8 +17,9 @@ import integrations.vestaboard as vb
 
 
 @pytest.mark.integration
+@pytest.mark.uses_vb_headers
 @pytest.mark.require_env('VESTABOARD_VIRTUAL_API_KEY')
-def test_set_state_real_api(require_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_set_state_real_api(monkeypatch: pytest.MonkeyPatch) -> None:
   """set_state() successfully writes a message to the live virtual board."""
   monkeypatch.setattr(_cfg, '_config', {'vestaboard': {'api_key': os.environ['VESTABOARD_VIRTUAL_API_KEY']}})
 
@@ -29,8 +30,9 @@ def test_set_state_real_api(require_env: None, monkeypatch: pytest.MonkeyPatch)
 
 
 @pytest.mark.integration
+@pytest.mark.uses_vb_headers
 @pytest.mark.require_env('VESTABOARD_VIRTUAL_API_KEY')
-def test_get_state_real_api(require_env: None, monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_state_real_api(monkeypatch: pytest.MonkeyPatch) -> None:
   """get_state() returns a valid VestaboardState from the live API.
 
   Relies on test_set_state_real_api having run first so the board has state.
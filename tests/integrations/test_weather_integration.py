@@ -5,6 +5,8 @@ Run with: uv run pytest -m integration
 No API key required. Open-Meteo is free for non-commercial use.
 """
 
+from pathlib import Path
+
 import pytest
 
 import config as _cfg
@@ -13,14 +15,17 @@ import integrations.weather as weather
 
 
 @pytest.mark.integration
-def test_get_variables_returns_expected_keys(monkeypatch: pytest.MonkeyPatch) -> None:
+def test_get_variables_returns_expected_keys(monkeypatch: pytest.MonkeyPatch, tmp_path: Path) -> None:
   """get_variables() returns a valid variables dict from the live Open-Meteo API."""
+  # Keep the on-disk geocode cache out of ~/.cache so a stale entry can't mask
+  # a live geocoding failure.
+  monkeypatch.setattr(weather, '_GEOCODE_CACHE_PATH', tmp_path / 'geocode.json')
   monkeypatch.setattr(
     _cfg,
     '_config',
     {'weather': {'city': 'San Francisco', 'units': 'imperial'}},
   )
-  weather._geocode_cache = None
+  weather.reset_cache()
 
   result = weather.get_variables()
 
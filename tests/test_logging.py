@@ -20,11 +20,12 @@ def _run_main_with_log_level(
   with (
     patch.object(_mod, '_validate_startup'),
     patch('config.load_config'),
-    patch.object(_mod, 'load_content'),
+    patch.object(_mod, 'load_content', return_value=set()),
     patch('integrations.vestaboard.get_state', return_value=MagicMock(__str__=lambda s: '')),
     patch('threading.Thread'),
     patch('apscheduler.schedulers.background.BackgroundScheduler', return_value=mock_sched),
-    patch('time.sleep', side_effect=KeyboardInterrupt),
+    patch('signal.signal'),
+    patch.object(_mod, '_shutdown', **{'wait.side_effect': KeyboardInterrupt}),
   ):
     _mod.main()
 